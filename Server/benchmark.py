@@ -0,0 +1,365 @@
+"""Scaling benchmarks on synthetic NEP 2020 instances.
+
+Run from the Server directory:
+
+    python -m benchmark --preset small medium --output bench.json
+
+Each configuration builds a synthetic instance (create_synthetic_data) and
+reports chromosome construction throughput, batch and incremental fitness
+evaluations per second, generations until the best timetable has no gene
+in a hard violation (from a random initial population by default: the
+greedy constructor alone solves most synthetic instances), and peak
+traced memory of a short GA run. Results
+are written as JSON together with the git commit, so runs can be compared
+across commits.
+"""
+import argparse
+import json
+import logging
+import math
+import platform
+import random
+import subprocess
+import sys
+import threading
+import tracemalloc
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from index import EnhancedGeneticTimetableGenerator
+
+logger = logging.getLogger('benchmark')
+
+ROOM_TYPES = ['classroom', 'lab', 'hall']
+ROOM_CAPACITY = 40
+EXPERTISE = ['Education', 'Pedagogy', 'Science', 'Mathematics', 'Languages', 'General']
+THEORY_TYPES = ['Major', 'Minor', 'Elective', 'AECC/VAC']
+
+@dataclass
+class InstanceConfig:
+    name: str
+    courses: int = 12
+    faculty: int = 15
+    rooms: int = 8
+    students: int = 100
+    semesters: int = 1
+    min_credits: int = 0  # every student's enrolled credits fall in this window (the generator's
+    max_credits: int = 0  # MIN/MAX_SEMESTER_CREDITS, Hard 6); 0: fitted to the weekly grid, see credit_window
+    split_ratio: float = 0.2  # share of courses enrolled beyond their largest room
+    lab_ratio: float = 0.2  # share of Practical courses (lab rooms)
+    internship_ratio: float = 0.05  # share of School_Internship courses (no room)
+    availability_sparsity: float = 0.1  # share of faculty periods marked unavailable
+    seed: int = 0
+
+PRESETS = {
+    'tiny': InstanceConfig('tiny'),  # about the size of create_nep2020_sample_data
+    'small': InstanceConfig('small', courses=30, faculty=40, rooms=20, students=500, semesters=2),
+    'medium': InstanceConfig('medium', courses=80, faculty=100, rooms=50, students=2000, semesters=4),
+    'large': InstanceConfig('large', courses=200, faculty=250, rooms=160, students=10000, semesters=8),
+    'sparse': InstanceConfig('sparse', courses=30, faculty=40, rooms=20, students=500, semesters=2,
+                             availability_sparsity=0.5),
+    'split': InstanceConfig('split', courses=30, faculty=40, rooms=20, students=500, semesters=2, split_ratio=0.6),
+}
+
+def student_periods(grid: EnhancedGeneticTimetableGenerator) -> int:
+    """Sessions per week a synthetic student may take: three quarters of the grid, so clashes can be resolved"""
+    return len(grid.days) * len(grid.PERIOD_TIMES) * 3 // 4
+
+def credit_window(config: InstanceConfig, grid: EnhancedGeneticTimetableGenerator) -> Tuple[int, int]:
+    """(min, max) credits per student: config's, else what student_periods fits at 3 sessions per credit"""
+    max_credits = config.max_credits or student_periods(grid) // 3
+    return config.min_credits or max_credits - 2, max_credits
+
+def _sessions_per_week(grid: EnhancedGeneticTimetableGenerator, course_type: str, credits: int, hours: int) -> int:
+    """Sessions per week the generator lays out for one group of a course"""
+    if course_type == 'School_Internship':
+        return len(grid.PERIOD_TIMES)  # a full day
+    return max(credits * grid.CREDIT_HOURS_MAPPING.get(course_type, 2), math.ceil(hours / grid.TOTAL_SEMESTER_WEEKS))
+
+def create_synthetic_data(config: InstanceConfig):
+    """Courses, faculty, rooms and students DataFrames shaped by `config` (same columns as the upload).
+
+    Sized so that a conflict-free timetable exists on the default weekly
+    grid: each semester's courses are packed into programmes that fit the
+    credit_window and student_periods, every student takes one programme,
+    and rooms and faculty are split between room types and expertise in
+    proportion to the sessions each has to host. All rooms seat
+    ROOM_CAPACITY, so the courses of a programme split into the same
+    student groups (groups are dealt round-robin in student id order).
+    """
+    import pandas as pd
+
+    rng = random.Random(config.seed)
+    grid = EnhancedGeneticTimetableGenerator()  # default days, periods and sessions per credit
+    periods = student_periods(grid)
+
+    courses = {k: [] for k in ('Course_ID', 'Course_Name', 'Credits', 'Course_Type', 'Total_Duration_Hours',
+                               'Faculty_Expertise_Required', 'Room_Type_Required', 'Max_Students',
+                               'Semester', 'Is_Elective')}
+    for i in range(config.courses):
+        draw = rng.random()
+        if draw < config.internship_ratio:
+            course_type, room_type = 'School_Internship', 'none'
+        elif draw < config.internship_ratio + config.lab_ratio:
+            course_type, room_type = 'Practical', 'lab'
+        else:
+            course_type, room_type = rng.choice(THEORY_TYPES), rng.choice(['classroom', 'hall'])
+
+        courses['Course_ID'].append(f"C{i:04d}")
+        courses['Course_Name'].append(f"Course {i}")
+        courses['Credits'].append(rng.choice([2, 3, 4]))
+        courses['Course_Type'].append(course_type)
+        courses['Total_Duration_Hours'].append(rng.choice([30, 45, 60]))
+        courses['Faculty_Expertise_Required'].append(rng.choice(EXPERTISE))
+        courses['Room_Type_Required'].append(room_type)
+        courses['Max_Students'].append(ROOM_CAPACITY)  # per group
+        courses['Semester'].append(i % config.semesters + 1)
+        courses['Is_Elective'].append(course_type == 'Elective')
+
+    # Students take one programme of their semester, split_ratio of the programmes sized beyond one group
+    semester_of = [i % config.semesters + 1 for i in range(config.students)]
+    window = credit_window(config, grid)
+    sessions = [_sessions_per_week(grid, *course) for course in
+                zip(courses['Course_Type'], courses['Credits'], courses['Total_Duration_Hours'])]
+    programmes = {}
+    for s in range(1, config.semesters + 1):
+        pool = [i for i, cs in enumerate(courses['Semester']) if cs == s]
+        rng.shuffle(pool)
+        programmes[s] = _pack_programmes(pool, courses['Credits'], sessions, window, periods)
+    weights = {s: [ROOM_CAPACITY * (rng.uniform(1.5, 2.5) if rng.random() < config.split_ratio else rng.uniform(0.4, 0.9))
+                   for _ in programmes[s]] for s in programmes}
+    enrolled, class_sizes = [], [0] * config.courses
+    for s in semester_of:
+        picks = rng.choices(programmes[s], weights=weights[s])[0] if programmes[s] else []
+        for i in picks:
+            class_sizes[i] += 1
+        enrolled.append(','.join(courses['Course_ID'][i] for i in sorted(picks)))
+    students = {
+        'Student_ID': [f"S{i:06d}" for i in range(config.students)],
+        'Student_Name': [f"Student {i}" for i in range(config.students)],
+        'Semester': semester_of,
+        'Enrolled_Courses': enrolled,
+    }
+
+    # Sessions to host per room type and expertise (sessions per week x student groups)
+    room_demand, faculty_demand = defaultdict(int), defaultdict(int)
+    for i, size in enumerate(class_sizes):
+        room_type = courses['Room_Type_Required'][i]
+        hosted = sessions[i] * (math.ceil(size / ROOM_CAPACITY) if room_type != 'none' else 1)
+        faculty_demand[courses['Faculty_Expertise_Required'][i]] += hosted
+        if room_type != 'none':
+            room_demand[room_type] += hosted
+    room_types = _apportion(config.rooms, {t: room_demand[t] for t in ROOM_TYPES})
+    rooms = {
+        'Room_ID': [f"R{i:04d}" for i in range(config.rooms)],
+        'Room_Name': [f"Room {i}" for i in range(config.rooms)],
+        'Capacity': [ROOM_CAPACITY] * config.rooms,
+        'Room_Type': room_types,
+        'Equipment': ['Projector,Whiteboard'] * config.rooms,
+    }
+    expertise = _apportion(config.faculty, {e: faculty_demand[e] for e in EXPERTISE})
+    faculty = {
+        'Faculty_ID': [f"F{i:04d}" for i in range(config.faculty)],
+        'Faculty_Name': [f"Faculty {i}" for i in range(config.faculty)],
+        'Expertise': expertise,
+        'Max_Load_Per_Week': [20] * config.faculty,
+        'Availability': [
+            json.dumps({d: [p for p in range(1, len(grid.PERIOD_TIMES) + 1) if rng.random() >= config.availability_sparsity]
+                        for d in grid.days})
+            for _ in range(config.faculty)
+        ],
+    }
+    return pd.DataFrame(courses), pd.DataFrame(faculty), pd.DataFrame(rooms), pd.DataFrame(students)
+
+def _apportion(total: int, demand: Dict[str, int]) -> List[str]:
+    """`total` labels split by largest remainder in proportion to `demand`, at least one per label with any demand"""
+    needed = [label for label, amount in demand.items() if amount > 0] or list(demand)
+    counts = {label: 1 if i < total else 0 for i, label in enumerate(needed)}
+    spare = total - sum(counts.values())
+    weight = sum(demand[label] for label in needed) or 1
+    shares = {label: spare * demand[label] / weight for label in needed}
+    for label in needed:
+        counts[label] += int(shares[label])
+    for label in sorted(needed, key=lambda label: shares[label] - int(shares[label]), reverse=True)[:total - sum(counts.values())]:
+        counts[label] += 1
+    return [label for label in needed for _ in range(counts[label])]
+
+def _pack_programmes(pool, credits, sessions, window: Tuple[int, int], periods: int) -> List[List[int]]:
+    """Split `pool` into programmes of window[0]-window[1] credits and at most `periods` sessions.
+
+    Courses that do not complete a programme join one with room for them,
+    or are left without students.
+    """
+    programmes, current, total, busy = [], [], 0, 0
+    for i in pool:
+        if total + credits[i] > window[1] or busy + sessions[i] > periods:
+            continue
+        current.append(i)
+        total, busy = total + credits[i], busy + sessions[i]
+        if total >= window[0]:
+            programmes.append(current)
+            current, total, busy = [], 0, 0
+    for i in current + [i for i in pool if not any(i in p for p in programmes) and i not in current]:
+        for programme in programmes:
+            if (sum(credits[c] for c in programme) + credits[i] <= window[1]
+                    and sum(sessions[c] for c in programme) + sessions[i] <= periods):
+                programme.append(i)
+                break
+    return programmes
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else math.inf
+
+def run_config(config: InstanceConfig, population: int, generations: int, samples: int,
+               constructed_fraction: float = 0.0) -> dict:
+    """Benchmark one instance; returns the config and its metrics as a flat dict"""
+    result = asdict(config)
+
+    started = perf_counter()
+    frames = create_synthetic_data(config)
+    generator = EnhancedGeneticTimetableGenerator(seed=config.seed)
+    generator.population_size = population
+    generator.constructed_fraction = constructed_fraction
+    generator.fitness_cache_bytes = 0  # measure real evaluations
+    generator.MIN_SEMESTER_CREDITS, generator.MAX_SEMESTER_CREDITS = credit_window(config, generator)
+    generator.load_data_from_ui(*frames)
+    evaluator = generator._get_fitness_evaluator()
+    result['load_seconds'] = perf_counter() - started
+    result['genes'] = generator.create_random_chromosome().gene_count
+
+    started = perf_counter()
+    chromosomes = [generator.create_random_chromosome() for _ in range(samples)]
+    result['random_chromosomes_per_second'] = _rate(samples, perf_counter() - started)
+
+    started = perf_counter()
+    constructed = [generator.create_constructed_chromosome() for _ in range(max(samples // 4, 1))]
+    result['constructed_chromosomes_per_second'] = _rate(len(constructed), perf_counter() - started)
+
+    started = perf_counter()
+    generator.calculate_fitness_batch(chromosomes)
+    result['batch_evaluations_per_second'] = _rate(samples, perf_counter() - started)
+
+    fresh = [generator.create_random_chromosome() for _ in range(max(samples // 4, 1))]
+    started = perf_counter()
+    for chromosome in fresh:
+        generator.calculate_fitness(chromosome)
+    result['full_evaluations_per_second'] = _rate(len(fresh), perf_counter() - started)
+
+    # Delta evaluation of the gene changes mutate() makes (derive + score, the work mutate and
+    # calculate_fitness share between them)
+    moves = []
+    for chromosome in fresh:
+        child = generator.mutate(chromosome)
+        changed = np.flatnonzero(np.any(np.stack(child.encoded.columns) != np.stack(chromosome.encoded.columns), axis=0))
+        moves.append((chromosome.fitness_state, chromosome.encoded.take(changed), child.encoded.take(changed)))
+    started = perf_counter()
+    for state, removed, added in moves:
+        evaluator.score(state.derive(removed, added))
+    result['incremental_evaluations_per_second'] = _rate(len(moves), perf_counter() - started)
+
+    # GA until the best timetable has no gene in a hard violation; the progress callback stops
+    # evolve() through its cancel event, as the UI's cancel button does
+    feasible_at = []
+    generator.generations = generations
+    generator.cancel_event = threading.Event()
+
+    def on_generation(generation, total, fitness, hard_violations):
+        conflicted, _ = evaluator.conflicted_genes(evaluator.gene_arrays(generator.current_best))
+        if not conflicted.any():
+            feasible_at.append(generation)
+            generator.cancel_event.set()
+
+    started = perf_counter()
+    best, history = generator.evolve(on_generation)
+    elapsed = perf_counter() - started
+    evaluations = generator.evaluations
+
+    # Peak memory of an initial population plus two generations (tracing slows the GA down ~10x)
+    generator.generations, generator.cancel_event = 2, None
+    tracemalloc.start()
+    generator.evolve()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result['constructed_fraction'] = constructed_fraction
+    result['feasible'] = generator.feasibility_report.feasible
+    result['generations_to_feasibility'] = feasible_at[0] if feasible_at else None
+    result['generations_run'] = len(history)
+    result['ga_seconds'] = elapsed
+    result['ga_evaluations_per_second'] = _rate(evaluations, elapsed)
+    result['best_penalty'] = best.penalty_score
+    result['best_conflicted_genes'] = int(evaluator.conflicted_genes(evaluator.gene_arrays(best))[0].sum())
+    result['peak_memory_mb'] = peak / 2**20
+    return result
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the timetable GA on synthetic instances")
+    parser.add_argument("--preset", nargs="+", choices=sorted(PRESETS), default=['tiny', 'small'],
+                        help="Instance presets to run")
+    parser.add_argument("--courses", type=int, help="Custom instance: number of courses")
+    parser.add_argument("--faculty", type=int, default=40)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--semesters", type=int, default=2)
+    parser.add_argument("--split-ratio", type=float, default=0.2)
+    parser.add_argument("--sparsity", type=float, default=0.1, help="Share of unavailable faculty periods")
+    parser.add_argument("--population", type=int, default=50)
+    parser.add_argument("--generations", type=int, default=100, help="Cap on generations to feasibility")
+    parser.add_argument("--constructed-fraction", type=float, default=0.0,
+                        help="Share of the GA's initial population built by the greedy constructor")
+    parser.add_argument("--samples", type=int, default=50, help="Chromosomes per throughput measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json", help="Results JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    configs = [PRESETS[name] for name in args.preset]
+    if args.courses:
+        configs = [InstanceConfig(
+            'custom', courses=args.courses, faculty=args.faculty, rooms=args.rooms, students=args.students,
+            semesters=args.semesters, split_ratio=args.split_ratio, availability_sparsity=args.sparsity
+        )]
+
+    results = []
+    for config in configs:
+        config = InstanceConfig(**{**asdict(config), 'seed': args.seed})
+        logger.info(f"Running {config.name}")
+        result = run_config(config, args.population, args.generations, args.samples, args.constructed_fraction)
+        logger.info(
+            f"{config.name}: {result['batch_evaluations_per_second']:.1f} batch eval/s, "
+            f"{result['random_chromosomes_per_second']:.1f} chromosomes/s, "
+            f"feasible at {result['generations_to_feasibility']}, peak {result['peak_memory_mb']:.1f} MB"
+        )
+        results.append(result)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'population': args.population,
+            'generations': args.generations,
+            'results': results,
+        }, f, indent=2)
+    print(f"Wrote {len(results)} result(s) to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""Headless timetable generation for batch jobs.
+
+Run from the Server directory:
+
+    python -m cli --courses courses.csv --faculty faculty.csv \
+        --rooms rooms.csv --students students.csv --output timetable.csv
+
+The CSV (or .parquet) files use the same columns as the Streamlit upload
+(Course_ID, ...).
+The best timetable is written as one row per session, and its fitness
+history as JSON next to it (or to --history).
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from dataclasses import asdict
+from datetime import date
+
+from export import FORMATS, export_timetables
+from index import (
+    EnhancedGeneticTimetableGenerator, JsonlEventSink, PrometheusTextfileSink, create_nep2020_sample_data
+)
+
+logger = logging.getLogger('cli')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a NEP 2020 timetable without the Streamlit UI")
+    data = parser.add_argument_group("input data")
+    data.add_argument("--courses", help="Courses CSV or Parquet")
+    data.add_argument("--faculty", help="Faculty CSV or Parquet")
+    data.add_argument("--rooms", help="Rooms CSV or Parquet")
+    data.add_argument("--students", help="Students CSV or Parquet")
+    data.add_argument("--sample", action="store_true", help="Use the built-in NEP 2020 sample data")
+
+    parser.add_argument("--output", default="timetable.csv", help="Best timetable CSV (default: timetable.csv)")
+    parser.add_argument("--history", help="Fitness history JSON (default: <output>.history.json)")
+    parser.add_argument("--export-zip", help="Also write every student, faculty and room timetable into this zip")
+    parser.add_argument("--export-formats", nargs="+", choices=FORMATS, default=list(FORMATS),
+                        help="File formats in the --export-zip archive")
+    parser.add_argument("--semester-start", type=date.fromisoformat,
+                        help="First week of the calendar (.ics) events, YYYY-MM-DD (default: this week)")
+    parser.add_argument("--population", type=int, default=100, help="Population size")
+    parser.add_argument("--generations", type=int, default=500, help="Maximum generations")
+    parser.add_argument("--seed", type=int, help="Random seed for a reproducible run")
+    parser.add_argument("--workers", type=int, default=1, help="Fitness worker processes (0 = one per CPU)")
+    parser.add_argument("--fitness-mode", choices=['batch', 'incremental'], default='batch',
+                        help="Score whole generations (faster for the GA) or per-child deltas")
+    parser.add_argument("--islands", type=int, default=0, help="Run the island model with this many islands")
+    parser.add_argument("--migration-interval", type=int, default=10, help="Generations between island migrations")
+    parser.add_argument("--decompose", action="store_true",
+                        help="Solve courses that share no faculty, rooms or students as separate sub-instances")
+    parser.add_argument("--reschedule", metavar="TIMETABLE_CSV",
+                        help="Adapt this earlier timetable to the input data, changing as few sessions as possible")
+    parser.add_argument("--disruption-weight", type=int, default=1000,
+                        help="Penalty per session changed from the --reschedule timetable")
+    parser.add_argument("--feasibility", choices=['warn', 'refuse', 'off'], default='warn',
+                        help="Before evolving, warn about or refuse instances that cannot reach zero hard violations")
+    parser.add_argument("--check-feasibility", action="store_true",
+                        help="Only print the capacity bounds of the data (exit status 1 if provably infeasible)")
+    parser.add_argument("--max-seconds", type=float, default=0, help="Wall-clock limit for the GA (0 = none)")
+    parser.add_argument("--max-evaluations", type=int, default=0, help="Fitness evaluation budget (0 = none)")
+    parser.add_argument("--stagnation", type=int, default=0, help="Stop after this many generations without improvement (0 = never)")
+    parser.add_argument("--adaptive", action="store_true", help="Diversity-driven mutation/crossover rates")
+    parser.add_argument("--polish-seconds", type=float, default=0, help="Simulated annealing time on the best timetable")
+    parser.add_argument("--cache-mb", type=float, default=64, help="Fitness cache memory cap in MB (0 disables it)")
+    parser.add_argument("--no-repair", action="store_true", help="Score children as bred, without the conflict repair step")
+    parser.add_argument("--checkpoint", help="Write the GA state to this .npz file periodically")
+    parser.add_argument("--checkpoint-interval", type=int, default=25, help="Generations between checkpoints")
+    parser.add_argument("--resume", help="Continue the run saved in this checkpoint (same data and settings)")
+    parser.add_argument("--events-jsonl", help="Append per-generation timing events to this JSONL file")
+    parser.add_argument("--prometheus", help="Keep run metrics in this Prometheus textfile-collector file")
+    parser.add_argument("--profile", action="store_true", help="Time each constraint family (on with any event output)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log progress every 10 generations")
+    args = parser.parse_args(argv)
+
+    files = [args.courses, args.faculty, args.rooms, args.students]
+    if not args.sample and not all(files):
+        parser.error("--courses, --faculty, --rooms and --students are required unless --sample is given")
+    if (args.islands > 1 or args.decompose) and (args.checkpoint or args.resume):
+        parser.error("--checkpoint and --resume are not supported with --islands or --decompose")
+    if args.islands > 1 and args.decompose:
+        parser.error("--islands and --decompose cannot be combined")
+    if args.reschedule and (args.islands > 1 or args.decompose or args.resume):
+        parser.error("--reschedule cannot be combined with --islands, --decompose or --resume")
+    return args
+
+def load_generator(args) -> EnhancedGeneticTimetableGenerator:
+    generator = EnhancedGeneticTimetableGenerator(seed=args.seed)
+    generator.population_size = args.population
+    generator.generations = args.generations
+    generator.fitness_workers = args.workers
+    generator.fitness_mode = args.fitness_mode
+    generator.repair_children = not args.no_repair
+    generator.fitness_cache_bytes = int(args.cache_mb * 2**20)
+    generator.polish_seconds = args.polish_seconds
+    generator.adaptive_rates = args.adaptive
+    generator.max_seconds = args.max_seconds
+    generator.max_evaluations = args.max_evaluations
+    generator.stagnation_generations = args.stagnation
+    generator.profile_constraints = args.profile
+    generator.checkpoint_path = args.checkpoint
+    generator.checkpoint_interval = args.checkpoint_interval
+    generator.disruption_weight = args.disruption_weight
+    generator.feasibility_check = args.feasibility
+    if args.events_jsonl:
+        generator.event_sinks.append(JsonlEventSink(args.events_jsonl))
+    if args.prometheus:
+        generator.event_sinks.append(PrometheusTextfileSink(args.prometheus))
+
+    if args.sample:
+        generator.load_data_from_ui(*create_nep2020_sample_data())
+    else:
+        generator.load_data_from_files(args.courses, args.faculty, args.rooms, args.students)
+    return generator
+
+def write_timetable(path, records):
+    fieldnames = list(records[0]) if records else ['Day', 'Period', 'Course_ID']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(records)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    generator = load_generator(args)
+    if args.check_feasibility:
+        report = generator.check_feasibility()
+        for bound in sorted(report.bounds, key=lambda b: b.utilization, reverse=True):
+            status = 'VIOLATED' if bound.violated else 'ok'
+            print(f"{status:8} {bound.utilization:6.2f}  {bound.message}{'' if bound.hard else ' (soft)'}")
+        print(f"{'Feasible' if report.feasible else 'Infeasible'} as far as these bounds go ({report.seconds * 1000:.1f} ms)")
+        return 0 if report.feasible else 1
+
+    def callback(gen, total, fit, viol):
+        if (gen + 1) % 10 == 0 or gen + 1 == total:
+            logger.info(f"Gen {gen+1}/{total}, Fitness: {fit:.3f}, Violations: {viol}")
+
+    island_histories, component_histories = [], []
+    try:
+        if args.islands > 1:
+            best, history, island_histories = generator.evolve_islands(
+                n_islands=args.islands, migration_interval=args.migration_interval, progress_callback=callback
+            )
+        elif args.decompose:
+            best, component_histories = generator.evolve_decomposed(
+                lambda i, n, fit, viol: logger.info(f"Component {i+1}/{n} done, Fitness: {fit:.3f}, Violations: {viol}")
+            )
+            history = []
+        elif args.reschedule:
+            with open(args.reschedule, newline='') as f:
+                previous = generator.chromosome_from_records(list(csv.DictReader(f)))
+            best, history = generator.reschedule(previous, callback)
+        else:
+            best, history = generator.evolve(callback, resume_from=args.resume)
+    except ValueError as e:
+        report = generator.feasibility_report
+        if args.feasibility != 'refuse' or report is None or report.feasible:
+            raise
+        print(e, file=sys.stderr)
+        return 1
+
+    write_timetable(args.output, generator.timetable_records(best))
+    if args.export_zip:
+        counts = export_timetables(args.export_zip, generator, best, args.export_formats, args.semester_start)
+        logger.info(f"Exported {', '.join(f'{n} {kind}' for kind, n in counts.items())} timetables to {args.export_zip}")
+    history_path = args.history or os.path.splitext(args.output)[0] + '.history.json'
+    with open(history_path, 'w') as f:
+        json.dump({
+            'seed': args.seed,
+            'stop_reason': generator.stop_reason,
+            'evaluations': generator.evaluations,
+            'fitness': best.fitness,
+            'hard_violations': best.hard_violations,
+            'soft_violations': best.soft_violations,
+            'penalty_score': best.penalty_score,
+            'reward_score': best.reward_score,
+            'disruption_penalty': best.disruption_penalty,
+            'best_fitness_history': history,
+            'repairs_per_generation': generator.repair_history,
+            'fitness_cache': generator.cache_history,
+            'polish_history': generator.polish_history,
+            'rate_history': generator.rate_history,
+            'island_histories': island_histories,
+            'component_histories': component_histories,
+            'timing_report': generator.run_report,
+            'feasibility_issues': [asdict(issue) for issue in generator.feasibility_report.issues]
+            if generator.feasibility_report else [],
+        }, f, indent=2)
+
+    print(
+        f"Fitness {best.fitness:.3f}, hard violations {best.hard_violations}, "
+        f"soft violations {best.soft_violations} (stopped: {generator.stop_reason}): "
+        f"wrote {args.output} and {history_path}"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
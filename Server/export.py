@@ -0,0 +1,276 @@
+"""Bulk export of individual timetables for publishing.
+
+Every student, faculty member and room gets its own timetable, written
+as CSV, XLSX and/or iCalendar files into one zip archive:
+
+    from export import export_timetables
+    export_timetables('timetables.zip', generator, best)
+
+or from the command line with `python -m cli ... --export-zip timetables.zip`.
+
+Sessions are indexed once per chromosome (by faculty, room and course
+group). Each student's timetable is then assembled from their enrollments
+while the archive is written, and every file is compressed into the
+archive before the next is started. File contents never accumulate: apart
+from the session index, memory only grows by the zip directory entry of
+each file (under 1 KB).
+"""
+import csv
+import hashlib
+import io
+import re
+import zipfile
+from collections import defaultdict
+from functools import lru_cache
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from index import EnhancedGeneticTimetableGenerator, TimetableChromosome
+
+COLUMNS = ('Day', 'Period', 'Start_Time', 'End_Time', 'Course_ID', 'Course_Name',
+           'Faculty_ID', 'Faculty_Name', 'Room_ID', 'Room_Name', 'Student_Group')
+FORMATS = ('csv', 'xlsx', 'ics')
+
+class TimetableIndex:
+    """Session rows of one chromosome with gene positions indexed by faculty, room and (course, group)"""
+
+    def __init__(self, generator: EnhancedGeneticTimetableGenerator, chromosome: TimetableChromosome):
+        course_dict = {c.id: c for c in generator.courses}
+        faculty_dict = {f.id: f for f in generator.faculty}
+        room_dict = {r.id: r for r in generator.rooms}
+        timeslot_order = {t.id: i for i, t in enumerate(generator.timeslots)}
+
+        self.generator = generator
+        self.rows = []  # one COLUMNS tuple per session
+        self.slots = []  # timeslot index per session
+        self.by_faculty = defaultdict(list)
+        self.by_room = defaultdict(list)
+        self.by_course_group = defaultdict(list)
+        for gene in chromosome.genes:
+            order = timeslot_order.get(gene.timeslot_id)
+            if order is None:
+                continue
+            timeslot = generator.timeslots[order]
+            course = course_dict.get(gene.course_id)
+            faculty = faculty_dict.get(gene.faculty_id)
+            room = room_dict.get(gene.room_id) if gene.room_id else None
+            position = len(self.rows)
+            self.rows.append((
+                timeslot.day, timeslot.period_number, timeslot.start_time, timeslot.end_time,
+                gene.course_id, course.name if course else '',
+                gene.faculty_id, faculty.name if faculty else '',
+                gene.room_id, room.name if room else 'Off-campus',
+                gene.student_group,
+            ))
+            self.slots.append(order)
+            self.by_faculty[gene.faculty_id].append(position)
+            if gene.room_id:
+                self.by_room[gene.room_id].append(position)
+            self.by_course_group[gene.course_id, gene.student_group].append(position)
+
+    def sessions(self, positions: Iterable[int]) -> List[tuple]:
+        """Rows of the given sessions in timeslot order"""
+        return [self.rows[p] for p in sorted(positions, key=self.slots.__getitem__)]
+
+    def student_sessions(self, student) -> List[tuple]:
+        """Rows of a student's sessions: their group of every enrolled course"""
+        positions = []
+        for course_id in student.enrolled_courses:
+            positions.extend(self.by_course_group.get((course_id, student.course_groups.get(course_id, 1)), ()))
+        return self.sessions(positions)
+
+    def timetables(self) -> Iterator[Tuple[str, str, str, List[tuple]]]:
+        """(kind, id, name, session rows) for every student, faculty member and room, one at a time"""
+        for student in self.generator.students:
+            yield 'students', student.id, student.name, self.student_sessions(student)
+        for faculty in self.generator.faculty:
+            yield 'faculty', faculty.id, faculty.name, self.sessions(self.by_faculty.get(faculty.id, ()))
+        for room in self.generator.rooms:
+            yield 'rooms', room.id, room.name, self.sessions(self.by_room.get(room.id, ()))
+
+def write_csv(stream, rows: Iterable[Sequence]):
+    """Header plus one line per session to a binary stream"""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(COLUMNS)
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+def _column_letter(index: int) -> str:
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+COLUMN_LETTERS = [_column_letter(c) for c in range(len(COLUMNS))]
+
+def _xlsx_sheet(rows: Iterable[Sequence]) -> Iterator[str]:
+    """Worksheet XML, one row at a time (numbers as numbers, everything else as inline strings)"""
+    yield ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+    for r, row in enumerate(rows, 1):
+        cells = []
+        for letter, value in zip(COLUMN_LETTERS, row):
+            ref = f"{letter}{r}"
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{escape(str(value))}</t></is></c>')
+        yield f'<row r="{r}">{"".join(cells)}</row>'
+    yield '</sheetData></worksheet>'
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/></Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Timetable" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/></Relationships>'
+    ),
+}
+
+def _write_entry(archive: zipfile.ZipFile, name: str, text: str):
+    """Text entry with the fixed 1980 timestamp of archive.open(), unlike writestr() which stamps the current time"""
+    with archive.open(name, 'w') as stream:
+        stream.write(text.encode('utf-8'))
+
+def write_xlsx(stream, rows: Iterable[Sequence]):
+    """Single-sheet workbook to a binary stream (plain OOXML, no spreadsheet library needed)"""
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        for name, xml in XLSX_PARTS.items():
+            _write_entry(workbook, name, xml)
+        _write_entry(workbook, 'xl/worksheets/sheet1.xml', ''.join(_xlsx_sheet([COLUMNS, *rows])))
+
+def _ics_text(value) -> str:
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+def _ics_fold(line: str) -> str:
+    """RFC 5545 line folding at 75 octets"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # never split a UTF-8 sequence
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+@lru_cache(maxsize=None)
+def _clock(text: str):
+    return datetime.strptime(text, '%H:%M').time()
+
+def ics_lines(rows: Iterable[Sequence], calendar_name: str, uid_prefix: str, days: List[str],
+              semester_start: date, weeks: int, stamp: Optional[datetime] = None) -> Iterator[str]:
+    """iCalendar lines: one weekly recurring event per session for `weeks` weeks from `semester_start`"""
+    stamp = (stamp or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield 'BEGIN:VCALENDAR\r\n'
+    yield 'VERSION:2.0\r\n'
+    yield 'PRODID:-//NEP 2020 Timetable//EN\r\n'
+    yield _ics_fold(f"X-WR-CALNAME:{_ics_text(calendar_name)}")
+    for i, row in enumerate(rows):
+        record = dict(zip(COLUMNS, row))
+        day = semester_start + timedelta(days=days.index(record['Day']) if record['Day'] in days else 0)
+        start, end = _clock(record['Start_Time']), _clock(record['End_Time'])
+        summary = record['Course_Name'] or record['Course_ID']
+        if record['Student_Group'] > 1:
+            summary += f" (Group {record['Student_Group']})"
+        yield 'BEGIN:VEVENT\r\n'
+        yield _ics_fold(f"UID:{_ics_text(uid_prefix)}-{i}@timetable")
+        yield f"DTSTAMP:{stamp}\r\n"
+        yield f"DTSTART:{datetime.combine(day, start):%Y%m%dT%H%M%S}\r\n"
+        yield f"DTEND:{datetime.combine(day, end):%Y%m%dT%H%M%S}\r\n"
+        yield f"RRULE:FREQ=WEEKLY;COUNT={weeks}\r\n"
+        yield _ics_fold(f"SUMMARY:{_ics_text(summary)}")
+        yield _ics_fold(f"LOCATION:{_ics_text(record['Room_Name'])}")
+        yield _ics_fold(f"DESCRIPTION:{_ics_text(record['Course_ID'] + ', ' + record['Faculty_Name'])}")
+        yield 'END:VEVENT\r\n'
+    yield 'END:VCALENDAR\r\n'
+
+def _file_name(value: str) -> str:
+    return re.sub(r'[^\w.-]', '_', value) or '_'
+
+def _unique_file_name(value: str, taken: set) -> str:
+    """_file_name(value), with a short hash of `value` appended when another id already took that name"""
+    name = _file_name(value)
+    if name.lower() in taken:  # lower(): also distinct on case-insensitive file systems
+        name = base = f"{name}-{hashlib.sha1(value.encode('utf-8')).hexdigest()[:8]}"
+        suffix = 2
+        while name.lower() in taken:
+            name, suffix = f"{base}-{suffix}", suffix + 1
+    taken.add(name.lower())
+    return name
+
+def export_timetables(target, generator: EnhancedGeneticTimetableGenerator, chromosome: TimetableChromosome,
+                      formats: Sequence[str] = FORMATS, semester_start: Optional[date] = None) -> Dict[str, int]:
+    """Write every student, faculty and room timetable into the zip archive `target` (path or binary file).
+
+    Files are named <kind>/<id>.<format>, next to the combined
+    timetable.csv; an id whose file name another id already took gets a
+    short hash suffix. Every entry has the same fixed timestamp and the
+    calendars are stamped with the semester start, so equal timetables
+    give identical archives. Calendar events repeat weekly for TOTAL_SEMESTER_WEEKS
+    from the week of `semester_start` (default: the current week), with
+    the generator's first day on that week's Monday. Returns the number of
+    files written per kind.
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export formats: {', '.join(sorted(unknown))}")
+    semester_start = semester_start or date.today()
+    semester_start -= timedelta(days=semester_start.weekday())
+    stamp = datetime.combine(semester_start, datetime.min.time(), timezone.utc)
+
+    index = TimetableIndex(generator, chromosome)
+    counts = defaultdict(int)
+    taken = defaultdict(set)  # file names used per kind
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('timetable.csv', 'w') as stream:
+            write_csv(stream, index.sessions(range(len(index.rows))))
+        for kind, entity_id, name, rows in index.timetables():
+            file_name = _unique_file_name(entity_id, taken[kind])
+            base = f"{kind}/{file_name}"
+            if 'csv' in formats:
+                with archive.open(f"{base}.csv", 'w') as stream:
+                    write_csv(stream, rows)
+            if 'xlsx' in formats:
+                with archive.open(f"{base}.xlsx", 'w') as stream:
+                    write_xlsx(stream, rows)
+            if 'ics' in formats:
+                _write_entry(archive, f"{base}.ics", ''.join(ics_lines(
+                    rows, f"{name} ({entity_id})", f"{kind}-{file_name}", generator.days,
+                    semester_start, generator.TOTAL_SEMESTER_WEEKS, stamp
+                )))
+            counts[kind] += 1
+    return dict(counts)
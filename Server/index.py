@@ -1,16 +1,29 @@
-import streamlit as st
-import pandas as pd
 import numpy as np
 import random
 from datetime import datetime, time
-import plotly.express as px
-import plotly.graph_objects as go
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import List, Dict, Tuple, Optional
+import copy
+import hashlib
 import io
 import json
+import logging
 import math
-from collections import defaultdict
+import multiprocessing
+import operator
+import os
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import reduce
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from time import monotonic, perf_counter
+
+# Streamlit and pandas are imported by the functions that need them, so the
+# generator can run headless (see cli.py). Engine errors go to this logger;
+# the Streamlit app forwards them to st.warning/st.error.
+logger = logging.getLogger(__name__)
 
 # Enhanced Data Models for NEP 2020
 @dataclass
@@ -54,7 +67,7 @@ class Student:
 class TimeSlot:
     id: str
     day: str
-    period_number: int  # 1-7 periods per day
+    period_number: int  # 1..len(PERIOD_TIMES) within the day
     start_time: str
     end_time: str
     duration_minutes: int = 60
@@ -67,34 +80,1139 @@ class Gene:
     room_id: str
     student_group: int = 1  # For splitting
 
+class GeneCodec:
+    """Interned integer ids for the courses, timeslots, faculty and rooms of a data load"""
+
+    def __init__(self, courses, timeslots, faculty, rooms):
+        self.course_ids = [c.id for c in courses]
+        self.slot_ids = [t.id for t in timeslots]
+        self.faculty_ids = [f.id for f in faculty]
+        self.room_ids = [r.id for r in rooms]
+        self.course_index = {cid: i for i, cid in enumerate(self.course_ids)}
+        self.slot_index = {tid: i for i, tid in enumerate(self.slot_ids)}
+        self.faculty_index = {fid: i for i, fid in enumerate(self.faculty_ids)}
+        self.room_index = {rid: i for i, rid in enumerate(self.room_ids)}
+        largest = max(len(self.course_ids), len(self.slot_ids), len(self.faculty_ids), len(self.room_ids))
+        self.dtype = np.int16 if largest < np.iinfo(np.int16).max else np.int32
+
+    def encode(self, genes: List[Gene]) -> Optional['GeneArrays']:
+        """Array storage for `genes`, or None if any id is unknown"""
+        n = len(genes)
+        try:
+            return GeneArrays(
+                self,
+                np.fromiter((self.course_index[g.course_id] for g in genes), self.dtype, n),
+                np.fromiter((self.slot_index[g.timeslot_id] for g in genes), self.dtype, n),
+                np.fromiter((self.faculty_index[g.faculty_id] for g in genes), self.dtype, n),
+                np.fromiter((self.room_index[g.room_id] if g.room_id else -1 for g in genes), self.dtype, n),
+                np.fromiter((g.student_group for g in genes), self.dtype, n),
+            )
+        except (KeyError, OverflowError):
+            return None
+
+class GeneArrays:
+    """Struct-of-arrays gene storage: one interned int column per Gene field.
+
+    Columns are read-only so chromosomes can share them: slices are views,
+    and `with_changes` copies only the columns it modifies. Room -1 means no
+    room; `group` holds the Gene.student_group number.
+    """
+
+    __slots__ = ('codec', 'course', 'slot', 'faculty', 'room', 'group')
+    COLUMNS = ('course', 'slot', 'faculty', 'room', 'group')
+
+    def __init__(self, codec: GeneCodec, course, slot, faculty, room, group):
+        self.codec = codec
+        for name, column in zip(self.COLUMNS, (course, slot, faculty, room, group)):
+            column = np.asarray(column, dtype=codec.dtype)
+            column.setflags(write=False)
+            setattr(self, name, column)
+
+    def __len__(self):
+        return len(self.course)
+
+    @property
+    def columns(self):
+        return tuple(getattr(self, name) for name in self.COLUMNS)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns)
+
+    def slice(self, start: int, stop: int) -> 'GeneArrays':
+        return GeneArrays(self.codec, *(column[start:stop] for column in self.columns))
+
+    def take(self, indices) -> 'GeneArrays':
+        return GeneArrays(self.codec, *(column[indices] for column in self.columns))
+
+    @staticmethod
+    def concat(parts: List['GeneArrays']) -> 'GeneArrays':
+        return GeneArrays(
+            parts[0].codec, *(np.concatenate([getattr(p, name) for p in parts]) for name in GeneArrays.COLUMNS)
+        )
+
+    def with_changes(self, **changes: Dict[int, int]) -> 'GeneArrays':
+        """Copy-on-write update: `changes` maps column name -> {gene index: new value}"""
+        columns = []
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            updates = changes.get(name)
+            if updates:
+                column = column.copy()
+                column[list(updates)] = list(updates.values())
+            columns.append(column)
+        return GeneArrays(self.codec, *columns)
+
+    def to_genes(self) -> List[Gene]:
+        codec = self.codec
+        return [
+            Gene(
+                course_id=codec.course_ids[c],
+                timeslot_id=codec.slot_ids[t],
+                faculty_id=codec.faculty_ids[f],
+                room_id=codec.room_ids[r] if r >= 0 else '',
+                student_group=g
+            )
+            for c, t, f, r, g in zip(*(column.tolist() for column in self.columns))
+        ]
+
+class SlotGrid:
+    """Bitset bookings of faculty, rooms or students on the weekly timeslot grid.
+
+    Every row is a Python int with bit i set while slot i is booked, so a
+    row is one int whatever the grid size: overlap is AND, free slots are
+    the bits left in ~busy & full and come out of a bit scan. Cells booked
+    more than once keep their count in `extra`, so releasing one booking of
+    a double-booked cell leaves it busy. The same bit layout gives per-day
+    words, whose runs of consecutive periods come from shift-and.
+    """
+
+    DAY_BITS = 64  # day_words() holds a day in at most one uint64
+
+    def __init__(self, n_slots: int, n_rows: int, rows: Optional[np.ndarray] = None, slots: Optional[np.ndarray] = None):
+        """`n_rows` empty rows, with one booking per (rows[i], slots[i]) pair if given"""
+        self.n_slots = n_slots
+        self.full = (1 << n_slots) - 1  # every slot of the grid
+        self.words = [0] * n_rows
+        self.extra = {}
+        self.multiplicity = np.zeros(0, dtype=np.int64)  # bookings of each initial pair's cell
+        if rows is not None and len(rows):
+            cells, inverse, counts = np.unique(rows * n_slots + slots, return_inverse=True, return_counts=True)
+            for cell in cells.tolist():
+                self.words[cell // n_slots] |= 1 << cell % n_slots
+            shared = counts > 1
+            self.extra = dict(zip(cells[shared].tolist(), counts[shared].tolist()))
+            self.multiplicity = counts[inverse.reshape(-1)]
+
+    @staticmethod
+    def from_mask(occupied: np.ndarray) -> List[int]:
+        """[rows, n_slots] bool -> one bitset per row"""
+        packed = np.packbits(np.asarray(occupied, dtype=bool), axis=-1, bitorder='little')
+        return [int.from_bytes(row.tobytes(), 'little') for row in packed.reshape(len(occupied), -1)]
+
+    def count(self, row: int, slot: int) -> int:
+        if not self.words[row] >> slot & 1:
+            return 0
+        return self.extra.get(row * self.n_slots + slot, 1)
+
+    def book(self, row: int, slot: int):
+        count = self.count(row, slot)
+        if count:
+            self.extra[row * self.n_slots + slot] = count + 1
+        else:
+            self.words[row] |= 1 << slot
+
+    def release(self, row: int, slot: int):
+        cell = row * self.n_slots + slot
+        count = self.extra.pop(cell, 1)
+        if count > 2:
+            self.extra[cell] = count - 1
+        elif count == 1:
+            self.words[row] &= ~(1 << slot)
+
+    def union(self, rows) -> int:
+        """Slots where any of the rows is booked"""
+        return reduce(operator.or_, map(self.words.__getitem__, rows), 0)
+
+    @staticmethod
+    def column_counts(bitsets: List[int], n_slots: int) -> np.ndarray:
+        """[n_slots] number of the bitsets with each slot set"""
+        n_bytes = max(-(-n_slots // 8), 1)
+        octets = np.frombuffer(b''.join(bits.to_bytes(n_bytes, 'little') for bits in bitsets), dtype=np.uint8)
+        bits = np.unpackbits(octets.reshape(len(bitsets), n_bytes), axis=-1, bitorder='little')
+        return bits[:, :n_slots].sum(axis=0, dtype=np.int64)
+
+    @staticmethod
+    def slots(bits: int) -> List[int]:
+        """Ascending slots of the set bits (bit scan)"""
+        slots = []
+        while bits:
+            lowest = bits & -bits
+            slots.append(lowest.bit_length() - 1)
+            bits ^= lowest
+        return slots
+
+    @staticmethod
+    def popcount(bits: int) -> int:
+        return bin(bits).count('1')
+
+    @staticmethod
+    def day_words(occupied: np.ndarray) -> np.ndarray:
+        """[..., periods] bool -> one word per day with bit p set for period p (the narrowest uint that fits)"""
+        periods = occupied.shape[-1]
+        dtype = next(t for t in (np.uint8, np.uint16, np.uint32, np.uint64) if np.iinfo(t).bits >= periods)
+        weights = np.left_shift(dtype(1), np.arange(periods, dtype=dtype))
+        return np.asarray(occupied, dtype=bool).view(np.uint8) @ weights
+
+    @staticmethod
+    def longest_runs(day_words: np.ndarray) -> np.ndarray:
+        """Longest run of consecutive set bits per word: w & (w >> 1) until nothing is left"""
+        longest = np.zeros(day_words.shape, dtype=np.uint8)  # run k is non-empty only if run k - 1 was
+        run = day_words
+        while True:
+            remaining = run != 0
+            if not remaining.any():
+                return longest.astype(np.int64)
+            longest += remaining
+            run = run & (run >> 1)
+
 class TimetableChromosome:
-    def __init__(self, genes: List[Gene]):
-        self.genes = genes
+    def __init__(self, genes: Optional[List[Gene]] = None, encoded: Optional[GeneArrays] = None):
+        self._genes = genes if genes is not None or encoded is not None else []
+        self.encoded = encoded  # array storage used by the GA operators
         self.fitness = 0.0
         self.hard_violations = 0
         self.soft_violations = 0
         self.penalty_score = 0
         self.reward_score = 0
+        self.disruption_penalty = 0  # reschedule(): penalty for assignments changed from the previous timetable
+        self.fitness_state = None  # FitnessState kept in sync by the GA operators
+        self.conflicts = None  # (conflicted gene mask, [students, slots] counts) for conflict-targeted mutation
+
+    @property
+    def genes(self) -> List[Gene]:
+        """Gene objects, decoded from the array storage on first access"""
+        if self._genes is None:
+            self._genes = self.encoded.to_genes()
+        return self._genes
+
+    @property
+    def gene_count(self) -> int:
+        return len(self.encoded) if self.encoded is not None else len(self._genes)
+
+class SharedRows:
+    """Per-entity table (one row per student, say) stored as copy-on-write row blocks.
+
+    Blocks are never written in place: `put` and `add` replace the blocks
+    they touch with fresh copies. `copy` therefore only copies the block
+    list, and a derived FitnessState shares every block its update leaves
+    alone.
+    """
+
+    BLOCK = 32  # rows per block
+
+    def __init__(self, array: np.ndarray):
+        self.shape, self.dtype = array.shape, array.dtype
+        n_blocks = -(-len(array) // self.BLOCK)
+        padded = np.zeros((n_blocks * self.BLOCK,) + array.shape[1:], dtype=array.dtype)
+        padded[:len(array)] = array
+        self.blocks = [padded[i:i + self.BLOCK] for i in range(0, len(padded), self.BLOCK)]
+
+    def copy(self) -> 'SharedRows':
+        shared = SharedRows.__new__(SharedRows)
+        shared.shape, shared.dtype, shared.blocks = self.shape, self.dtype, list(self.blocks)
+        return shared
+
+    def array(self) -> np.ndarray:
+        """The whole table as one array"""
+        return np.concatenate(self.blocks)[:self.shape[0]]
+
+    def _gather(self, rows):
+        """(block ids, copies of those blocks stacked, stacked position and row within block of every row)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        block = rows // self.BLOCK
+        ids = np.flatnonzero(np.bincount(block.reshape(-1), minlength=len(self.blocks)))
+        if not len(ids):
+            return ids, np.zeros((0, self.BLOCK) + self.shape[1:], dtype=self.dtype), block, block
+        position = np.zeros(len(self.blocks), dtype=np.int64)
+        position[ids] = np.arange(len(ids))
+        stacked = np.array([self.blocks[b] for b in ids.tolist()])
+        return ids, stacked, position[block], rows % self.BLOCK
+
+    def get(self, rows, *index) -> np.ndarray:
+        """Values at [rows, *index], with the broadcasting of numpy fancy indexing"""
+        _, stacked, position, local = self._gather(rows)
+        return stacked[(position, local) + index]
+
+    def _replace(self, ids, stacked):
+        for i, b in enumerate(ids.tolist()):
+            self.blocks[b] = stacked[i]
+
+    def put(self, values, rows, *index) -> np.ndarray:
+        """Set the (distinct) cells at [rows, *index]; returns their values before"""
+        ids, stacked, position, local = self._gather(rows)
+        cells = (position, local) + index
+        before = stacked[cells].astype(np.int64)
+        stacked[cells] = values
+        self._replace(ids, stacked)
+        return before
+
+    def add(self, delta, rows, *index) -> np.ndarray:
+        """Add `delta` to the (distinct) cells at [rows, *index]; returns their values before"""
+        ids, stacked, position, local = self._gather(rows)
+        cells = (position, local) + index
+        before = stacked[cells].astype(np.int64)
+        stacked[cells] = before + delta
+        self._replace(ids, stacked)
+        return before
+
+class FitnessState:
+    """Occupancy counters and partial scores for one chromosome.
+
+    States are never modified once scored: `derive` returns a new state, so
+    parents, elites and children can safely share them. Per-entity tables
+    of students are SharedRows, so a derived state only copies the student
+    rows its genes touch.
+    """
+
+    SHARED = ('student_counts', 'student_day_pen', 'student_day_rew')  # [students, ...] tables
+    COPIED = ('faculty_counts', 'room_counts', 'slot_counts', 'course_periods', 'faculty_pen', 'faculty_rew',
+              'course_pen')  # small per-faculty, room, slot and course tables
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+
+    def derive(self, removed: GeneArrays, added: GeneArrays) -> 'FitnessState':
+        """State of the chromosome with the `removed` genes swapped for the `added` ones"""
+        state = FitnessState(self.evaluator)
+        for name in self.SHARED + self.COPIED:
+            setattr(state, name, getattr(self, name).copy())
+        for name in ('faculty_overlaps', 'room_overlaps', 'student_overlaps', 'gene_pen', 'gene_rew',
+                     'faculty_pen_total', 'faculty_rew_total', 'student_day_pen_total',
+                     'student_day_rew_total', 'course_pen_total'):
+            setattr(state, name, getattr(self, name))
+        self.evaluator.update(state, self.evaluator.columns(removed), self.evaluator.columns(added))
+        return state
+
+class FitnessCache:
+    """Bounded LRU map from a chromosome digest to its (penalty, reward) score.
+
+    Keys hash the GeneArrays columns, so an identical timetable hits the
+    same entry whichever operator produced it. Entries belong to one data
+    load (`signature`) and stay in the process that scored them.
+    """
+
+    ENTRY_BYTES = 270  # digest, (penalty, reward) tuple and OrderedDict slot; tests/test_fitness_cache.py measures it
+
+    def __init__(self, max_bytes: int, signature=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max(max_bytes // self.ENTRY_BYTES, 0)
+        self.signature = signature
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __reduce__(self):
+        return (FitnessCache, (self.max_bytes, self.signature))
+
+    @staticmethod
+    def key(arrays: GeneArrays) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for column in arrays.columns:
+            digest.update(np.ascontiguousarray(column).tobytes())
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[Tuple[int, int]]:
+        score = self.entries.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, key: bytes, score: Tuple[int, int]):
+        if not self.max_entries:
+            return
+        self.entries[key] = score
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def take_stats(self) -> Dict[str, int]:
+        """Hits and misses since the last call, plus the current entry count"""
+        stats = {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+        self.hits = self.misses = 0
+        return stats
+
+class IncrementalFitnessEvaluator:
+    """Delta fitness evaluation for EnhancedGeneticTimetableGenerator.
+
+    Interns course, faculty, room and timeslot ids once and mirrors
+    `calculate_fitness` constraint by constraint on integer arrays. A
+    FitnessState keeps the faculty/room/student occupancy counters of one
+    chromosome, so moving a gene only rescores the faculty, room, students,
+    timeslot and course it touches instead of the whole timetable.
+    """
+
+    THEORY_TYPES = ('Major', 'Minor', 'Elective', 'AECC/VAC')
+
+    def __init__(self, generator):
+        self.signature = generator._data_signature()
+        courses, faculty, rooms = generator.courses, generator.faculty, generator.rooms
+        students, timeslots = generator.students, generator.timeslots
+
+        self.codec = GeneCodec(courses, timeslots, faculty, rooms)
+        self.course_by_id = {c.id: c for c in courses}
+        self.course_index = self.codec.course_index
+        self.faculty_index = self.codec.faculty_index
+        self.room_index = self.codec.room_index
+        self.slot_index = self.codec.slot_index
+        self.faculty_by_expertise = defaultdict(list)
+        for f in faculty:
+            self.faculty_by_expertise[f.expertise].append(f)
+        self.rooms_by_type = defaultdict(list)
+        for r in rooms:
+            self.rooms_by_type[r.room_type].append(r)
+        # Mutation candidates per course index (no rooms for room type 'none')
+        self.course_faculty = [
+            [self.faculty_index[f.id] for f in self.faculty_by_expertise.get(c.faculty_expertise_required, [])]
+            for c in courses
+        ]
+        self.course_rooms = [
+            [] if c.room_type_required == 'none'
+            else [self.room_index[r.id] for r in self.rooms_by_type.get(c.room_type_required, [])]
+            for c in courses
+        ]
+
+        self.n_slots = len(timeslots)
+        self.n_days_setting = len(generator.days)
+        self.max_tutorial_hours = generator.MAX_TUTORIAL_HOURS_PER_WEEK
+        self.slots_to_fill = min(self.n_slots, self.max_tutorial_hours)  # Hard 13 target within the Hard 1 cap
+        self.slot_usage = generator.slot_usage_constraints
+
+        # Timeslot geometry: day index and 0-based period column per slot
+        day_names = list(dict.fromkeys(t.day for t in timeslots))
+        day_of = {d: i for i, d in enumerate(day_names)}
+        self.n_periods = max((t.period_number for t in timeslots), default=0)
+        self.slot_day = np.array([day_of[t.day] for t in timeslots], dtype=np.int64)
+        self.slot_period = np.array([t.period_number for t in timeslots], dtype=np.int64)
+        # Column n_slots of the student counters is a dummy that is never occupied
+        self.day_period_slot = np.full((len(day_names), self.n_periods), self.n_slots, dtype=np.int64)
+        for i, t in enumerate(timeslots):
+            if t.period_number >= 1:
+                self.day_period_slot[day_of[t.day], t.period_number - 1] = i
+
+        # Static per-entity tables (room arrays carry a trailing "no room" entry)
+        self.available = np.array([
+            [t.period_number in f.availability.get(t.day, []) for t in timeslots] for f in faculty
+        ], dtype=bool).reshape(len(faculty), self.n_slots)
+        if self.n_periods > SlotGrid.DAY_BITS:
+            raise ValueError(f"At most {SlotGrid.DAY_BITS} periods per day are supported")
+        self.available_bits = SlotGrid.from_mask(self.available)  # one SlotGrid bitset per faculty
+        self.day_masks = SlotGrid.from_mask(
+            (self.day_period_slot[:, :, None] == np.arange(self.n_slots)).any(axis=1)
+        )  # slots of each day
+        self.expertise_ok = np.array([
+            [f.expertise == c.faculty_expertise_required for f in faculty] for c in courses
+        ], dtype=bool).reshape(len(courses), len(faculty))
+        self.room_type_ok = np.ones((len(courses), len(rooms) + 1), dtype=bool)
+        for ci, c in enumerate(courses):
+            for ri, r in enumerate(rooms):
+                self.room_type_ok[ci, ri] = r.room_type == c.room_type_required
+        self.room_capacity = np.array([r.capacity for r in rooms] + [np.iinfo(np.int64).max], dtype=np.int64)
+        self.max_load = np.array([f.max_load_per_week for f in faculty], dtype=np.int64)
+        self.theory = np.array([c.course_type in self.THEORY_TYPES for c in courses], dtype=bool)
+
+        # Student groups: generator.course_group_students flattened into CSR slices
+        self.group_index = {}
+        member_arrays = []
+        for (cid, group), indices in generator.course_group_students.items():
+            ci = self.course_index.get(cid)
+            if ci is not None:
+                self.group_index[(ci, group)] = len(member_arrays)
+                member_arrays.append(indices)
+        self.empty_group = len(member_arrays)
+        max_group = max((group for _, group in self.group_index), default=0)
+        self.group_lookup = np.full((len(courses), max(max_group, 0) + 1), self.empty_group, dtype=np.int64)
+        for (ci, group), gi in self.group_index.items():
+            if group >= 0:
+                self.group_lookup[ci, group] = gi
+        sizes = [len(indices) for indices in member_arrays] + [0]
+        self.group_ptr = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.group_members = np.concatenate(member_arrays + [np.zeros(0, dtype=np.int64)])
+        self.group_size = np.array(sizes, dtype=np.int64)
+        # Groups sharing at least one student with each group (itself included)
+        member_group = np.repeat(np.arange(len(sizes)), sizes)
+        order = np.argsort(self.group_members, kind='stable')
+        by_student, student_groups = self.group_members[order], member_group[order]
+        per_student = np.bincount(by_student, minlength=len(students)) if len(by_student) else np.zeros(0, dtype=np.int64)
+        first = np.concatenate([[0], np.cumsum(per_student)])[by_student]
+        repeats = per_student[by_student]
+        offsets = np.arange(int(repeats.sum())) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        pairs = np.unique(np.repeat(student_groups, repeats) * len(sizes) + student_groups[np.repeat(first, repeats) + offsets])
+        bounds = np.searchsorted(pairs // len(sizes), np.arange(len(sizes) + 1)).tolist()
+        neighbors = (pairs % len(sizes)).tolist()
+        self.group_neighbors = [neighbors[bounds[g]:bounds[g + 1]] for g in range(len(sizes))]
+
+        # Seconds per constraint family in update/score_batch; a defaultdict(float) turns profiling on
+        self.constraint_seconds = None
+
+        # Hard 6 depends only on enrollments, never on the chromosome
+        self.credit_penalty = 0
+        for s in students:
+            credits = sum(self.course_by_id[c].credits for c in s.enrolled_courses if c in self.course_by_id)
+            if credits < generator.MIN_SEMESTER_CREDITS or credits > generator.MAX_SEMESTER_CREDITS:
+                self.credit_penalty += 100000
+
+        self.n_courses, self.n_faculty, self.n_rooms = len(courses), len(faculty), len(rooms)
+        self.n_students, self.n_days = len(students), len(day_names)
+
+    def gene_arrays(self, chromosome: TimetableChromosome) -> Optional[GeneArrays]:
+        """Array storage of a chromosome, encoding (and caching) Gene lists on first use"""
+        arrays = chromosome.encoded
+        if arrays is None or arrays.codec is not self.codec:
+            arrays = self.codec.encode(chromosome.genes)
+            chromosome.encoded = arrays
+        return arrays
+
+    def columns(self, arrays: GeneArrays):
+        """int64 (course, slot, faculty, room, group index) columns for scoring"""
+        return self.scoring_columns(*arrays.columns)
+
+    def scoring_columns(self, course, slot, faculty, room, group):
+        """Scoring columns from raw GeneArrays columns, e.g. as shipped to worker processes"""
+        course = course.astype(np.int64)
+        group = group.astype(np.int64)
+        known = (group >= 0) & (group < self.group_lookup.shape[1])
+        group_idx = np.where(known, self.group_lookup[course, np.where(known, group, 0)], self.empty_group)
+        return course, slot.astype(np.int64), faculty.astype(np.int64), room.astype(np.int64), group_idx
+
+    def students_of(self, course: int, group: int) -> np.ndarray:
+        """Student indices of one (course index, group number)"""
+        gi = self.group_index.get((course, group), self.empty_group)
+        return self.group_members[self.group_ptr[gi]:self.group_ptr[gi + 1]]
+
+    def conflicted_genes(self, arrays: GeneArrays, state: Optional[FitnessState] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Mask of genes involved in a hard violation of `calculate_fitness`, and the [students, slots] counts
+        
+        With the chromosome's `state` the occupancy counts are read from its
+        counters instead of being recounted.
+        """
+        course, slot, faculty, room, group = self.columns(arrays)
+        T = self.n_slots
+        has_room = room >= 0
+        room_cells = np.where(has_room, room, 0) * T + slot
+        students, student_slots, genes = self._expand_groups(group, slot, np.arange(len(course)))
+        cells = students * T + student_slots
+        if state is None:
+            faculty_counts = np.bincount(faculty * T + slot, minlength=self.n_faculty * T)
+            room_counts = np.bincount(room_cells[has_room], minlength=self.n_rooms * T)
+            student_counts = np.bincount(cells, minlength=self.n_students * T)
+        else:
+            faculty_counts = state.faculty_counts.reshape(-1)
+            room_counts = state.room_counts.reshape(-1)
+            student_counts = state.student_counts.array()[:, :T].reshape(-1)
+        clashing = np.zeros(len(course), dtype=bool)
+        clashing[genes[student_counts[cells] > 1]] = True
+        clashing[has_room] |= room_counts[room_cells[has_room]] > 1
+        conflicted = (
+            clashing | ~self.available[faculty, slot] | (faculty_counts[faculty * T + slot] > 1)
+            | (has_room & (self.group_size[group] > self.room_capacity[room]))
+            | ~self.expertise_ok[course, faculty] | ~self.room_type_ok[course, room]
+        )
+        return conflicted, student_counts.reshape(-1, T)
+
+    def encode(self, chromosome: TimetableChromosome):
+        """Scoring columns of a chromosome, or None if it has unknown ids"""
+        arrays = self.gene_arrays(chromosome)
+        return self.columns(arrays) if arrays is not None else None
+
+    def build_state(self, chromosome: TimetableChromosome) -> Optional[FitnessState]:
+        """Score a chromosome from scratch; None if it cannot be encoded"""
+        columns = self.encode(chromosome)
+        if columns is None:
+            return None
+        state = FitnessState(self)
+        T = self.n_slots
+        state.faculty_counts = np.zeros((self.n_faculty, T), dtype=np.int32)
+        state.room_counts = np.zeros((self.n_rooms, T), dtype=np.int32)
+        state.student_counts = np.zeros((self.n_students, T + 1), dtype=np.int16)
+        state.slot_counts = np.zeros(T, dtype=np.int32)
+        state.course_periods = np.zeros((self.n_courses, self.n_periods), dtype=np.int32)
+        state.faculty_overlaps = state.room_overlaps = state.student_overlaps = 0
+        state.gene_pen = state.gene_rew = 0
+        # Faculty without any session still count towards Soft 1
+        state.faculty_pen, state.faculty_rew = self._workload_scores(
+            np.zeros(self.n_faculty, dtype=np.int64), self.max_load
+        )
+        state.student_day_pen = np.zeros((self.n_students, self.n_days), dtype=np.int64)
+        state.student_day_rew = np.zeros((self.n_students, self.n_days), dtype=np.int64)
+        state.course_pen = np.zeros(self.n_courses, dtype=np.int64)
+        state.faculty_pen_total = int(state.faculty_pen.sum())
+        state.faculty_rew_total = int(state.faculty_rew.sum())
+        state.student_day_pen_total = state.student_day_rew_total = state.course_pen_total = 0
+        for name in FitnessState.SHARED:
+            setattr(state, name, SharedRows(getattr(state, name)))
+        empty = tuple(np.zeros(0, dtype=np.int64) for _ in range(5))
+        self.update(state, empty, columns)
+        return state
+
+    def _expand_groups(self, group, *aligned):
+        """Student indices of every gene's group, with the `aligned` gene columns repeated alongside"""
+        starts = self.group_ptr[group]
+        sizes = self.group_ptr[group + 1] - starts
+        total = int(sizes.sum())
+        offsets = np.arange(total) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        members = self.group_members[np.repeat(starts, sizes) + offsets]
+        return (members,) + tuple(np.repeat(col, sizes) for col in aligned)
+
+    def _student_day_scores(self, occupied):
+        """Soft 2 penalty and reward per student-day from a [..., periods] occupancy mask"""
+        longest = SlotGrid.longest_runs(SlotGrid.day_words(occupied))
+        busy = longest > 0
+        penalty = np.where(busy & (longest > 3), (longest - 3) * 20, 0)
+        return penalty, np.where(busy & (longest <= 3), 30, 0)
+
+    def _course_period_scores(self, periods):
+        """Soft 5 penalty per course from its [..., periods] histogram"""
+        if not self.n_periods:
+            return np.zeros(periods.shape[:-1], dtype=np.int64)
+        max_same = periods.max(axis=-1).astype(np.int64)
+        repeated = (periods.sum(axis=-1) >= 2) & (max_same > self.n_days_setting // 2)
+        return np.where(repeated, (max_same - 1) * 5, 0)
+
+    def _slot_usage_penalty(self, used_slots):
+        """Hard 13 and Hard 1 penalties for the number of distinct slots in use"""
+        if not self.slot_usage:
+            return np.zeros_like(used_slots)
+        penalty = np.where(used_slots < self.slots_to_fill, (self.slots_to_fill - used_slots) * 10000, 0)
+        return penalty + np.where(
+            used_slots > self.max_tutorial_hours, (used_slots - self.max_tutorial_hours) * 10000, 0
+        )
+
+    def _gene_scores(self, course, slot, faculty, room, group):
+        """Per-gene penalty and reward arrays of Hard 2, 5, 8, 9, 10 and Soft 3"""
+        has_room = room >= 0
+        theory = self.theory[course]
+        morning = self.slot_period[slot] <= 3
+        penalty = 100000 * (~self.available[faculty, slot]).astype(np.int64)
+        penalty += 100000 * (has_room & (self.group_size[group] > self.room_capacity[room]))
+        penalty += 50000 * ~self.expertise_ok[course, faculty]
+        penalty += 50000 * ~self.room_type_ok[course, room]
+        penalty += 10 * (theory & ~morning)
+        return penalty, 20 * (theory & morning).astype(np.int64)
+
+    @staticmethod
+    def _workload_scores(hours, max_load):
+        """Soft 1 penalty and reward per faculty for the given weekly hours"""
+        over = hours > max_load
+        under = ~over & (hours < 16)
+        penalty = np.where(over, (hours - max_load) * 10, np.where(under, (16 - hours) * 10, 0))
+        return penalty, np.where(over | under, 0, 50)
+
+    @staticmethod
+    def _shift_counts(counts, removed, added):
+        """Move counts between flat cells of a [rows, width] array or SharedRows; return the changed cells and the change in overlaps"""
+        width = counts.shape[1]
+        size = counts.shape[0] * width
+        if (len(removed) + len(added)) * 8 > size:
+            # Whole-chromosome updates (build_state) touch most cells anyway
+            delta = np.bincount(added, minlength=size) - np.bincount(removed, minlength=size)
+            touched = np.flatnonzero(delta)
+            delta = delta[touched]
+        else:
+            cells, inverse = np.unique(np.concatenate([removed, added]), return_inverse=True)
+            inverse = inverse.reshape(-1)
+            delta = (np.bincount(inverse[len(removed):], minlength=len(cells))
+                     - np.bincount(inverse[:len(removed)], minlength=len(cells)))
+            changed = delta != 0
+            touched, delta = cells[changed], delta[changed]
+        if isinstance(counts, SharedRows):
+            before = counts.add(delta, touched // width, touched % width)
+        else:
+            flat = counts.reshape(-1)
+            before = flat[touched].astype(np.int64)
+            flat[touched] = before + delta
+        after = before + delta
+        return touched, int(np.maximum(after - 1, 0).sum() - np.maximum(before - 1, 0).sum())
+
+    @staticmethod
+    def _distinct(values, size):
+        return np.flatnonzero(np.bincount(values, minlength=size))
+
+    def _lap(self, family: str, started: float) -> float:
+        """Charge the time since `started` to a constraint family when profiling; returns the current time"""
+        now = perf_counter()
+        if self.constraint_seconds is not None:
+            self.constraint_seconds[family] += now - started
+        return now
+
+    def update(self, state: FitnessState, old, new):
+        """Remove the `old` gene columns from `state` and add the `new` ones"""
+        T = self.n_slots
+        oc, ot, of, orm, og = old
+        nc, nt, nf, nrm, ng = new
+        lap = perf_counter()
+
+        # Per-gene constraints
+        pen, rew = self._gene_scores(*old)
+        state.gene_pen -= int(pen.sum())
+        state.gene_rew -= int(rew.sum())
+        pen, rew = self._gene_scores(*new)
+        state.gene_pen += int(pen.sum())
+        state.gene_rew += int(rew.sum())
+        lap = self._lap('gene', lap)
+
+        # Hard 3: Faculty overlap, Soft 1: workload
+        touched, overlaps = self._shift_counts(state.faculty_counts, of * T + ot, nf * T + nt)
+        state.faculty_overlaps += overlaps
+        touched = self._distinct(touched // T, self.n_faculty)
+        if len(touched):
+            hours = np.count_nonzero(state.faculty_counts[touched], axis=1)
+            new_pen, new_rew = self._workload_scores(hours, self.max_load[touched])
+            state.faculty_pen_total += int(new_pen.sum() - state.faculty_pen[touched].sum())
+            state.faculty_rew_total += int(new_rew.sum() - state.faculty_rew[touched].sum())
+            state.faculty_pen[touched] = new_pen
+            state.faculty_rew[touched] = new_rew
+        lap = self._lap('faculty', lap)
+
+        # Hard 3: Room overlap
+        old_rooms, new_rooms = orm >= 0, nrm >= 0
+        _, overlaps = self._shift_counts(
+            state.room_counts, orm[old_rooms] * T + ot[old_rooms], nrm[new_rooms] * T + nt[new_rooms]
+        )
+        state.room_overlaps += overlaps
+        lap = self._lap('room', lap)
+
+        # Hard 4: Student clash, Soft 2: consecutive periods
+        old_students, old_slots = self._expand_groups(og, ot)
+        new_students, new_slots = self._expand_groups(ng, nt)
+        touched, overlaps = self._shift_counts(
+            state.student_counts, old_students * (T + 1) + old_slots, new_students * (T + 1) + new_slots
+        )
+        state.student_overlaps += overlaps
+        pairs = self._distinct(
+            touched // (T + 1) * self.n_days + self.slot_day[touched % (T + 1)], self.n_students * self.n_days
+        )
+        if len(pairs):
+            students, days = pairs // self.n_days, pairs % self.n_days
+            occupied = state.student_counts.get(students[:, None], self.day_period_slot[days]) > 0
+            new_pen, new_rew = self._student_day_scores(occupied)
+            state.student_day_pen_total += int(new_pen.sum() - state.student_day_pen.put(new_pen, students, days).sum())
+            state.student_day_rew_total += int(new_rew.sum() - state.student_day_rew.put(new_rew, students, days).sum())
+        lap = self._lap('student', lap)
+
+        # Hard 1, 13: slot usage
+        state.slot_counts += np.bincount(nt, minlength=T) - np.bincount(ot, minlength=T)
+        lap = self._lap('slots', lap)
+
+        # Soft 5: same period every day
+        P = self.n_periods
+        touched, _ = self._shift_counts(
+            state.course_periods, oc * P + self.slot_period[ot] - 1, nc * P + self.slot_period[nt] - 1
+        )
+        touched = self._distinct(touched // P, self.n_courses) if P else touched
+        if len(touched):
+            new_pen = self._course_period_scores(state.course_periods[touched])
+            state.course_pen_total += int(new_pen.sum() - state.course_pen[touched].sum())
+            state.course_pen[touched] = new_pen
+        self._lap('course_periods', lap)
+
+    def score(self, state: FitnessState) -> Tuple[int, int]:
+        """Total (penalty, reward) exactly as calculate_fitness computes them"""
+        penalty = 100000 * (state.faculty_overlaps + state.room_overlaps + state.student_overlaps)
+        penalty += state.gene_pen + state.faculty_pen_total + state.student_day_pen_total
+        penalty += state.course_pen_total + self.credit_penalty
+        penalty += int(self._slot_usage_penalty(np.count_nonzero(state.slot_counts)))
+        reward = state.gene_rew + state.faculty_rew_total + state.student_day_rew_total
+        return penalty, reward
+
+    def score_batch(self, encoded) -> List[Tuple[int, int]]:
+        """(penalty, reward) of many encoded chromosomes with whole-population bincounts.
+
+        Every constraint is counted exactly as in `calculate_fitness`, so the
+        batch and per-chromosome paths are interchangeable.
+        """
+        n_chromosomes = len(encoded)
+        if not n_chromosomes:
+            return []
+        T, F, R, C, P = self.n_slots, self.n_faculty, self.n_rooms, self.n_courses, self.n_periods
+        lengths = np.array([len(columns[0]) for columns in encoded], dtype=np.int64)
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        course, slot, faculty, room, group = (
+            np.concatenate([columns[k] for columns in encoded]).astype(np.int64) for k in range(5)
+        )
+        owner = np.repeat(np.arange(n_chromosomes), lengths)
+
+        def per_chromosome(values):
+            totals = np.concatenate([[0], np.cumsum(values, dtype=np.int64)])
+            return totals[bounds[1:]] - totals[bounds[:-1]]
+
+        lap = perf_counter()
+
+        # Per-gene constraints
+        gene_pen, gene_rew = self._gene_scores(course, slot, faculty, room, group)
+        penalty = per_chromosome(gene_pen) + self.credit_penalty
+        reward = per_chromosome(gene_rew)
+        lap = self._lap('gene', lap)
+
+        # Hard 3: Faculty overlap, Soft 1: workload
+        counts = np.bincount((owner * F + faculty) * T + slot, minlength=n_chromosomes * F * T)
+        counts = counts.reshape(n_chromosomes, F, T)
+        penalty += 100000 * np.maximum(counts - 1, 0).sum(axis=(1, 2))
+        pen, rew = self._workload_scores(np.count_nonzero(counts, axis=2), self.max_load)
+        penalty += pen.sum(axis=1)
+        reward += rew.sum(axis=1)
+        lap = self._lap('faculty', lap)
+
+        # Hard 3: Room overlap
+        has_room = room >= 0
+        counts = np.bincount(
+            (owner[has_room] * R + room[has_room]) * T + slot[has_room], minlength=n_chromosomes * R * T
+        ).reshape(n_chromosomes, R, T)
+        penalty += 100000 * np.maximum(counts - 1, 0).sum(axis=(1, 2))
+        lap = self._lap('room', lap)
+
+        # Hard 4: Student clash, Soft 2: consecutive periods (chunked to bound memory)
+        S = self.n_students
+        chunk = max(1, 4_000_000 // max(S * (T + 1), 1))
+        for first in range(0, n_chromosomes, chunk):
+            last = min(first + chunk, n_chromosomes)
+            genes = slice(bounds[first], bounds[last])
+            students, slots, owners = self._expand_groups(group[genes], slot[genes], owner[genes] - first)
+            counts = np.bincount(
+                (owners * S + students) * (T + 1) + slots, minlength=(last - first) * S * (T + 1)
+            ).reshape(last - first, S, T + 1)
+            penalty[first:last] += 100000 * np.maximum(counts - 1, 0).sum(axis=(1, 2))
+            pen, rew = self._student_day_scores(counts[:, :, self.day_period_slot] > 0)
+            penalty[first:last] += pen.sum(axis=(1, 2))
+            reward[first:last] += rew.sum(axis=(1, 2))
+        lap = self._lap('student', lap)
+
+        # Hard 1, 13: slot usage
+        counts = np.bincount(owner * T + slot, minlength=n_chromosomes * T).reshape(n_chromosomes, T)
+        penalty += self._slot_usage_penalty(np.count_nonzero(counts, axis=1))
+        lap = self._lap('slots', lap)
+
+        # Soft 5: same period every day
+        counts = np.bincount(
+            (owner * C + course) * P + self.slot_period[slot] - 1, minlength=n_chromosomes * C * P
+        ).reshape(n_chromosomes, C, P)
+        penalty += self._course_period_scores(counts).sum(axis=1)
+        self._lap('course_periods', lap)
+
+        return list(zip(penalty.tolist(), reward.tolist()))
+
+# Process-pool fitness: each worker receives the evaluator once via the initializer
+_worker_evaluator = None
+
+def _init_fitness_worker(evaluator: IncrementalFitnessEvaluator):
+    global _worker_evaluator
+    _worker_evaluator = evaluator
+
+def _score_packed_chromosomes(packed: np.ndarray, lengths: List[int]) -> List[Tuple[int, int]]:
+    """Worker task: score chromosomes packed as one [5, total_genes] GeneArrays column block"""
+    bounds = np.cumsum(lengths)[:-1]
+    encoded = [
+        _worker_evaluator.scoring_columns(*columns)
+        for columns in zip(*(np.split(row, bounds) for row in packed))
+    ]
+    return _worker_evaluator.score_batch(encoded)
+
+# Island-model workers: each process holds its own copy of the generator
+_island_generator = None
+
+def _init_island_worker(generator: 'EnhancedGeneticTimetableGenerator'):
+    global _island_generator
+    _island_generator = generator
+
+def _run_island_epoch(packed_population, generations: int, mutation_rate: float, crossover_rate: float, seed: int):
+    """Worker task: advance one island by `generations`.
+    
+    Returns its packed population, history, evaluation count and seconds per GA phase.
+    """
+    generator = _island_generator
+    generator.evaluations = 0
+    generator.mutation_rate = mutation_rate
+    generator.crossover_rate = crossover_rate
+    generator.rng = random.Random(seed)
+    generator._phase_seconds = defaultdict(float)
+    if packed_population is None:
+        population = generator._initial_population()
+    else:
+        population = generator._unpack_population(*packed_population)
+    
+    history = []
+    reference_cost = None
+    for _ in range(generations):
+        population.sort(key=generator._rank, reverse=True)
+        history.append(population[0].fitness)
+        if generator._is_solved(population[0]):
+            break
+        if generator.adaptive_rates:
+            if reference_cost is None:
+                reference_cost = population[0].penalty_score - population[0].reward_score
+            generator._adapt_rates(population, (mutation_rate, crossover_rate), reference_cost)
+        population = generator._next_generation(population)
+    population.sort(key=generator._rank, reverse=True)
+    return generator._pack_population(population), history, generator.evaluations, dict(generator._phase_seconds)
+
+def _evolve_component(generator: 'EnhancedGeneticTimetableGenerator', cancel_event=None):
+    """Worker task: evolve one decomposed sub-instance; returns its best (genes and scores only) and run summary"""
+    generator.cancel_event = cancel_event  # not pickled with the generator
+    best, history = generator.evolve()
+    summary = TimetableChromosome(best.genes)
+    for name in ('fitness', 'hard_violations', 'soft_violations', 'penalty_score', 'reward_score'):
+        setattr(summary, name, getattr(best, name))
+    return {
+        'best': summary, 'history': history, 'stop_reason': generator.stop_reason,
+        'evaluations': generator.evaluations, 'report': generator.run_report,
+    }
+
+@dataclass
+class CapacityBound:
+    """One necessary condition of a conflict-free timetable: `required` must not exceed `available`"""
+    constraint: str  # e.g. 'Hard 5: expertise'
+    subject: str  # course, expertise, room type or student the bound is about
+    required: int
+    available: int
+    hard: bool = True  # False for soft constraints, whose violation only costs fitness
+
+    @property
+    def violated(self) -> bool:
+        return self.required > self.available
+
+    @property
+    def utilization(self) -> float:
+        if self.available > 0:
+            return self.required / self.available
+        return math.inf if self.required > 0 else 0.0
+
+    @property
+    def message(self) -> str:
+        return f"{self.constraint}: {self.subject} needs {self.required}, the data allows {self.available}"
+
+@dataclass
+class FeasibilityReport:
+    """Capacity bounds checked by check_feasibility"""
+    bounds: List[CapacityBound]
+    seconds: float = 0.0
+
+    @property
+    def issues(self) -> List[CapacityBound]:
+        """Violated bounds, most over-subscribed first"""
+        return sorted((b for b in self.bounds if b.violated), key=lambda b: b.utilization, reverse=True)
+
+    @property
+    def feasible(self) -> bool:
+        """False if some hard bound is violated, i.e. the data rules out zero hard violations"""
+        return not any(b.hard and b.violated for b in self.bounds)
+
+    @property
+    def bottleneck(self) -> Optional[CapacityBound]:
+        """The tightest hard bound, violated or not"""
+        return max((b for b in self.bounds if b.hard), key=lambda b: b.utilization, default=None)
+
+def _max_flow(n_nodes: int, edges: List[Tuple[int, int, int]], source: int, sink: int) -> int:
+    """Maximum flow from `source` to `sink` over (tail, head, capacity) edges (Dinic)"""
+    heads, capacity, adjacency = [], [], [[] for _ in range(n_nodes)]
+    for tail, head, cap in edges:
+        adjacency[tail].append(len(heads))
+        heads.append(head)
+        capacity.append(cap)
+        adjacency[head].append(len(heads))  # residual edge, index ^ 1
+        heads.append(tail)
+        capacity.append(0)
+    
+    flow = 0
+    while True:
+        level = [-1] * n_nodes
+        level[source] = 0
+        queue = [source]
+        for node in queue:
+            for e in adjacency[node]:
+                if capacity[e] > 0 and level[heads[e]] < 0:
+                    level[heads[e]] = level[node] + 1
+                    queue.append(heads[e])
+        if level[sink] < 0:
+            return flow
+        
+        next_edge = [0] * n_nodes
+        
+        def push(node, limit):
+            if node == sink:
+                return limit
+            while next_edge[node] < len(adjacency[node]):
+                e = adjacency[node][next_edge[node]]
+                head = heads[e]
+                if capacity[e] > 0 and level[head] == level[node] + 1:
+                    pushed = push(head, min(limit, capacity[e]))
+                    if pushed:
+                        capacity[e] -= pushed
+                        capacity[e ^ 1] += pushed
+                        return pushed
+                next_edge[node] += 1
+            return 0
+        
+        while True:
+            pushed = push(source, math.inf)
+            if not pushed:
+                break
+            flow += pushed
+
+class JsonlEventSink:
+    """Event sink appending each run event as one JSON line to `path`"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, event: Dict[str, object]):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(event, default=float) + '\n')
+
+class PrometheusTextfileSink:
+    """Event sink keeping a Prometheus textfile-collector file up to date.
+
+    Counters (seconds per phase and constraint family, evaluations, cache
+    hits/misses, repairs) accumulate over the run; gauges describe the
+    current best. The file is rewritten atomically after every event.
+    """
+
+    PREFIX = 'timetable'
+
+    def __init__(self, path: str):
+        self.path = path
+        self.counters = defaultdict(float)  # (metric, label name, label value) -> total
+        self.gauges = {}
+
+    def __call__(self, event: Dict[str, object]):
+        if event['event'] == 'run_start':
+            self.counters.clear()
+            self.gauges.clear()
+        for phase, seconds in event.get('phase_seconds', {}).items():
+            self.counters['phase_seconds_total', 'phase', phase] += seconds
+        for family, seconds in event.get('constraint_seconds', {}).items():
+            self.counters['constraint_seconds_total', 'family', family] += seconds
+        cache = event.get('cache', {})
+        for name in ('hits', 'misses'):
+            self.counters[f'cache_{name}_total', None, None] += cache.get(name, 0)
+        if 'entries' in cache:
+            self.gauges['cache_entries'] = cache['entries']
+        self.counters['evaluations_total', None, None] += event.get('evaluations', 0)
+        self.counters['repairs_total', None, None] += event.get('repairs', 0)
+        for name in ('generation', 'elapsed_seconds', 'best_fitness', 'best_penalty', 'best_reward',
+                     'hard_violations', 'mutation_rate', 'crossover_rate'):
+            if name in event:
+                self.gauges[name] = event[name]
+        self.gauges['running'] = 0 if event['event'] == 'run_end' else 1
+        self.write()
+
+    def write(self):
+        lines = []
+        for (metric, label, value), total in sorted(self.counters.items(), key=lambda item: str(item[0])):
+            labels = f'{{{label}="{value}"}}' if label else ''
+            lines.append(f'{self.PREFIX}_{metric}{labels} {total:.10g}')
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f'{self.PREFIX}_{name} {float(value):.10g}')
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp, self.path)
+
+def write_checkpoint(path: str, arrays: Dict[str, np.ndarray]):
+    """Atomically replace `path` with the arrays as a compressed .npz"""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp, path)
+
+def read_checkpoint(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
 
 class EnhancedGeneticTimetableGenerator:
-    def __init__(self):
+    CHECKPOINT_VERSION = 1
+
+    def __init__(self, seed: Optional[int] = None, rng: Optional[random.Random] = None):
         self.courses = []
         self.faculty = []
         self.rooms = []
         self.students = []
         self.timeslots = []
         
+        # Enrollment index: course_id / (course_id, group) -> read-only student index arrays
+        self.course_students = {}
+        self.course_group_students = {}
+        self.course_group_sizes = {}
+        
         # Algorithm parameters
         self.population_size = 100
         self.generations = 500
         self.mutation_rate = 0.1
         self.crossover_rate = 0.8
         self.elite_size = 10
+        # 'batch' scores a whole generation at once; 'incremental' derives each child's FitnessState from its
+        # parent's. Batch is the default because crossover children differ from either parent in about half
+        # their genes, so a delta saves little: batch is ahead on every benchmark preset (GA evaluations/s,
+        # one process: tiny 554 vs 230, medium 40 vs 32, large 8 vs 7). Deltas pay off for moves of a few
+        # genes, which cost the same whatever the instance size (about 1000 one-gene moves/s from tiny to
+        # large, against 3100 batch evaluations/s on tiny and 60 on large): polish() scores every move so.
+        self.fitness_mode = 'batch'
+        self.fitness_workers = 1  # >1: batch fitness in that many processes, 0: one per CPU
+        self.max_processes = 0  # >0: cap on the worker processes of every pool this generator starts
+        self.process_start_method = None  # multiprocessing start method of those pools, None: platform default
+        self.crossover_mode = 'course'  # 'course': swap whole course blocks, 'single_point': cut the gene list
+        self.constructed_fraction = 1.0  # share of the initial population built greedily, the rest random
+        self.repair_children = True  # move children's genes out of hard conflicts before scoring
+        self.repair_history = []  # repairs made per generation in the last evolve()
+        self.fitness_cache_bytes = 64 * 2**20  # memory cap of the batch fitness cache, 0 disables it
+        self.cache_history = []  # fitness cache hits/misses per scored generation in the last evolve()
+        self.max_seconds = 0.0  # >0: stop after this much wall-clock time
+        self.max_evaluations = 0  # >0: never start a generation that would exceed this many evaluations
+        self.stagnation_generations = 0  # >0: stop after this many generations without a better best
+        self.stop_reason = None  # criterion that ended the last run
+        self.evaluations = 0  # chromosomes scored in the last run, not counting fitness cache hits
+        self.adaptive_rates = False  # diversity-driven rates and conflict-targeted mutation
+        self.target_diversity = 0.3  # population diversity the adaptive rates steer towards
+        self.conflict_mutation_boost = 1.0  # mutation rate multiplier for genes in hard violations (adaptive mode)
+        self.rate_history = []  # (diversity, mutation_rate, crossover_rate) per generation in adaptive mode
+        self.polish_seconds = 0.0  # >0: simulated annealing on the best timetable after evolving
+        self.polish_history = []  # (elapsed seconds, fitness, penalty - reward) improvements of the last polish
+        self.checkpoint_path = None  # .npz the single-population GA state is written to while evolving
+        self.checkpoint_interval = 25  # generations between checkpoints
+        self.disruption_weight = 1000  # reschedule(): penalty per session moved, re-staffed or re-roomed
+        self.reschedule_seconds = 10.0  # reschedule(): wall-clock limit when max_seconds is not set
+        self.feasibility_check = 'warn'  # before a run: 'warn' logs, 'refuse' raises on provable infeasibility, 'off'
+        self.feasibility_report = None  # FeasibilityReport of the last run's pre-check
+        self.slot_usage_constraints = True  # Hard 13 / Hard 1 on distinct slots in use; off for decompose() components
+        self._baseline = None  # reschedule(): (previous assignments, start timetable, indices of the genes it may change)
+        self.cancel_event = None  # threading.Event that stops a run ('cancelled') once set
+        self.current_best = None  # best chromosome so far of the running evolve(), for other threads to poll
+        self.event_sinks = []  # callables receiving run events (dicts), e.g. JsonlEventSink
+        self.profile_constraints = False  # time each constraint family while scoring (always on with event sinks)
+        self.run_report = {}  # phase, constraint and evaluation totals of the last evolve()
+        self._phase_seconds = defaultdict(float)  # seconds per GA phase since the last generation event
         
-        # NEP 2020 Constants
+        # Randomness: every operator draws from self.rng; a set seed restarts it for each run
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        self._fitness_evaluator = None
+        self._fitness_cache = None
+        
+        # NEP 2020 Constants (days and PERIOD_TIMES define the weekly grid; change them before loading data)
         self.days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-        self.WORKING_DAYS_PER_WEEK = 6
-        self.PERIODS_PER_DAY = 7
+        self.PERIOD_TIMES = [
+            ('09:00', '10:00'),  # Period 1
+            ('10:00', '11:00'),  # Period 2
+            ('11:00', '12:00'),  # Period 3
+            ('12:30', '13:30'),  # Period 4 (after lunch)
+            ('13:30', '14:30'),  # Period 5
+            ('14:30', '15:30'),  # Period 6
+            ('15:30', '16:30'),  # Period 7
+        ]
+        self.WORKING_DAYS_PER_WEEK = len(self.days)
+        self.PERIODS_PER_DAY = len(self.PERIOD_TIMES)
         self.PERIOD_DURATION_MINUTES = 60
         self.LUNCH_BREAK_AFTER_PERIOD = 3
         self.LUNCH_BREAK_DURATION = 30
@@ -117,9 +1235,46 @@ class EnhancedGeneticTimetableGenerator:
             'AECC/VAC': 2,
         }
 
+    def __getstate__(self):
+        # Event sinks may be arbitrary callables and, like the cancel event, stay in the process that owns the run
+        state = self.__dict__.copy()
+        state['event_sinks'] = []
+        state['cancel_event'] = None
+        return state
+
+    REQUIRED_COLUMNS = {
+        'courses': ('Course_ID', 'Course_Name', 'Credits', 'Course_Type', 'Total_Duration_Hours',
+                    'Faculty_Expertise_Required', 'Room_Type_Required', 'Max_Students', 'Semester'),
+        'faculty': ('Faculty_ID', 'Faculty_Name', 'Expertise', 'Max_Load_Per_Week'),
+        'rooms': ('Room_ID', 'Room_Name', 'Capacity', 'Room_Type'),
+        'students': ('Student_ID', 'Student_Name', 'Semester'),
+    }
+
+    def load_data_from_files(self, courses_path, faculty_path, rooms_path, students_path):
+        """Load data from CSV or Parquet files (chosen by extension)"""
+        self.load_data_from_ui(*(read_table(path) for path in (courses_path, faculty_path, rooms_path, students_path)))
+
+    @staticmethod
+    def _column(df, name, default):
+        """Whole column `name` as strings, or `default` for every row if the column is missing"""
+        import pandas as pd
+        
+        if name in df.columns:
+            return df[name].astype(str)
+        return pd.Series(default, index=df.index, dtype=object)
+
     def load_data_from_ui(self, courses_df, faculty_df, rooms_df, students_df):
-        """Load data from Streamlit uploaded files"""
+        """Load data from Streamlit uploaded files (or any DataFrames with the same columns).
+        
+        Columns are validated and converted whole, and the enrollment index is
+        built from the exploded Enrolled_Courses column, not row by row.
+        """
         try:
+            for table, df in zip(self.REQUIRED_COLUMNS, (courses_df, faculty_df, rooms_df, students_df)):
+                missing = [c for c in self.REQUIRED_COLUMNS[table] if c not in df.columns]
+                if missing:
+                    raise ValueError(f"{table} data is missing columns: {', '.join(missing)}")
+            
             # Clear existing data
             self.courses.clear()
             self.faculty.clear()
@@ -130,115 +1285,199 @@ class EnhancedGeneticTimetableGenerator:
             self._generate_time_slots()
             
             # Load courses
-            for _, row in courses_df.iterrows():
-                course = Course(
-                    id=str(row['Course_ID']),
-                    name=str(row['Course_Name']),
-                    credits=int(row['Credits']),
-                    course_type=str(row['Course_Type']),
-                    total_duration_hours=int(row['Total_Duration_Hours']),
-                    faculty_expertise_required=str(row['Faculty_Expertise_Required']),
-                    room_type_required=str(row['Room_Type_Required']),
-                    max_students=int(row['Max_Students']),
-                    semester=int(row['Semester']),
-                    is_elective=bool(row.get('Is_Elective', False))
+            is_elective = courses_df['Is_Elective'].astype(bool) if 'Is_Elective' in courses_df.columns else [False] * len(courses_df)
+            self.courses.extend(
+                Course(*fields) for fields in zip(
+                    courses_df['Course_ID'].astype(str).tolist(),
+                    courses_df['Course_Name'].astype(str).tolist(),
+                    courses_df['Credits'].astype(int).tolist(),
+                    courses_df['Course_Type'].astype(str).tolist(),
+                    courses_df['Total_Duration_Hours'].astype(int).tolist(),
+                    courses_df['Faculty_Expertise_Required'].astype(str).tolist(),
+                    courses_df['Room_Type_Required'].astype(str).tolist(),
+                    courses_df['Max_Students'].astype(int).tolist(),
+                    courses_df['Semester'].astype(int).tolist(),
+                    list(is_elective)
                 )
-                self.courses.append(course)
+            )
             
-            # Load faculty
-            for _, row in faculty_df.iterrows():
+            # Load faculty (each distinct availability string is parsed once)
+            parsed = {}
+            for text in set(self._column(faculty_df, 'Availability', '{}').tolist()):
                 try:
-                    availability_str = str(row.get('Availability', '{}'))
-                    availability = json.loads(availability_str)
+                    availability = json.loads(text)
                     # Ensure availability is dict day -> list[int]
                     for day in self.days:
                         if day not in availability:
-                            availability[day] = list(range(1, 8))
+                            availability[day] = list(range(1, len(self.PERIOD_TIMES) + 1))
                 except:
-                    availability = {day: list(range(1, 8)) for day in self.days}
-                
-                faculty = Faculty(
-                    id=str(row['Faculty_ID']),
-                    name=str(row['Faculty_Name']),
-                    expertise=str(row['Expertise']),
-                    max_load_per_week=int(row['Max_Load_Per_Week']),
-                    availability=availability
+                    availability = {day: list(range(1, len(self.PERIOD_TIMES) + 1)) for day in self.days}
+                parsed[text] = availability
+            self.faculty.extend(
+                Faculty(fid, name, expertise, max_load, {day: list(periods) for day, periods in parsed[text].items()})
+                for fid, name, expertise, max_load, text in zip(
+                    faculty_df['Faculty_ID'].astype(str).tolist(),
+                    faculty_df['Faculty_Name'].astype(str).tolist(),
+                    faculty_df['Expertise'].astype(str).tolist(),
+                    faculty_df['Max_Load_Per_Week'].astype(int).tolist(),
+                    self._column(faculty_df, 'Availability', '{}').tolist()
                 )
-                self.faculty.append(faculty)
+            )
             
             # Load rooms
-            for _, row in rooms_df.iterrows():
-                equipment_str = str(row.get('Equipment', ''))
-                equipment = [e.strip() for e in equipment_str.split(',') if e.strip()] if equipment_str else []
-                
-                room = Room(
-                    id=str(row['Room_ID']),
-                    name=str(row['Room_Name']),
-                    capacity=int(row['Capacity']),
-                    room_type=str(row['Room_Type']),
-                    equipment=equipment
+            equipment = self._column(rooms_df, 'Equipment', '').str.split(',')
+            self.rooms.extend(
+                Room(rid, name, capacity, room_type, [e.strip() for e in items if e.strip()])
+                for rid, name, capacity, room_type, items in zip(
+                    rooms_df['Room_ID'].astype(str).tolist(),
+                    rooms_df['Room_Name'].astype(str).tolist(),
+                    rooms_df['Capacity'].astype(int).tolist(),
+                    rooms_df['Room_Type'].astype(str).tolist(),
+                    equipment.tolist()
                 )
-                self.rooms.append(room)
-            
-            # Load students
-            for _, row in students_df.iterrows():
-                enrolled_str = str(row.get('Enrolled_Courses', ''))
-                enrolled = [c.strip() for c in enrolled_str.split(',') if c.strip()] if enrolled_str else []
-                
-                student = Student(
-                    id=str(row['Student_ID']),
-                    name=str(row['Student_Name']),
-                    semester=int(row['Semester']),
-                    enrolled_courses=enrolled,
-                    course_groups={}
-                )
-                self.students.append(student)
+            )
+            
+            # Load students: one exploded (student position, course id) pair per enrollment
+            enrolled = self._column(students_df, 'Enrolled_Courses', '').reset_index(drop=True)
+            enrolled = enrolled.str.split(',').explode().str.strip()
+            enrolled = enrolled[enrolled.notna() & (enrolled != '')]
+            positions = enrolled.index.to_numpy()
+            course_ids = enrolled.to_numpy()
+            bounds = np.searchsorted(positions, np.arange(len(students_df) + 1))
+            self.students.extend(
+                Student(sid, name, semester, course_ids[bounds[i]:bounds[i + 1]].tolist(), {})
+                for i, (sid, name, semester) in enumerate(zip(
+                    students_df['Student_ID'].astype(str).tolist(),
+                    students_df['Student_Name'].astype(str).tolist(),
+                    students_df['Semester'].astype(int).tolist()
+                ))
+            )
+            
+            # Index enrollments once; group assignment and fitness read the index
+            self._build_enrollment_index(positions, course_ids)
             
             # Assign groups for courses that need splitting
-            self._assign_student_groups()
+            self._build_group_index(self._assign_student_groups())
+            self._fitness_evaluator = None
+            self._fitness_cache = None
             
         except Exception as e:
-            st.error(f"Error loading data: {e}")
+            logger.error(f"Error loading data: {e}")
             raise
 
-    def _assign_student_groups(self):
-        """Assign student groups for courses requiring splitting"""
+    def _data_signature(self):
+        # Also covers the one setting that changes what the evaluator scores
+        return (len(self.courses), len(self.faculty), len(self.rooms), len(self.students), len(self.timeslots),
+                self.slot_usage_constraints)
+
+    def _get_fitness_evaluator(self) -> IncrementalFitnessEvaluator:
+        """Interned lookup tables for the loaded data, rebuilt after load_data_from_ui"""
+        evaluator = self._fitness_evaluator
+        if evaluator is None or evaluator.signature != self._data_signature():
+            evaluator = IncrementalFitnessEvaluator(self)
+            self._fitness_evaluator = evaluator
+        return evaluator
+
+    def _get_fitness_cache(self) -> FitnessCache:
+        """LRU score cache for the loaded data, emptied after load_data_from_ui"""
+        cache = self._fitness_cache
+        signature = self._get_fitness_evaluator().signature
+        if cache is None or cache.signature != signature or cache.max_bytes != self.fitness_cache_bytes:
+            cache = FitnessCache(self.fitness_cache_bytes, signature)
+            self._fitness_cache = cache
+        return cache
+
+    @staticmethod
+    def _frozen_index(indices: List[int]) -> np.ndarray:
+        array = np.array(indices, dtype=np.int64)
+        array.setflags(write=False)
+        return array
+
+    def _build_enrollment_index(self, positions: Optional[np.ndarray] = None, course_ids: Optional[np.ndarray] = None):
+        """Index student positions by enrolled course from (student position, course id) pairs.
+        
+        Without pairs they are read off self.students.
+        """
+        if positions is None:
+            pairs = [(idx, cid) for idx, student in enumerate(self.students) for cid in student.enrolled_courses]
+            positions = np.array([idx for idx, _ in pairs], dtype=np.int64)
+            course_ids = np.array([cid for _, cid in pairs], dtype=object)
+        if not len(positions):
+            self.course_students = {}
+            return
+        import pandas as pd
+        
+        # Group by course with a stable sort so positions stay ascending; drop repeated enrollments
+        codes, uniques = pd.factorize(course_ids)
+        order = np.argsort(codes, kind='stable')
+        codes, positions = codes[order], np.asarray(positions, dtype=np.int64)[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (positions[1:] != positions[:-1])
+        codes, positions = codes[keep], positions[keep]
+        bounds = np.searchsorted(codes, np.arange(len(uniques) + 1))
+        self.course_students = {
+            cid: self._frozen_index(positions[bounds[i]:bounds[i + 1]]) for i, cid in enumerate(uniques)
+        }
+
+    def _build_group_index(self, split: Optional[Dict[str, np.ndarray]] = None):
+        """Index student positions and group sizes by (course_id, student_group).
+        
+        `split` maps each split course to the group of each of its students,
+        aligned with course_students; without it the groups are read off the
+        students' course_groups.
+        """
+        if split is None:
+            split = {}
+            for course_id in {course_id for student in self.students for course_id in student.course_groups}:
+                indices = self.course_students.get(course_id, np.empty(0, dtype=np.int64)).tolist()
+                split[course_id] = np.array([self.students[idx].course_groups.get(course_id, 1) for idx in indices], dtype=np.int64)
+        self.course_group_students = {}
+        for course_id, indices in self.course_students.items():
+            if course_id not in split:
+                self.course_group_students[(course_id, 1)] = indices
+                continue
+            labels = split[course_id]
+            for group in dict.fromkeys(labels.tolist()):
+                self.course_group_students[(course_id, group)] = self._frozen_index(indices[labels == group])
+        self.course_group_sizes = {key: len(idx) for key, idx in self.course_group_students.items()}
+
+    def _assign_student_groups(self) -> Dict[str, np.ndarray]:
+        """Assign student groups for courses requiring splitting; returns the groups for _build_group_index"""
+        split = {}
         try:
+            largest_room = {}  # room type -> capacity of its largest room
+            for room in self.rooms:
+                largest_room[room.room_type] = max(largest_room.get(room.room_type, 0), room.capacity)
+            rank = np.empty(len(self.students), dtype=np.int64)  # position of each student in student id order
+            rank[np.argsort(np.array([s.id for s in self.students], dtype=object), kind='stable')] = np.arange(len(self.students))
             for course in self.courses:
-                enrolled_students = [s for s in self.students if course.id in s.enrolled_courses]
-                if not enrolled_students:
+                enrolled = self.course_students.get(course.id, ())
+                if not len(enrolled):
                     continue
                 
-                suitable_rooms = [r for r in self.rooms if r.room_type == course.room_type_required and course.room_type_required != 'none']
-                max_cap = max([r.capacity for r in suitable_rooms], default=course.max_students)
-                groups_needed = math.ceil(len(enrolled_students) / max_cap)
+                max_cap = course.max_students
+                if course.room_type_required != 'none':
+                    max_cap = largest_room.get(course.room_type_required, max_cap)
+                groups_needed = math.ceil(len(enrolled) / max_cap)
                 
                 if groups_needed > 1:
-                    enrolled_list = sorted(enrolled_students, key=lambda s: s.id)
-                    for i, student in enumerate(enrolled_list):
-                        group = (i % groups_needed) + 1
-                        student.course_groups[course.id] = group
+                    # Round-robin over the enrolled students in student id order
+                    labels = np.empty(len(enrolled), dtype=np.int64)
+                    labels[np.argsort(rank[enrolled])] = np.arange(len(enrolled)) % groups_needed + 1
+                    split[course.id] = labels
+                    for idx, group in zip(enrolled.tolist(), labels.tolist()):
+                        self.students[idx].course_groups[course.id] = group
         except Exception as e:
-            st.warning(f"Error assigning groups: {e}")
+            logger.warning(f"Error assigning groups: {e}")
+        return split
 
     def _generate_time_slots(self):
-        """Generate time slots for 6 working days with 7 periods each"""
+        """Generate one time slot per working day and PERIOD_TIMES entry (6 x 7 by default)"""
         self.timeslots.clear()
         
-        # Period timings (7 periods with lunch break after 3rd period)
-        period_times = [
-            ('09:00', '10:00'),  # Period 1
-            ('10:00', '11:00'),  # Period 2
-            ('11:00', '12:00'),  # Period 3
-            ('12:30', '13:30'),  # Period 4 (after lunch)
-            ('13:30', '14:30'),  # Period 5
-            ('14:30', '15:30'),  # Period 6
-            ('15:30', '16:30'),  # Period 7
-        ]
-        
         slot_id = 1
         for day in self.days:
-            for period_num, (start, end) in enumerate(period_times, 1):
+            for period_num, (start, end) in enumerate(self.PERIOD_TIMES, 1):
                 timeslot = TimeSlot(
                     id=f'T{slot_id:03d}',
                     day=day,
@@ -254,7 +1493,7 @@ class EnhancedGeneticTimetableGenerator:
         """Calculate how many sessions per week a course needs"""
         try:
             if course.course_type == 'School_Internship':
-                return 7  # Full day
+                return len(self.PERIOD_TIMES)  # Full day
             
             course_type = course.course_type
             hours_per_week = course.credits * self.CREDIT_HOURS_MAPPING.get(course_type, 2)
@@ -267,21 +1506,186 @@ class EnhancedGeneticTimetableGenerator:
         except:
             return 1  # Fallback
 
-    def _calculate_student_groups(self, course: Course, enrolled_students: List[Student], suitable_rooms: List[Room]) -> int:
+    def _calculate_student_groups(self, course: Course, enrolled_count: int, suitable_rooms: List[Room]) -> int:
         """Calculate number of student groups needed"""
         try:
             if course.room_type_required == 'none':
                 return 1
             max_room_capacity = max([r.capacity for r in suitable_rooms]) if suitable_rooms else course.max_students
             effective_capacity = min(course.max_students, max_room_capacity)
-            return math.ceil(len(enrolled_students) / effective_capacity) if effective_capacity > 0 else 1
+            return math.ceil(enrolled_count / effective_capacity) if effective_capacity > 0 else 1
         except:
             return 1
 
+    def check_feasibility(self) -> FeasibilityReport:
+        """Capacity bounds every conflict-free timetable of the loaded data has to meet.
+        
+        The sessions create_random_chromosome lays out (sessions per week x
+        student groups) are counted against what the data supplies: able
+        faculty and their available periods per expertise, rooms of the right
+        type per group size (Hall's condition over the nested capacity
+        thresholds), periods per student, the credit window and slot usage.
+        A max-flow relaxation then books a faculty and a room in the same
+        timeslot for every session. A violated hard bound proves that the GA
+        cannot reach zero hard violations. Nothing is evolved, so this runs in
+        milliseconds.
+        """
+        started = perf_counter()
+        evaluator = self._get_fitness_evaluator()
+        T = evaluator.n_slots
+        bounds = []
+        
+        # (course index, sessions, group size) per student group
+        demand = []
+        for ci, course in enumerate(self.courses):
+            sessions = self._calculate_required_sessions_per_week(course)
+            groups = 1
+            if course.course_type != 'School_Internship':
+                suitable = [r for r in self.rooms if r.room_type == course.room_type_required]
+                if not suitable and course.room_type_required != 'none':
+                    suitable = self.rooms
+                groups = self._calculate_student_groups(course, len(self.course_students.get(course.id, ())), suitable)
+            demand.extend((ci, sessions, self.course_group_sizes.get((course.id, g), 0)) for g in range(1, groups + 1))
+        course_sessions = np.zeros(len(self.courses), dtype=np.int64)
+        for ci, sessions, _ in demand:
+            course_sessions[ci] += sessions
+        
+        # Hard 5, 9, 2: every course needs able faculty and a room type with a room its groups fit in
+        schedulable = np.ones(len(self.courses), dtype=bool)
+        for ci, course in enumerate(self.courses):
+            if not evaluator.course_faculty[ci]:
+                bounds.append(CapacityBound(
+                    'Hard 5: expertise', f"course {course.id} ({course.faculty_expertise_required} faculty)",
+                    int(course_sessions[ci]), 0
+                ))
+                schedulable[ci] = False
+            if course.room_type_required == 'none':
+                continue
+            rooms = evaluator.course_rooms[ci]
+            if not rooms:
+                bounds.append(CapacityBound(
+                    'Hard 9: room type', f"course {course.id} ({course.room_type_required} rooms)",
+                    int(course_sessions[ci]), 0
+                ))
+                schedulable[ci] = False
+                continue
+            largest = int(evaluator.room_capacity[rooms].max())
+            group_size = max((size for c, _, size in demand if c == ci), default=0)
+            if group_size > largest:
+                bounds.append(CapacityBound('Hard 2: room capacity', f"largest group of course {course.id}", group_size, largest))
+        
+        # Hard 3, 8: faculty periods per expertise; Soft 1: weekly load caps
+        faculty_periods = evaluator.available.sum(axis=1)
+        for expertise, members in evaluator.faculty_by_expertise.items():
+            needed = int(sum(course_sessions[ci] for ci, c in enumerate(self.courses)
+                             if c.faculty_expertise_required == expertise))
+            if not needed:
+                continue
+            indices = [evaluator.faculty_index[f.id] for f in members]
+            bounds.append(CapacityBound(
+                'Hard 3: faculty periods', f"{expertise} sessions", needed, int(faculty_periods[indices].sum())
+            ))
+            bounds.append(CapacityBound(
+                'Soft 1: faculty load', f"{expertise} sessions", needed, sum(f.max_load_per_week for f in members), hard=False
+            ))
+        
+        # Hard 3: room periods per type; groups of s+ students only fit rooms of capacity >= s
+        for room_type, members in evaluator.rooms_by_type.items():
+            sizes = np.array([size for ci, sessions, size in demand for _ in range(sessions)
+                              if self.courses[ci].room_type_required == room_type], dtype=np.int64)
+            if not len(sizes):
+                continue
+            capacities = np.array([r.capacity for r in members], dtype=np.int64)
+            tightest = None
+            for threshold in np.unique(sizes[sizes <= capacities.max()]).tolist():
+                subject = f"{room_type} sessions" if threshold == sizes.min() else f"{room_type} sessions for {threshold}+ students"
+                bound = CapacityBound(
+                    'Hard 3: room periods', subject,
+                    int((sizes >= threshold).sum()), T * int((capacities >= threshold).sum())
+                )
+                if tightest is None or bound.utilization > tightest.utilization:
+                    tightest = bound
+            if tightest is not None:
+                bounds.append(tightest)
+        
+        # Hard 4: periods per student
+        load = np.zeros(evaluator.n_students, dtype=np.int64)
+        for (ci, _), gi in evaluator.group_index.items():
+            sessions = self._calculate_required_sessions_per_week(self.courses[ci])
+            load[evaluator.group_members[evaluator.group_ptr[gi]:evaluator.group_ptr[gi + 1]]] += sessions
+        if len(load):
+            busiest = int(load.argmax())
+            bounds.append(CapacityBound('Hard 4: student periods', f"student {self.students[busiest].id}", int(load[busiest]), T))
+        
+        # Hard 6: credits depend on enrollments only
+        outside = evaluator.credit_penalty // 100000
+        if outside:
+            bounds.append(CapacityBound(
+                'Hard 6: credits',
+                f"students outside {self.MIN_SEMESTER_CREDITS}-{self.MAX_SEMESTER_CREDITS} credits", outside, 0
+            ))
+        
+        # Hard 13 fills every timeslot Hard 1 leaves in use
+        if self.slot_usage_constraints:
+            bounds.append(CapacityBound(
+                'Hard 13: slot usage', "timeslots to fill", evaluator.slots_to_fill, int(course_sessions.sum())
+            ))
+        
+        # Max-flow relaxation: sessions of (expertise, room type) -> (timeslot, expertise), passing as many
+        # units as faculty are available -> (timeslot, room type), passing as many units as rooms -> sink
+        classes = defaultdict(int)
+        for ci, sessions, _ in demand:
+            if schedulable[ci]:
+                course = self.courses[ci]
+                classes[course.faculty_expertise_required, course.room_type_required] += sessions
+        if classes:
+            total = sum(classes.values())
+            nodes = {}  # source 0, sink 1
+            
+            def node(*key):
+                return nodes.setdefault(key, len(nodes) + 2)
+            
+            edges = []
+            for (e, k), sessions in classes.items():
+                edges.append((0, node('class', e, k), sessions))
+                for t in range(T):
+                    edges.append((node('class', e, k), node('faculty in', t, e), total))
+                    edges.append((node('faculty', t, e), node('room', t, k), total))
+            for e in {e for e, _ in classes}:
+                indices = [evaluator.faculty_index[f.id] for f in evaluator.faculty_by_expertise[e]]
+                free = evaluator.available[indices].sum(axis=0)
+                edges.extend((node('faculty in', t, e), node('faculty', t, e), int(free[t])) for t in range(T))
+            for k in {k for _, k in classes}:
+                rooms = total if k == 'none' else len(evaluator.rooms_by_type[k])
+                edges.extend((node('room', t, k), 1, rooms) for t in range(T))
+            bounds.append(CapacityBound(
+                'Hard 3: faculty and room per timeslot', "sessions", total, _max_flow(len(nodes) + 2, edges, 0, 1)
+            ))
+        
+        return FeasibilityReport(bounds, perf_counter() - started)
+
+    def _check_before_run(self):
+        """Pre-run check_feasibility according to feasibility_check; 'refuse' raises ValueError if the data is infeasible"""
+        self.feasibility_report = None
+        if self.feasibility_check == 'off' or not self.courses:
+            return
+        report = self.feasibility_report = self.check_feasibility()
+        if report.feasible:
+            logger.info(f"Feasibility check ({report.seconds * 1000:.1f} ms), bottleneck {report.bottleneck.message}")
+            return
+        issues = [issue for issue in report.issues if issue.hard]
+        summary = '; '.join(issue.message for issue in issues[:5])
+        if len(issues) > 5:
+            summary += f" and {len(issues) - 5} more"
+        if self.feasibility_check == 'refuse':
+            raise ValueError(f"Zero hard violations are out of reach: {summary}")
+        logger.warning(f"Zero hard violations are out of reach: {summary}")
+
     def create_random_chromosome(self) -> TimetableChromosome:
         """Create a random chromosome with proper NEP 2020 constraints"""
         try:
-            genes = []
+            codec = self._get_fitness_evaluator().codec
+            rows = []  # (course, timeslot, faculty, room, group) interned ids
             
             # First, schedule internships (full day blocks)
             internship_courses = [c for c in self.courses if c.course_type == 'School_Internship']
@@ -289,30 +1693,27 @@ class EnhancedGeneticTimetableGenerator:
                 suitable_faculty = [f for f in self.faculty if f.expertise == course.faculty_expertise_required]
                 if not suitable_faculty:
                     suitable_faculty = self.faculty
-                faculty = random.choice(suitable_faculty)
+                faculty = self.rng.choice(suitable_faculty)
                 
                 # Choose one random day for full schedule
-                day = random.choice(self.days)
+                day = self.rng.choice(self.days)
                 day_timeslots = [t for t in self.timeslots if t.day == day]
                 
                 # No room for internship
-                room_id = ''
-                
                 for timeslot in day_timeslots:
                     # Check faculty availability
                     if timeslot.period_number in faculty.availability.get(timeslot.day, []):
-                        gene = Gene(
-                            course_id=course.id,
-                            timeslot_id=timeslot.id,
-                            faculty_id=faculty.id,
-                            room_id=room_id,
-                            student_group=1
-                        )
-                        genes.append(gene)
+                        rows.append((
+                            codec.course_index[course.id],
+                            codec.slot_index[timeslot.id],
+                            codec.faculty_index[faculty.id],
+                            -1,
+                            1
+                        ))
             
             # Now schedule other courses
             for course in [c for c in self.courses if c.course_type != 'School_Internship']:
-                enrolled_students = [s for s in self.students if course.id in s.enrolled_courses]
+                enrolled_count = len(self.course_students.get(course.id, ()))
                 sessions_per_week = self._calculate_required_sessions_per_week(course)
                 
                 # Find suitable faculty
@@ -325,11 +1726,11 @@ class EnhancedGeneticTimetableGenerator:
                 if not suitable_rooms and course.room_type_required != 'none':
                     suitable_rooms = self.rooms
                 
-                groups_needed = self._calculate_student_groups(course, enrolled_students, suitable_rooms)
+                groups_needed = self._calculate_student_groups(course, enrolled_count, suitable_rooms)
                 
                 # Generate genes for this course
                 for session in range(sessions_per_week):
-                    timeslot = random.choice(self.timeslots)
+                    timeslot = self.rng.choice(self.timeslots)
                     
                     for group_num in range(1, groups_needed + 1):
                         # Choose available faculty
@@ -339,192 +1740,412 @@ class EnhancedGeneticTimetableGenerator:
                         ]
                         if not available_faculty:
                             available_faculty = suitable_faculty
-                        faculty = random.choice(available_faculty)
+                        faculty = self.rng.choice(available_faculty)
                         
                         # Choose suitable room with capacity
-                        group_students = [
-                            s for s in enrolled_students if s.course_groups.get(course.id, 1) == group_num
-                        ]
+                        group_size = self.course_group_sizes.get((course.id, group_num), 0)
                         suitable_for_group = [
-                            r for r in suitable_rooms if r.capacity >= len(group_students)
+                            r for r in suitable_rooms if r.capacity >= group_size
                         ]
                         if not suitable_for_group:
                             suitable_for_group = suitable_rooms
-                        room = random.choice(suitable_for_group) if suitable_for_group else None
-                        room_id = room.id if room else ''
+                        room = self.rng.choice(suitable_for_group) if suitable_for_group else None
                         
-                        gene = Gene(
-                            course_id=course.id,
-                            timeslot_id=timeslot.id,
-                            faculty_id=faculty.id,
-                            room_id=room_id,
-                            student_group=group_num
-                        )
-                        genes.append(gene)
-            
-            return TimetableChromosome(genes)
+                        rows.append((
+                            codec.course_index[course.id],
+                            codec.slot_index[timeslot.id],
+                            codec.faculty_index[faculty.id],
+                            codec.room_index[room.id] if room else -1,
+                            group_num
+                        ))
+            
+            columns = list(zip(*rows)) or [()] * len(GeneArrays.COLUMNS)
+            return TimetableChromosome(encoded=GeneArrays(codec, *columns))
         except Exception as e:
-            st.warning(f"Error creating chromosome: {e}")
+            logger.warning(f"Error creating chromosome: {e}")
             return TimetableChromosome([])
 
-    def calculate_fitness(self, chromosome: TimetableChromosome) -> float:
-        """Enhanced fitness calculation with NEP 2020 compliance"""
+    def create_constructed_chromosome(self) -> TimetableChromosome:
+        """Randomized greedy timetable: most-constrained sessions first, into conflict-free slots"""
         try:
-            penalty = 0
-            reward = 0
+            evaluator = self._get_fitness_evaluator()
+            codec = evaluator.codec
+            T = evaluator.n_slots
+            available = evaluator.available_bits
+            max_load = evaluator.max_load.tolist()
+            rows = []  # (course, timeslot, faculty, room, group) interned ids
             
-            # Create lookup dictionaries
-            course_dict = {c.id: c for c in self.courses}
-            faculty_dict = {f.id: f for f in self.faculty}
-            room_dict = {r.id: r for r in self.rooms}
-            timeslot_dict = {t.id: t for t in self.timeslots}
+            # Occupancy bitsets: one SlotGrid row per entity
+            faculty_busy = SlotGrid(T, len(self.faculty))
+            room_busy = SlotGrid(T, len(self.rooms))
+            student_busy = SlotGrid(T, len(self.students))
+            full = faculty_busy.full
+            faculty_hours = [0] * len(self.faculty)
+            all_faculty = list(range(len(self.faculty)))
             
-            # Tracking structures
-            faculty_schedule = {f.id: {} for f in self.faculty}
-            room_schedule = {r.id: {} for r in self.rooms}
-            student_schedules = {s.id: {} for s in self.students}
+            def members(ci, group):
+                gi = evaluator.group_index.get((ci, group), evaluator.empty_group)
+                return evaluator.group_members[evaluator.group_ptr[gi]:evaluator.group_ptr[gi + 1]].tolist()
             
-            # HARD CONSTRAINTS
-            for gene in chromosome.genes:
-                course = course_dict.get(gene.course_id)
-                faculty = faculty_dict.get(gene.faculty_id)
-                room = room_dict.get(gene.room_id) if gene.room_id else None
-                timeslot = timeslot_dict.get(gene.timeslot_id)
-                
-                if not all([course, faculty, timeslot]):
-                    penalty += 100000
-                    continue
+            def book(ci, slot, fi, ri, group, students):
+                faculty_busy.book(fi, slot)
+                faculty_hours[fi] += 1
+                if ri >= 0:
+                    room_busy.book(ri, slot)
+                for si in students:
+                    student_busy.book(si, slot)
+                rows.append((ci, slot, fi, ri, group))
+            
+            # Internships first: one full day with the faculty/day pair that clashes least
+            popcount = SlotGrid.popcount
+            for course in [c for c in self.courses if c.course_type == 'School_Internship']:
+                ci = codec.course_index[course.id]
+                faculty = evaluator.course_faculty[ci] or all_faculty
+                students = members(ci, 1)
+                best, best_cost = [], None
+                for day in evaluator.day_masks:
+                    student_clash = sum(popcount(student_busy.words[si] & day) for si in students)
+                    for fi in faculty:
+                        open_day = available[fi] & day
+                        cost = (student_clash, popcount(faculty_busy.words[fi] & open_day), -popcount(open_day))
+                        if best_cost is None or cost < best_cost:
+                            best, best_cost = [(fi, open_day)], cost
+                        elif cost == best_cost:
+                            best.append((fi, open_day))
+                if best:
+                    fi, open_day = self.rng.choice(best)
+                    for slot in SlotGrid.slots(open_day):
+                        book(ci, slot, fi, -1, 1, students)
+            
+            # Remaining sessions, one task per (course, session, group)
+            tasks = []
+            for course in [c for c in self.courses if c.course_type != 'School_Internship']:
+                ci = codec.course_index[course.id]
+                enrolled_count = len(self.course_students.get(course.id, ()))
+                suitable_rooms = [r for r in self.rooms if r.room_type == course.room_type_required]
+                if not suitable_rooms and course.room_type_required != 'none':
+                    suitable_rooms = self.rooms
+                groups_needed = self._calculate_student_groups(course, enrolled_count, suitable_rooms)
+                faculty = evaluator.course_faculty[ci] or all_faculty
+                room_ids = [codec.room_index[r.id] for r in suitable_rooms]
+                # Fewer usable faculty slots and rooms = more constrained
+                faculty_slots = popcount(reduce(operator.or_, map(available.__getitem__, faculty), 0))
                 
-                # Hard 8: Faculty availability
-                if timeslot.period_number not in faculty.availability.get(timeslot.day, []):
-                    penalty += 100000
+                for group_num in range(1, groups_needed + 1):
+                    students = members(ci, group_num)
+                    rooms = [ri for ri in room_ids if evaluator.room_capacity[ri] >= len(students)] or room_ids
+                    options = faculty_slots * max(len(rooms), 1)
+                    for _ in range(self._calculate_required_sessions_per_week(course)):
+                        tasks.append((options, -len(students), self.rng.random(), ci, group_num, faculty, rooms, students))
+            tasks.sort(key=lambda task: task[:3])
+            
+            for _, _, _, ci, group_num, faculty, rooms, students in tasks:
+                # Free slots need the whole group, one able faculty and (if any) one fitting room
+                faculty_free = [available[fi] & ~faculty_busy.words[fi] for fi in faculty]
+                faculty_ok = reduce(operator.or_, faculty_free, 0)
+                room_ok = full & ~reduce(operator.and_, map(room_busy.words.__getitem__, rooms), full) if rooms else full
+                student_clash = student_busy.union(students)
                 
-                # Hard 3: Faculty overlap
-                if gene.timeslot_id in faculty_schedule[gene.faculty_id]:
-                    penalty += 100000
+                free = SlotGrid.slots(faculty_ok & room_ok & ~student_clash)
+                if free:
+                    slot = free[self.rng.randrange(len(free))]
                 else:
-                    faculty_schedule[gene.faculty_id][gene.timeslot_id] = gene.course_id
-                
-                # Hard 3: Room overlap (if room assigned)
-                if room and gene.timeslot_id in room_schedule[gene.room_id]:
-                    penalty += 100000
-                elif room:
-                    room_schedule[gene.room_id][gene.timeslot_id] = gene.course_id
+                    # Nothing free: fall back to the least conflicting slots (student clashes + missing faculty/room)
+                    cost = SlotGrid.column_counts(
+                        [student_busy.words[si] for si in students] + [full & ~faculty_ok, full & ~room_ok], T
+                    )
+                    fallback = np.flatnonzero(cost == cost.min())
+                    slot = int(fallback[self.rng.randrange(len(fallback))])
                 
-                # Hard 4,2: Student clash and capacity
-                group_students = [
-                    s for s in self.students 
-                    if gene.course_id in s.enrolled_courses and s.course_groups.get(gene.course_id, 1) == gene.student_group
-                ]
-                for student in group_students:
-                    if gene.timeslot_id in student_schedules[student.id]:
-                        penalty += 100000
-                    else:
-                        student_schedules[student.id][gene.timeslot_id] = gene.course_id
+                free_at_slot = [fi for fi, bits in zip(faculty, faculty_free) if bits >> slot & 1]
+                candidates = [fi for fi in free_at_slot if faculty_hours[fi] < max_load[fi]] or free_at_slot or faculty
+                fi = candidates[self.rng.randrange(len(candidates))]
                 
-                if room and len(group_students) > room.capacity:
-                    penalty += 100000
+                ri = -1
+                if rooms:
+                    open_rooms = [r for r in rooms if not room_busy.words[r] >> slot & 1] or rooms
+                    ri = open_rooms[self.rng.randrange(len(open_rooms))]
                 
-                # Hard 5,9,10: Expertise and room type
-                if faculty.expertise != course.faculty_expertise_required:
-                    penalty += 50000
-                if room and room.room_type != course.room_type_required:
-                    penalty += 50000
+                book(ci, slot, fi, ri, group_num, students)
             
-            # Hard 6: Credit limits (per student, strictly 22-24)
-            for student in self.students:
-                student_credits = sum(course_dict[c].credits for c in student.enrolled_courses if c in course_dict)
-                if student_credits < self.MIN_SEMESTER_CREDITS or student_credits > self.MAX_SEMESTER_CREDITS:
+            columns = list(zip(*rows)) or [()] * len(GeneArrays.COLUMNS)
+            return TimetableChromosome(encoded=GeneArrays(codec, *columns))
+        except Exception as e:
+            logger.warning(f"Error constructing chromosome: {e}")
+            return self.create_random_chromosome()
+
+    def calculate_fitness(self, chromosome: TimetableChromosome) -> float:
+        """Enhanced fitness calculation with NEP 2020 compliance"""
+        try:
+            # Incremental path: reuse occupancy counters kept by crossover/mutate
+            evaluator = self._get_fitness_evaluator()
+            state = chromosome.fitness_state
+            if state is None or state.evaluator is not evaluator:
+                state = evaluator.build_state(chromosome)
+                chromosome.fitness_state = state
+            if state is not None:
+                penalty, reward = evaluator.score(state)
+                return self._set_fitness(chromosome, penalty, reward)
+            
+            # Chromosomes with unknown ids are scored gene by gene
+            return self._set_fitness(chromosome, *self._score_genes(chromosome))
+        except Exception as e:
+            logger.warning(f"Error in fitness calculation: {e}")
+            return 0.0
+
+    def _score_genes(self, chromosome: TimetableChromosome) -> Tuple[int, int]:
+        """(penalty, reward) gene by gene; the reference for IncrementalFitnessEvaluator"""
+        penalty = 0
+        reward = 0
+        
+        # Create lookup dictionaries
+        course_dict = {c.id: c for c in self.courses}
+        faculty_dict = {f.id: f for f in self.faculty}
+        room_dict = {r.id: r for r in self.rooms}
+        timeslot_dict = {t.id: t for t in self.timeslots}
+        
+        # Tracking structures
+        faculty_schedule = {f.id: {} for f in self.faculty}
+        room_schedule = {r.id: {} for r in self.rooms}
+        student_schedules = [{} for _ in self.students]
+        no_students = self._frozen_index([])
+        
+        # HARD CONSTRAINTS
+        for gene in chromosome.genes:
+            course = course_dict.get(gene.course_id)
+            faculty = faculty_dict.get(gene.faculty_id)
+            room = room_dict.get(gene.room_id) if gene.room_id else None
+            timeslot = timeslot_dict.get(gene.timeslot_id)
+            
+            if not all([course, faculty, timeslot]):
+                penalty += 100000
+                continue
+            
+            # Hard 8: Faculty availability
+            if timeslot.period_number not in faculty.availability.get(timeslot.day, []):
+                penalty += 100000
+            
+            # Hard 3: Faculty overlap
+            if gene.timeslot_id in faculty_schedule[gene.faculty_id]:
+                penalty += 100000
+            else:
+                faculty_schedule[gene.faculty_id][gene.timeslot_id] = gene.course_id
+            
+            # Hard 3: Room overlap (if room assigned)
+            if room and gene.timeslot_id in room_schedule[gene.room_id]:
+                penalty += 100000
+            elif room:
+                room_schedule[gene.room_id][gene.timeslot_id] = gene.course_id
+            
+            # Hard 4,2: Student clash and capacity
+            group_students = self.course_group_students.get((gene.course_id, gene.student_group), no_students)
+            for student_idx in group_students.tolist():
+                if gene.timeslot_id in student_schedules[student_idx]:
                     penalty += 100000
+                else:
+                    student_schedules[student_idx][gene.timeslot_id] = gene.course_id
             
-            # Hard 13: All slots occupied
-            used_slots = set(gene.timeslot_id for gene in chromosome.genes)
-            if len(used_slots) < len(self.timeslots):
-                penalty += (len(self.timeslots) - len(used_slots)) * 10000
-            
-            # Hard 1: Total tutorial hours <=40/week (unique occupied slots <=40, but 42 max, approx)
-            if len(used_slots) > self.MAX_TUTORIAL_HOURS_PER_WEEK:
-                penalty += (len(used_slots) - self.MAX_TUTORIAL_HOURS_PER_WEEK) * 10000
-            
-            # SOFT CONSTRAINTS
-            # Soft 1: Faculty workload 16-20 hours/week
-            for fid, schedule in faculty_schedule.items():
-                weekly_hours = len(schedule)
-                if weekly_hours > faculty_dict[fid].max_load_per_week:
-                    penalty += (weekly_hours - faculty_dict[fid].max_load_per_week) * 10
-                elif weekly_hours < 16:
-                    penalty += (16 - weekly_hours) * 10
+            if room and len(group_students) > room.capacity:
+                penalty += 100000
+            
+            # Hard 5,9,10: Expertise and room type
+            if faculty.expertise != course.faculty_expertise_required:
+                penalty += 50000
+            if room and room.room_type != course.room_type_required:
+                penalty += 50000
+        
+        # Hard 6: Credit limits (per student, strictly 22-24)
+        for student in self.students:
+            student_credits = sum(course_dict[c].credits for c in student.enrolled_courses if c in course_dict)
+            if student_credits < self.MIN_SEMESTER_CREDITS or student_credits > self.MAX_SEMESTER_CREDITS:
+                penalty += 100000
+        
+        # Hard 13: All slots occupied, as far as Hard 1 allows
+        used_slots = set(gene.timeslot_id for gene in chromosome.genes)
+        slots_to_fill = min(len(self.timeslots), self.MAX_TUTORIAL_HOURS_PER_WEEK)
+        if self.slot_usage_constraints and len(used_slots) < slots_to_fill:
+            penalty += (slots_to_fill - len(used_slots)) * 10000
+        
+        # Hard 1: Total tutorial hours <=40/week (unique occupied slots <=40, but 42 max, approx)
+        if self.slot_usage_constraints and len(used_slots) > self.MAX_TUTORIAL_HOURS_PER_WEEK:
+            penalty += (len(used_slots) - self.MAX_TUTORIAL_HOURS_PER_WEEK) * 10000
+        
+        # SOFT CONSTRAINTS
+        # Soft 1: Faculty workload 16-20 hours/week
+        for fid, schedule in faculty_schedule.items():
+            weekly_hours = len(schedule)
+            if weekly_hours > faculty_dict[fid].max_load_per_week:
+                penalty += (weekly_hours - faculty_dict[fid].max_load_per_week) * 10
+            elif weekly_hours < 16:
+                penalty += (16 - weekly_hours) * 10
+            else:
+                reward += 50
+        
+        # Soft 2: Avoid >3 consecutive for students
+        for schedule in student_schedules:
+            daily_schedules = defaultdict(list)
+            for tsid in schedule:
+                ts = timeslot_dict.get(tsid)
+                if ts:
+                    daily_schedules[ts.day].append(ts.period_number)
+            
+            for day, periods in daily_schedules.items():
+                if not periods:
+                    continue
+                periods.sort()
+                consecutive = 1
+                max_consec = 1
+                for i in range(1, len(periods)):
+                    if periods[i] == periods[i-1] + 1:
+                        consecutive += 1
+                        max_consec = max(max_consec, consecutive)
+                    else:
+                        consecutive = 1
+                if max_consec > 3:
+                    penalty += (max_consec - 3) * 20
+                else:
+                    reward += 30
+        
+        # Soft 3: Theory in morning
+        for gene in chromosome.genes:
+            course = course_dict.get(gene.course_id)
+            ts = timeslot_dict.get(gene.timeslot_id)
+            if course and ts and course.course_type in ['Major', 'Minor', 'Elective', 'AECC/VAC']:
+                if ts.period_number <= 3:
+                    reward += 20
+                else:
+                    penalty += 10
+        
+        # Soft 5: Avoid monotony (same period every day)
+        course_periods = defaultdict(list)
+        for gene in chromosome.genes:
+            ts = timeslot_dict.get(gene.timeslot_id)
+            if ts:
+                course_periods[gene.course_id].append(ts.period_number)
+        
+        for cid, periods in course_periods.items():
+            if len(periods) < 2:
+                continue
+            period_counts = defaultdict(int)
+            for p in periods:
+                period_counts[p] += 1
+            max_same = max(period_counts.values())
+            if max_same > len(self.days) // 2:
+                penalty += (max_same - 1) * 5
+        
+        return penalty, reward
+
+    def calculate_fitness_batch(self, population: List[TimetableChromosome], executor=None) -> List[float]:
+        """Fitness of a whole population with vectorized constraint counting.
+        
+        With a process-pool `executor` from _create_fitness_executor, the
+        population is split into chunks that only carry the compact
+        GeneArrays columns; results keep population order.
+        """
+        try:
+            evaluator = self._get_fitness_evaluator()
+            cache = self._get_fitness_cache()
+            pending, encoded = {}, []  # digest -> chromosomes with that timetable
+            for chromosome in population:
+                state = chromosome.fitness_state
+                if state is not None and state.evaluator is evaluator:
+                    self._set_fitness(chromosome, *evaluator.score(state))
+                    continue
+                arrays = evaluator.gene_arrays(chromosome)
+                if arrays is None:
+                    self.calculate_fitness(chromosome)
+                    continue
+                key = FitnessCache.key(arrays)
+                if key in pending:
+                    cache.hits += 1  # duplicate within this batch
+                    pending[key].append(chromosome)
+                    continue
+                score = cache.get(key)
+                if score is not None:
+                    self._set_fitness(chromosome, *score)
                 else:
-                    reward += 50
-            
-            # Soft 2: Avoid >3 consecutive for students
-            for sid, schedule in student_schedules.items():
-                daily_schedules = defaultdict(list)
-                for tsid in schedule:
-                    ts = timeslot_dict.get(tsid)
-                    if ts:
-                        daily_schedules[ts.day].append(ts.period_number)
-                
-                for day, periods in daily_schedules.items():
-                    if not periods:
-                        continue
-                    periods.sort()
-                    consecutive = 1
-                    max_consec = 1
-                    for i in range(1, len(periods)):
-                        if periods[i] == periods[i-1] + 1:
-                            consecutive += 1
-                            max_consec = max(max_consec, consecutive)
-                        else:
-                            consecutive = 1
-                    if max_consec > 3:
-                        penalty += (max_consec - 3) * 20
-                    else:
-                        reward += 30
+                    pending[key] = [chromosome]
+                    encoded.append(arrays)
             
-            # Soft 3: Theory in morning
-            for gene in chromosome.genes:
-                course = course_dict.get(gene.course_id)
-                ts = timeslot_dict.get(gene.timeslot_id)
-                if course and ts and course.course_type in ['Major', 'Minor', 'Elective', 'AECC/VAC']:
-                    if ts.period_number <= 3:
-                        reward += 20
-                    else:
-                        penalty += 10
+            if executor is not None and len(encoded) > 1:
+                n_chunks = min(len(encoded), 2 * self._fitness_worker_count())
+                chunks = [encoded[i::n_chunks] for i in range(n_chunks)]
+                futures = [
+                    executor.submit(
+                        _score_packed_chromosomes,
+                        np.concatenate([np.stack(arrays.columns) for arrays in chunk], axis=1),
+                        [len(arrays) for arrays in chunk]
+                    )
+                    for chunk in chunks
+                ]
+                scores = [None] * len(encoded)
+                for i, future in enumerate(futures):
+                    scores[i::n_chunks] = future.result()
+            else:
+                scores = evaluator.score_batch([evaluator.columns(arrays) for arrays in encoded])
             
-            # Soft 5: Avoid monotony (same period every day)
-            course_periods = defaultdict(list)
-            for gene in chromosome.genes:
-                ts = timeslot_dict.get(gene.timeslot_id)
-                if ts:
-                    course_periods[gene.course_id].append(ts.period_number)
+            for (key, chromosomes), score in zip(pending.items(), scores):
+                cache.put(key, score)
+                for chromosome in chromosomes:
+                    self._set_fitness(chromosome, *score)
             
-            for cid, periods in course_periods.items():
-                if len(periods) < 2:
-                    continue
-                period_counts = defaultdict(int)
-                for p in periods:
-                    period_counts[p] += 1
-                max_same = max(period_counts.values())
-                if max_same > len(self.days) // 2:
-                    penalty += (max_same - 1) * 5
-            
-            # Calculate final fitness
-            total_violations = penalty - reward
-            
-            max_possible_penalty = 100000 * max(len(chromosome.genes), 1) * 2
-            fitness = max(0, 1 - (total_violations / max_possible_penalty))
-            
-            chromosome.fitness = fitness
-            chromosome.penalty_score = penalty
-            chromosome.reward_score = reward
-            chromosome.hard_violations = penalty // 10000 if penalty >= 10000 else 0  # Adjusted threshold
-            chromosome.soft_violations = max(0, int(penalty - chromosome.hard_violations * 10000))
-            
-            return fitness
+            return [chromosome.fitness for chromosome in population]
         except Exception as e:
-            st.warning(f"Error in fitness calculation: {e}")
-            return 0.0
+            logger.warning(f"Error in batch fitness calculation: {e}")
+            return [0.0] * len(population)
+
+    def _process_limit(self, workers: int) -> int:
+        """`workers` capped by max_processes"""
+        return min(workers, self.max_processes) if self.max_processes else workers
+
+    def _process_pool(self, workers: int, **kwargs) -> ProcessPoolExecutor:
+        """ProcessPoolExecutor of `workers` processes started with process_start_method"""
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context(self.process_start_method), **kwargs
+        )
+
+    def _fitness_worker_count(self) -> int:
+        return self._process_limit(self.fitness_workers if self.fitness_workers else os.cpu_count() or 1)
+
+    def _create_fitness_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Process pool for batch fitness if fitness_workers asks for one, else None"""
+        workers = self._fitness_worker_count()
+        if self.fitness_mode != 'batch' or workers <= 1:
+            return None
+        return self._process_pool(
+            workers,
+            initializer=_init_fitness_worker,
+            initargs=(self._get_fitness_evaluator(),)
+        )
+
+    def _evaluate_population(self, population: List[TimetableChromosome], executor=None):
+        """Score chromosomes according to fitness_mode; cache hits do not count as evaluations"""
+        if self.fitness_mode == 'batch':
+            self.calculate_fitness_batch(population, executor)
+            stats = self._get_fitness_cache().take_stats()
+            self.cache_history.append(stats)
+            self.evaluations += len(population) - stats['hits']
+        else:
+            self.evaluations += len(population)
+            for chromosome in population:
+                self.calculate_fitness(chromosome)
+
+    def _set_fitness(self, chromosome: TimetableChromosome, penalty: int, reward: int) -> float:
+        """Calculate final fitness from penalty/reward totals and store it on the chromosome"""
+        disruption = self._disruption(chromosome) if self._baseline is not None else 0
+        total_violations = penalty - reward + disruption
+        
+        max_possible_penalty = 100000 * max(chromosome.gene_count, 1) * 2
+        fitness = max(0, 1 - (total_violations / max_possible_penalty))
+        
+        chromosome.fitness = fitness
+        chromosome.penalty_score = penalty
+        chromosome.reward_score = reward
+        chromosome.disruption_penalty = disruption
+        chromosome.hard_violations = penalty // 10000 if penalty >= 10000 else 0  # Adjusted threshold
+        chromosome.soft_violations = max(0, int(penalty - chromosome.hard_violations * 10000))
+        
+        return fitness
 
     def selection(self, population: List[TimetableChromosome]) -> List[TimetableChromosome]:
         """Tournament selection"""
@@ -533,8 +2154,8 @@ class EnhancedGeneticTimetableGenerator:
             tournament_size = min(5, len(population))
             
             for _ in range(len(population)):
-                tournament = random.sample(population, tournament_size)
-                winner = max(tournament, key=lambda x: x.fitness)
+                tournament = self.rng.sample(population, tournament_size)
+                winner = max(tournament, key=self._rank)
                 selected.append(winner)
             
             return selected
@@ -542,105 +2163,1238 @@ class EnhancedGeneticTimetableGenerator:
             return population[:10] if population else []
 
     def crossover(self, parent1: TimetableChromosome, parent2: TimetableChromosome) -> Tuple[TimetableChromosome, TimetableChromosome]:
-        """Single-point crossover with error handling"""
-        try:
-            if random.random() > self.crossover_rate or min(len(parent1.genes), len(parent2.genes)) < 2:
-                return parent1, parent2
-            
-            min_length = min(len(parent1.genes), len(parent2.genes))
-            crossover_point = random.randint(1, min_length - 1)
-            
+        """Course-block or single-point crossover"""
+        if self.rng.random() > self.crossover_rate or min(parent1.gene_count, parent2.gene_count) < 2:
+            return parent1, parent2
+        
+        evaluator = self._get_fitness_evaluator()
+        arrays1, arrays2 = evaluator.gene_arrays(parent1), evaluator.gene_arrays(parent2)
+        if self.crossover_mode == 'course':
+            return self._course_crossover(parent1, parent2, arrays1, arrays2, evaluator)
+        
+        min_length = min(parent1.gene_count, parent2.gene_count)
+        crossover_point = self.rng.randint(1, min_length - 1)
+        if arrays1 is None or arrays2 is None:
             child1_genes = parent1.genes[:crossover_point] + parent2.genes[crossover_point:]
             child2_genes = parent2.genes[:crossover_point] + parent1.genes[crossover_point:]
-            
             return TimetableChromosome(child1_genes), TimetableChromosome(child2_genes)
-        except:
-            return parent1, parent2
+        
+        heads = arrays1.slice(0, crossover_point), arrays2.slice(0, crossover_point)
+        tails = arrays1.slice(crossover_point, len(arrays1)), arrays2.slice(crossover_point, len(arrays2))
+        child1 = TimetableChromosome(encoded=GeneArrays.concat([heads[0], tails[1]]))
+        child2 = TimetableChromosome(encoded=GeneArrays.concat([heads[1], tails[0]]))
+        
+        # Derive the children's counters from whichever parent shares more genes
+        state1, state2 = parent1.fitness_state, parent2.fitness_state
+        if state1 is not None and state2 is not None and state1.evaluator is state2.evaluator is evaluator:
+            child1.fitness_state = self._splice_states(state1, state2, heads, tails)
+            child2.fitness_state = self._splice_states(state2, state1, heads[::-1], tails[::-1])
+        if self.adaptive_rates:
+            marks1, marks2 = self._conflicts(parent1, arrays1), self._conflicts(parent2, arrays2)
+            child1.conflicts = (np.concatenate([marks1[0][:crossover_point], marks2[0][crossover_point:]]), marks1[1])
+            child2.conflicts = (np.concatenate([marks2[0][:crossover_point], marks1[0][crossover_point:]]), marks2[1])
+        
+        return child1, child2
+
+    def _course_crossover(self, parent1: TimetableChromosome, parent2: TimetableChromosome,
+                          arrays1: Optional[GeneArrays], arrays2: Optional[GeneArrays],
+                          evaluator: IncrementalFitnessEvaluator) -> Tuple[TimetableChromosome, TimetableChromosome]:
+        """Uniform crossover over courses: each child inherits every session of a course from one parent"""
+        swap = [self.rng.random() < 0.5 for _ in self.courses]
+        if arrays1 is None or arrays2 is None:
+            swapped = {c.id for c, flag in zip(self.courses, swap) if flag}
+            child1_genes = [g for g in parent1.genes if g.course_id not in swapped] + [g for g in parent2.genes if g.course_id in swapped]
+            child2_genes = [g for g in parent2.genes if g.course_id not in swapped] + [g for g in parent1.genes if g.course_id in swapped]
+            return TimetableChromosome(child1_genes), TimetableChromosome(child2_genes)
+        
+        swap = np.array(swap, dtype=bool)
+        moved1, moved2 = swap[arrays1.course], swap[arrays2.course]
+        kept1, kept2 = arrays1.take(~moved1), arrays2.take(~moved2)
+        blocks1, blocks2 = arrays1.take(moved1), arrays2.take(moved2)
+        child1 = TimetableChromosome(encoded=GeneArrays.concat([kept1, blocks2]))
+        child2 = TimetableChromosome(encoded=GeneArrays.concat([kept2, blocks1]))
+        
+        # Each child's counters follow from a parent by swapping the exchanged course blocks
+        state1, state2 = parent1.fitness_state, parent2.fitness_state
+        if state1 is not None and state2 is not None and state1.evaluator is state2.evaluator is evaluator:
+            child1.fitness_state = self._splice_states(state1, state2, (kept1, kept2), (blocks1, blocks2))
+            child2.fitness_state = self._splice_states(state2, state1, (kept2, kept1), (blocks2, blocks1))
+        if self.adaptive_rates:
+            marks1, marks2 = self._conflicts(parent1, arrays1), self._conflicts(parent2, arrays2)
+            child1.conflicts = (np.concatenate([marks1[0][~moved1], marks2[0][moved2]]), marks1[1])
+            child2.conflicts = (np.concatenate([marks2[0][~moved2], marks1[0][moved1]]), marks2[1])
+        return child1, child2
+
+    def _splice_states(self, head: FitnessState, tail: FitnessState, heads, tails) -> FitnessState:
+        """State of heads[0] + tails[1], derived from the head or the tail parent's state"""
+        if len(tails[0]) + len(tails[1]) <= len(heads[0]) + len(heads[1]):
+            return head.derive(tails[0], tails[1])
+        return tail.derive(heads[1], heads[0])
 
     def mutate(self, chromosome: TimetableChromosome) -> TimetableChromosome:
-        """Enhanced mutation with error handling"""
+        """Slot, room or faculty changes per gene at mutation_rate, targeting conflicted genes in adaptive mode"""
+        evaluator = self._get_fitness_evaluator()
+        arrays = evaluator.gene_arrays(chromosome)
+        if arrays is None:
+            return self._mutate_genes(chromosome, evaluator)
+        
+        changes = {'slot': {}, 'room': {}, 'faculty': {}}
+        n_slots = len(self.timeslots)
+        rates = [self.mutation_rate] * len(arrays)
+        targeted = set()
+        if self.adaptive_rates:
+            # Genes in hard violations mutate conflict_mutation_boost times as often, and half
+            # of their mutations move them to a timeslot where all their students are free
+            boosted = min(self.mutation_rate * self.conflict_mutation_boost, 1.0)
+            conflicted, student_counts = self._conflicts(chromosome, arrays)
+            targeted = set(np.flatnonzero(conflicted).tolist())
+            for i in targeted:
+                rates[i] = boosted
+        
+        # While rescheduling, genes the change did not affect keep their assignment
+        genes = range(len(arrays)) if self._baseline is None else self._baseline[2].tolist()
+        courses = arrays.course.tolist()
+        for i in genes:
+            course_idx = courses[i]
+            if self.rng.random() < rates[i]:
+                mutation_type = self.rng.choice(['timeslot', 'room', 'faculty'])
+                
+                if i in targeted and self.rng.random() < 0.5:
+                    students = evaluator.students_of(course_idx, int(arrays.group[i]))
+                    busy = student_counts[students].sum(axis=0)
+                    busy[arrays.slot[i]] -= len(students)
+                    free = np.flatnonzero(busy == 0)
+                    changes['slot'][i] = int(free[self.rng.randrange(len(free))]) if len(free) else self.rng.randrange(n_slots)
+                elif mutation_type == 'timeslot' and n_slots:
+                    changes['slot'][i] = self.rng.randrange(n_slots)
+                
+                elif mutation_type == 'room' and evaluator.course_rooms[course_idx]:
+                    changes['room'][i] = self.rng.choice(evaluator.course_rooms[course_idx])
+                
+                elif mutation_type == 'faculty' and evaluator.course_faculty[course_idx]:
+                    changes['faculty'][i] = self.rng.choice(evaluator.course_faculty[course_idx])
+        
+        # Copy-on-write: untouched columns stay shared with the parent
+        mutated = TimetableChromosome(encoded=arrays.with_changes(**changes))
+        state = chromosome.fitness_state
+        if state is not None and state.evaluator is evaluator:
+            # Only the moved genes are rescored
+            changed = sorted(set().union(*changes.values()))
+            if changed:
+                state = state.derive(arrays.take(changed), mutated.encoded.take(changed))
+            mutated.fitness_state = state
+        return mutated
+
+    def _conflicts(self, chromosome: TimetableChromosome, arrays: GeneArrays) -> Tuple[np.ndarray, np.ndarray]:
+        """Conflicted gene mask and [students, slots] counts of a chromosome, computed once and kept on it.
+        
+        Crossover children inherit the marks of the genes they take and the
+        counts of their first parent, so each parent is checked once per
+        generation rather than once per child.
+        """
+        if chromosome.conflicts is None:
+            conflicted, counts = self._get_fitness_evaluator().conflicted_genes(arrays, chromosome.fitness_state)
+            chromosome.conflicts = (conflicted, counts.astype(np.int16))
+        return chromosome.conflicts
+
+    def repair(self, chromosome: TimetableChromosome) -> Tuple[TimetableChromosome, int]:
+        """Move genes out of hard conflicts; return the repaired chromosome and the number of repairs.
+        
+        Fixes faculty and room double-booking, rooms too small for their
+        group and faculty booked outside their availability. An offending
+        gene first gets another able faculty / fitting room at the same
+        timeslot, otherwise it moves to a timeslot where both are free,
+        preferring one where its students are free too.
+        """
         try:
-            mutated_genes = chromosome.genes.copy()
+            evaluator = self._get_fitness_evaluator()
+            arrays = evaluator.gene_arrays(chromosome)
+            if arrays is None or not len(arrays):
+                return chromosome, 0
             
-            for i, gene in enumerate(mutated_genes):
-                if random.random() < self.mutation_rate:
-                    course = next((c for c in self.courses if c.id == gene.course_id), None)
-                    if not course:
-                        continue
-                    
-                    mutation_type = random.choice(['timeslot', 'room', 'faculty'])
-                    
-                    if mutation_type == 'timeslot' and self.timeslots:
-                        gene.timeslot_id = random.choice(self.timeslots).id
-                    
-                    elif mutation_type == 'room' and course.room_type_required != 'none':
-                        suitable_rooms = [r for r in self.rooms if r.room_type == course.room_type_required]
-                        if suitable_rooms:
-                            gene.room_id = random.choice(suitable_rooms).id
-                    
-                    elif mutation_type == 'faculty':
-                        suitable_faculty = [f for f in self.faculty if f.expertise == course.faculty_expertise_required]
-                        if suitable_faculty:
-                            gene.faculty_id = random.choice(suitable_faculty).id
+            T = evaluator.n_slots
+            full = (1 << T) - 1
+            room_capacity = evaluator.room_capacity.tolist()
+            fitting_rooms = {}  # (course, own room if the course has no room type, group size) -> candidate rooms
+            course, slot, faculty, room, group = evaluator.columns(arrays)
+            size = evaluator.group_size[group]
+            has_room = room >= 0
+            faculty_booked = SlotGrid(T, evaluator.n_faculty, faculty, slot)
+            room_booked = SlotGrid(T, evaluator.n_rooms, room[has_room], slot[has_room])
+            room_multiplicity = np.zeros(len(room), dtype=np.int64)
+            room_multiplicity[has_room] = room_booked.multiplicity
             
-            return TimetableChromosome(mutated_genes)
-        except:
-            return chromosome
+            conflicted = np.flatnonzero(
+                ~evaluator.available[faculty, slot] | (faculty_booked.multiplicity > 1)
+                | (has_room & ((room_multiplicity > 1) | (size > evaluator.room_capacity[room])))
+            )
+            if self._baseline is not None:
+                conflicted = np.intersect1d(conflicted, self._baseline[2])
+            if not len(conflicted):
+                return chromosome, 0
+            
+            # Student clashes are tracked per group: a group's students are busy wherever a group
+            # sharing one of them (evaluator.group_neighbors) is booked
+            group_booked = SlotGrid(T, evaluator.empty_group + 1, group, slot)
+            
+            changes = {'slot': {}, 'faculty': {}, 'room': {}}
+            repairs = 0
+            sizes = size.tolist()
+            faculty_words, room_words = faculty_booked.words, room_booked.words
+            # Slots where each faculty is available and not yet booked, kept in step with faculty_booked
+            faculty_free = [free & ~words for free, words in zip(evaluator.available_bits, faculty_words)]
+            for i in conflicted.tolist():
+                c, t, f, r, g = int(course[i]), int(slot[i]), int(faculty[i]), int(room[i]), int(group[i])
+                if (evaluator.available[f, t] and faculty_booked.count(f, t) <= 1
+                        and (r < 0 or (room_booked.count(r, t) <= 1 and sizes[i] <= room_capacity[r]))):
+                    continue  # already cleared by an earlier repair
+                
+                # Take the gene off the grid, then look for free cells
+                faculty_booked.release(f, t)
+                faculty_free[f] = evaluator.available_bits[f] & ~faculty_words[f]
+                group_booked.release(g, t)
+                if r >= 0:
+                    room_booked.release(r, t)
+                
+                able = evaluator.course_faculty[c] or [f]
+                rooms = None
+                if r >= 0:
+                    key = (c, r if not evaluator.course_rooms[c] else -1, sizes[i])
+                    rooms = fitting_rooms.get(key)
+                    if rooms is None:
+                        rooms = evaluator.course_rooms[c] or [r]
+                        rooms = fitting_rooms[key] = [x for x in rooms if room_capacity[x] >= sizes[i]] or rooms
+                
+                slot_ok = reduce(operator.or_, map(faculty_free.__getitem__, able), 0)
+                if rooms is not None:
+                    slot_ok &= full & ~reduce(operator.and_, map(room_words.__getitem__, rooms), full)
+                if slot_ok >> t & 1:
+                    new_t = t
+                else:
+                    busy = group_booked.union(evaluator.group_neighbors[g])
+                    candidates = SlotGrid.slots(slot_ok & ~busy or slot_ok)
+                    new_t = candidates[self.rng.randrange(len(candidates))] if candidates else None
+                
+                if new_t is None:
+                    new_t, new_f, new_r = t, f, r  # nowhere to go: leave it for the fitness penalty
+                else:
+                    free_faculty = [a for a in able if faculty_free[a] >> new_t & 1]
+                    new_f = f if f in free_faculty else free_faculty[self.rng.randrange(len(free_faculty))]
+                    new_r = r
+                    if rooms is not None:
+                        free_rooms = [x for x in rooms if not room_words[x] >> new_t & 1]
+                        new_r = r if r in free_rooms else free_rooms[self.rng.randrange(len(free_rooms))]
+                
+                faculty_booked.book(new_f, new_t)
+                faculty_free[new_f] = evaluator.available_bits[new_f] & ~faculty_words[new_f]
+                group_booked.book(g, new_t)
+                if new_r >= 0:
+                    room_booked.book(new_r, new_t)
+                if (new_t, new_f, new_r) != (t, f, r):
+                    slot[i], faculty[i], room[i] = new_t, new_f, new_r
+                    for name, old, new in (('slot', t, new_t), ('faculty', f, new_f), ('room', r, new_r)):
+                        if old != new:
+                            changes[name][i] = new
+                    repairs += 1
+            
+            if not repairs:
+                return chromosome, 0
+            repaired = TimetableChromosome(encoded=arrays.with_changes(**changes))
+            state = chromosome.fitness_state
+            if state is not None and state.evaluator is evaluator:
+                changed = sorted(set().union(*changes.values()))
+                repaired.fitness_state = state.derive(arrays.take(changed), repaired.encoded.take(changed))
+            return repaired, repairs
+        except Exception as e:
+            logger.warning(f"Repair error: {e}")
+            return chromosome, 0
 
-    def evolve(self, progress_callback=None) -> Tuple[TimetableChromosome, List[float]]:
-        """Enhanced evolution with error handling"""
-        try:
-            # Initialize population
-            population = []
-            for _ in range(self.population_size):
+    def _mutate_genes(self, chromosome: TimetableChromosome, evaluator: IncrementalFitnessEvaluator) -> TimetableChromosome:
+        """Mutation for Gene lists with ids outside the loaded data"""
+        mutated_genes = chromosome.genes.copy()
+        
+        for i, gene in enumerate(mutated_genes):
+            if self.rng.random() < self.mutation_rate:
+                course = evaluator.course_by_id.get(gene.course_id)
+                if not course:
+                    continue
+                
+                mutation_type = self.rng.choice(['timeslot', 'room', 'faculty'])
+                
+                # Replace rather than edit genes: they are shared with the parent
+                if mutation_type == 'timeslot' and self.timeslots:
+                    mutated_genes[i] = replace(gene, timeslot_id=self.rng.choice(self.timeslots).id)
+                
+                elif mutation_type == 'room' and course.room_type_required != 'none':
+                    suitable_rooms = evaluator.rooms_by_type.get(course.room_type_required)
+                    if suitable_rooms:
+                        mutated_genes[i] = replace(gene, room_id=self.rng.choice(suitable_rooms).id)
+                
+                elif mutation_type == 'faculty':
+                    suitable_faculty = evaluator.faculty_by_expertise.get(course.faculty_expertise_required)
+                    if suitable_faculty:
+                        mutated_genes[i] = replace(gene, faculty_id=self.rng.choice(suitable_faculty).id)
+        
+        return TimetableChromosome(mutated_genes)
+
+    def _initial_population(self, executor=None) -> List[TimetableChromosome]:
+        """Constructed (or random) scored initial population"""
+        if self._baseline is not None:
+            return self._warm_start_population(executor)
+        population = []
+        constructed = round(self.population_size * self.constructed_fraction)
+        for i in range(self.population_size):
+            if i < constructed:
+                chromosome = self.create_constructed_chromosome()
+            else:
                 chromosome = self.create_random_chromosome()
-                if chromosome.genes:  # Only add valid
-                    self.calculate_fitness(chromosome)
-                    population.append(chromosome)
-            
-            if not population:
-                raise Exception("Failed to create initial population")
+            if chromosome.gene_count:  # Only add valid
+                population.append(chromosome)
+        self._evaluate_population(population, executor)
+        
+        if not population:
+            raise Exception("Failed to create initial population")
+        return population
+
+    def _population_diversity(self, population: List[TimetableChromosome], sample: int = 30) -> float:
+        """Mean pairwise distance of gene assignments over an evenly spaced sample of the population.
+        
+        Each chromosome is a multiset of (course, slot, faculty, room, group)
+        assignments; the distance of two chromosomes is the share of
+        assignments they do not have in common (0 = identical, 1 = disjoint).
+        """
+        evaluator = self._get_fitness_evaluator()
+        chosen = population[::max(len(population) // sample, 1)][:sample]
+        arrays = [evaluator.gene_arrays(chromosome) for chromosome in chosen]
+        arrays = [a for a in arrays if a is not None and len(a)]
+        if len(arrays) < 2:
+            return 0.0
+        keys = np.concatenate([
+            np.ascontiguousarray(np.stack(a.columns, axis=1).astype(np.int32)).view(np.dtype((np.void, 20))).ravel()
+            for a in arrays
+        ])
+        _, codes = np.unique(keys, return_inverse=True)
+        sizes = np.array([len(a) for a in arrays], dtype=np.int64)
+        owner = np.repeat(np.arange(len(arrays)), sizes)
+        # Number the repeats of an assignment within a chromosome, so each multiset becomes a
+        # sorted set of (assignment, occurrence) tokens and overlaps are set intersections
+        order = np.lexsort((codes.reshape(-1), owner))
+        codes = codes.reshape(-1)[order].astype(np.int64)
+        run_start = np.flatnonzero(np.concatenate([[True], (codes[1:] != codes[:-1]) | (owner[1:] != owner[:-1])]))
+        occurrence = np.arange(len(codes)) - np.repeat(run_start, np.diff(np.append(run_start, len(codes))))
+        tokens = codes * len(codes) + occurrence
+        bounds = np.concatenate([[0], np.cumsum(sizes)])
+        distances = []
+        for i in range(len(arrays) - 1):
+            mine, others = tokens[bounds[i]:bounds[i + 1]], tokens[bounds[i + 1]:]
+            found = mine[np.minimum(np.searchsorted(mine, others), len(mine) - 1)] == others
+            shared = np.bincount(owner[bounds[i + 1]:][found] - i - 1, minlength=len(arrays) - i - 1)
+            distances.append(1 - shared / np.maximum(sizes[i], sizes[i + 1:]))
+        return float(np.concatenate(distances).mean())
+
+    def _adapt_rates(self, population: List[TimetableChromosome], base_rates: Tuple[float, float], reference_cost: int):
+        """Set mutation/crossover rates for the next generation from diversity and progress.
+        
+        Mutation rises as diversity falls below target_diversity and falls as
+        the best's penalty - reward drops below `reference_cost`; crossover
+        follows diversity, since crossing near-identical parents is wasted.
+        """
+        base_mutation, base_crossover = base_rates
+        diversity = self._population_diversity(population)
+        cost = population[0].penalty_score - population[0].reward_score
+        progress = min(max(cost / reference_cost, 0.0), 1.0) if reference_cost > 0 else 1.0
+        collapse = max(self.target_diversity / max(diversity, 1e-3), 1.0) ** 0.5
+        self.mutation_rate = float(np.clip(base_mutation * collapse * (0.5 + 0.5 * progress), 0.005, 0.5))
+        self.crossover_rate = float(np.clip(base_crossover * (0.75 + 0.25 * diversity / self.target_diversity), 0.5, 0.95))
+        self.rate_history.append((diversity, self.mutation_rate, self.crossover_rate))
+
+    def _next_generation(self, population: List[TimetableChromosome], executor=None) -> List[TimetableChromosome]:
+        """Elitism plus selection, crossover and mutation over a best-first population"""
+        # Elitism
+        new_population = population[:self.elite_size]
+        
+        # Generate new
+        with self._phase('selection'):
+            selected = self.selection(population)
+        children = []
+        i = 0
+        while len(new_population) + len(children) < self.population_size and i < len(selected) - 1:
+            with self._phase('crossover'):
+                child1, child2 = self.crossover(selected[i], selected[i+1])
+            with self._phase('mutation'):
+                child1 = self.mutate(child1)
+                child2 = self.mutate(child2)
+            children.extend([child1, child2])
+            i += 2
+        if self.repair_children:
+            with self._phase('repair'):
+                repairs = 0
+                for j, child in enumerate(children):
+                    children[j], count = self.repair(child)
+                    repairs += count
+            self.repair_history.append(repairs)
+        with self._phase('fitness'):
+            self._evaluate_population(children, executor)
+        new_population.extend(children)
+        
+        return new_population[:self.population_size]
+
+    @staticmethod
+    def _rank(chromosome: TimetableChromosome) -> Tuple[float, int]:
+        """Sort key: fitness, then lower penalty - reward (fitness is clipped at 0 for very infeasible timetables)"""
+        return chromosome.fitness, chromosome.reward_score - chromosome.penalty_score - chromosome.disruption_penalty
+
+    @staticmethod
+    def _is_solved(chromosome: TimetableChromosome) -> bool:
+        return chromosome.hard_violations == 0 and chromosome.fitness > 0.95
+
+    def _start_run(self):
+        """Restart the RNG stream so a fixed seed reproduces the same run"""
+        if self.seed is not None:
+            self.rng.seed(self.seed)
+        self.evaluations = 0
+        self.stop_reason = None
+        self.current_best = None
+        self._phase_seconds = defaultdict(float)
+
+    def _stop_reason(self, started: float, stale: int, next_evaluations: Optional[int] = None) -> Optional[str]:
+        """'cancelled', or 'time', 'evaluations' or 'stagnation' if that budget is spent before the next generation"""
+        if self._cancelled():
+            return 'cancelled'
+        if self.max_seconds > 0 and monotonic() - started >= self.max_seconds:
+            return 'time'
+        if next_evaluations is None:
+            next_evaluations = max(self.population_size - self.elite_size, 0)
+        if self.max_evaluations > 0 and self.evaluations + next_evaluations > self.max_evaluations:
+            return 'evaluations'
+        if self.stagnation_generations > 0 and stale >= self.stagnation_generations:
+            return 'stagnation'
+        return None
+
+    def _cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    @contextmanager
+    def _phase(self, name: str):
+        """Charge the wall time of the block to a GA phase ('selection', 'fitness', ...)"""
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self._phase_seconds[name] += perf_counter() - started
+
+    def _emit(self, event: Dict[str, object]):
+        for sink in self.event_sinks:
+            try:
+                sink(event)
+            except Exception as e:
+                logger.warning(f"Event sink error: {e}")
+
+    def _begin_report(self, **details):
+        """Reset run_report, switch constraint profiling on or off and emit 'run_start'"""
+        profile = self.profile_constraints or bool(self.event_sinks)
+        self._get_fitness_evaluator().constraint_seconds = defaultdict(float) if profile else None
+        self.run_report = {
+            'generations': 0, 'seconds': 0.0, 'evaluations': 0, 'cache_hits': 0, 'cache_misses': 0,
+            'repairs': 0, 'phase_seconds': {}, 'constraint_seconds': {},
+        }
+        self._emit({
+            'event': 'run_start', 'timestamp': datetime.now().isoformat(timespec='seconds'), 'seed': self.seed,
+            'population_size': self.population_size, 'generations': self.generations,
+            'fitness_mode': self.fitness_mode, **details,
+        })
+
+    def _report_generation(self, generation: int, started: float, best: TimetableChromosome,
+                           kind: str = 'generation'):
+        """Fold the work since the last call into run_report and emit it as one event"""
+        report = self.run_report
+        phases, constraints = self._take_seconds()
+        event = {
+            'event': kind, 'generation': generation, 'elapsed_seconds': monotonic() - started,
+            'best_fitness': best.fitness, 'best_penalty': best.penalty_score, 'best_reward': best.reward_score,
+            'hard_violations': best.hard_violations, 'evaluations': self.evaluations - report['evaluations'],
+            'phase_seconds': phases, 'constraint_seconds': constraints,
+            'mutation_rate': self.mutation_rate, 'crossover_rate': self.crossover_rate,
+        }
+        if self.fitness_mode == 'batch' and self.cache_history:
+            event['cache'] = self.cache_history[-1]
+            report['cache_hits'] += event['cache']['hits']
+            report['cache_misses'] += event['cache']['misses']
+        if generation > 0 and self.repair_children and self.repair_history:
+            event['repairs'] = self.repair_history[-1]
+            report['repairs'] += event['repairs']
+        report['generations'] = generation + 1
+        report['evaluations'] = self.evaluations
+        self._emit(event)
+
+    def _take_seconds(self) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Seconds per GA phase and per constraint family since the last call (folded into run_report)"""
+        phases, self._phase_seconds = dict(self._phase_seconds), defaultdict(float)
+        constraint_seconds = self._get_fitness_evaluator().constraint_seconds
+        constraints = dict(constraint_seconds or {})
+        if constraint_seconds:
+            constraint_seconds.clear()
+        for totals, seconds in ((self.run_report['phase_seconds'], phases),
+                                (self.run_report['constraint_seconds'], constraints)):
+            for name, value in seconds.items():
+                totals[name] = totals.get(name, 0.0) + value
+        return phases, constraints
+
+    def _finish_report(self, started: float, best: TimetableChromosome):
+        """Close run_report (polish time, totals, stop reason) and emit 'run_end'"""
+        phases, constraints = self._take_seconds()
+        self.run_report['seconds'] = monotonic() - started
+        self.run_report['stop_reason'] = self.stop_reason
+        self._emit({
+            'event': 'run_end', 'stop_reason': self.stop_reason, 'best_fitness': best.fitness,
+            'best_penalty': best.penalty_score, 'best_reward': best.reward_score,
+            'hard_violations': best.hard_violations, 'totals': dict(self.run_report),
+            'phase_seconds': phases, 'constraint_seconds': constraints,
+        })
+
+    @staticmethod
+    def _derive_seed(run_seed: int, *stream: int) -> int:
+        """Independent child seed for a worker stream, e.g. (island, epoch)"""
+        return int(np.random.SeedSequence(run_seed, spawn_key=stream).generate_state(1, np.uint64)[0])
+
+    def _data_fingerprint(self) -> str:
+        """Digest of the interned course, timeslot, faculty and room ids a checkpoint's arrays refer to"""
+        codec = self._get_fitness_evaluator().codec
+        ids = [codec.course_ids, codec.slot_ids, codec.faculty_ids, codec.room_ids]
+        return hashlib.blake2b(json.dumps(ids).encode(), digest_size=16).hexdigest()
+
+    def _checkpoint_arrays(self, generation: int, population: List[TimetableChromosome], history: List[float],
+                           progress: Dict[str, object]) -> Dict[str, np.ndarray]:
+        """GA state at the start of `generation` as plain arrays (population as packed GeneArrays columns)"""
+        packed, lengths, scores = self._pack_population(population)
+        rng_version, rng_state, gauss_next = self.rng.getstate()
+        meta = {
+            'version': self.CHECKPOINT_VERSION,
+            'data': self._data_fingerprint(),
+            'generation': generation,
+            'evaluations': self.evaluations,
+            'rates': (self.mutation_rate, self.crossover_rate),
+            'rng_version': rng_version,
+            'gauss_next': gauss_next,
+            'repair_history': self.repair_history,
+            'cache_history': self.cache_history,
+            'rate_history': self.rate_history,
+            **progress,
+        }
+        return {
+            'meta': np.frombuffer(json.dumps(meta, default=lambda value: value.item()).encode(), dtype=np.uint8),
+            'population': packed,
+            'lengths': np.array(lengths, dtype=np.int64),
+            'scores': np.array(scores, dtype=np.int64).reshape(-1, 2),
+            'history': np.array(history, dtype=np.float64),
+            'rng_state': np.array(rng_state, dtype=np.uint32),
+        }
+
+    def load_checkpoint(self, path: str) -> Dict[str, object]:
+        """Checkpoint written by evolve() for the currently loaded data, decoded into its population and metadata"""
+        arrays = read_checkpoint(path)
+        meta = json.loads(arrays['meta'].tobytes())
+        if meta.get('version') != self.CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {meta.get('version')} in {path}")
+        if meta['data'] != self._data_fingerprint():
+            raise ValueError(f"Checkpoint {path} was written for different courses, faculty, rooms or timeslots")
+        scores = [tuple(int(v) for v in row) for row in arrays['scores']]
+        return {
+            **meta,
+            'population': self._unpack_population(arrays['population'], arrays['lengths'].tolist(), scores),
+            'history': arrays['history'].tolist(),
+            'rng_state': (meta['rng_version'], tuple(int(v) for v in arrays['rng_state']), meta['gauss_next']),
+        }
+
+    @staticmethod
+    def _wait_for_checkpoint(future):
+        try:
+            future.result()
+        except Exception as e:
+            logger.warning(f"Checkpoint write error: {e}")
+
+    def evolve(self, progress_callback=None, resume_from: Optional[str] = None) -> Tuple[TimetableChromosome, List[float]]:
+        """Enhanced evolution with error handling.
+        
+        With checkpoint_path set, the population, RNG state and progress are
+        written there every checkpoint_interval generations by a background
+        thread. `resume_from` continues from such a checkpoint exactly where it
+        was written (same data and settings give the same run as uninterrupted).
+        """
+        executor = None
+        writer, pending = None, None
+        configured_rates = base_rates = (self.mutation_rate, self.crossover_rate)
+        try:
+            self._start_run()
+            self._check_before_run()
+            started = monotonic()
+            self.repair_history = []
+            self.cache_history = []
+            self.rate_history = []
+            self._begin_report()
+            executor = self._create_fitness_executor()
+            if self.checkpoint_path:
+                writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint')
             
-            best_fitness_history = []
+            if resume_from:
+                checkpoint = self.load_checkpoint(resume_from)
+                population = checkpoint['population']
+                first_generation = checkpoint['generation']
+                best_fitness_history = checkpoint['history']
+                best_cost, stale, reference_cost = checkpoint['best_cost'], checkpoint['stale'], checkpoint['reference_cost']
+                base_rates = tuple(checkpoint['base_rates'])
+                self.mutation_rate, self.crossover_rate = checkpoint['rates']
+                self.rng.setstate(checkpoint['rng_state'])
+                self.evaluations = self.run_report['evaluations'] = checkpoint['evaluations']
+                self.repair_history = checkpoint['repair_history']
+                self.cache_history = checkpoint['cache_history']
+                self.rate_history = [tuple(rates) for rates in checkpoint['rate_history']]
+                started -= checkpoint['elapsed_seconds']
+                logger.info(f"Resuming from {resume_from} at generation {first_generation}")
+            else:
+                # Initialize population
+                with self._phase('initialize'):
+                    population = self._initial_population(executor)
+                first_generation = 0
+                best_fitness_history = []
+                best_cost, stale, reference_cost = None, 0, None
+            self.stop_reason = 'generations'
             
-            for generation in range(self.generations):
-                population.sort(key=lambda x: x.fitness, reverse=True)
+            for generation in range(first_generation, self.generations):
+                if writer is not None and generation > first_generation and generation % self.checkpoint_interval == 0:
+                    arrays = self._checkpoint_arrays(generation, population, best_fitness_history, {
+                        'best_cost': best_cost, 'stale': stale, 'reference_cost': reference_cost,
+                        'base_rates': base_rates, 'elapsed_seconds': monotonic() - started,
+                    })
+                    if pending is not None:
+                        self._wait_for_checkpoint(pending)
+                    pending = writer.submit(write_checkpoint, self.checkpoint_path, arrays)
+                
+                population.sort(key=self._rank, reverse=True)
                 
                 best_fitness = population[0].fitness
                 best_fitness_history.append(best_fitness)
+                self.current_best = population[0]
+                self._report_generation(generation, started, population[0])
                 
                 if progress_callback:
                     hard_violations = population[0].hard_violations
                     progress_callback(generation, self.generations, best_fitness, hard_violations)
                 
-                if population[0].hard_violations == 0 and population[0].fitness > 0.95:
+                if self._is_solved(population[0]):
+                    self.stop_reason = 'solved'
+                    break
+                
+                cost = population[0].penalty_score - population[0].reward_score
+                reference_cost = cost if best_cost is None else reference_cost
+                best_cost, stale = (cost, 0) if best_cost is None or cost < best_cost else (best_cost, stale + 1)
+                reason = self._stop_reason(started, stale)
+                if reason:
+                    self.stop_reason = reason
                     break
                 
-                # Elitism
-                new_population = population[:self.elite_size]
-                
-                # Generate new
-                selected = self.selection(population)
-                i = 0
-                while len(new_population) < self.population_size and i < len(selected) - 1:
-                    child1, child2 = self.crossover(selected[i], selected[i+1])
-                    child1 = self.mutate(child1)
-                    child2 = self.mutate(child2)
-                    self.calculate_fitness(child1)
-                    self.calculate_fitness(child2)
-                    new_population.extend([child1, child2])
-                    i += 2
-                
-                population = new_population[:self.population_size]
-            
-            population.sort(key=lambda x: x.fitness, reverse=True)
-            return population[0], best_fitness_history
+                if self.adaptive_rates:
+                    with self._phase('adaptation'):
+                        self._adapt_rates(population, base_rates, reference_cost)
+                population = self._next_generation(population, executor)
+            
+            population.sort(key=self._rank, reverse=True)
+            with self._phase('polish'):
+                best = self._polish_best(population[0])
+            self._finish_report(started, best)
+            return best, best_fitness_history
+        except Exception as e:
+            logger.error(f"Evolution error: {e}")
+            raise
+        finally:
+            self.mutation_rate, self.crossover_rate = configured_rates
+            if executor is not None:
+                executor.shutdown()
+            if writer is not None:
+                if pending is not None:
+                    self._wait_for_checkpoint(pending)
+                writer.shutdown()
+
+    def polish(self, chromosome: TimetableChromosome, time_budget: float = 5.0,
+               swap_rate: float = 0.3) -> Tuple[TimetableChromosome, List[Tuple[float, float, int]]]:
+        """Simulated annealing on one chromosome with move and swap neighbourhoods.
+        
+        Moves give one gene a new timeslot, faculty or room; swaps exchange
+        the timeslots of two genes (while rescheduling, only genes the change
+        affected). Each neighbour is scored by updating a private FitnessState
+        in place (and undoing the update on rejection).
+        Returns the best timetable found within `time_budget` seconds and its
+        improvement history as (elapsed seconds, fitness, penalty - reward).
+        """
+        try:
+            evaluator = self._get_fitness_evaluator()
+            arrays = evaluator.gene_arrays(chromosome)
+            if arrays is None or len(arrays) < 2 or time_budget <= 0:
+                return chromosome, []
+            
+            genes = np.arange(len(arrays)) if self._baseline is None else self._baseline[2]
+            if not len(genes):
+                return chromosome, []
+            
+            start = monotonic()
+            state = evaluator.build_state(TimetableChromosome(encoded=arrays))
+            columns = [column.copy() for column in evaluator.columns(arrays)]
+            course, slot, faculty, room, _ = columns
+            n_genes, n_slots = len(arrays), evaluator.n_slots
+            
+            def cost():
+                penalty, reward = evaluator.score(state)
+                if self._baseline is not None:
+                    penalty += self._changed_cost(slot, faculty, room)
+                return penalty - reward
+            
+            def apply(rows, slots, faculties, rooms):
+                old = tuple(column[rows] for column in columns)
+                slot[rows], faculty[rows], room[rows] = slots, faculties, rooms
+                evaluator.update(state, old, tuple(column[rows] for column in columns))
+                return old
+            
+            def neighbour():
+                """Random move or swap as (rows, new slots, new faculty, new rooms), or None"""
+                i = int(genes[self.rng.randrange(len(genes))])
+                if self.rng.random() < swap_rate:
+                    j = int(genes[self.rng.randrange(len(genes))])
+                    if slot[i] == slot[j]:
+                        return None
+                    rows = np.array([i, j])
+                    return rows, slot[[j, i]], faculty[rows], room[rows]
+                rows = np.array([i])
+                new_slot, new_faculty, new_room = slot[i], faculty[i], room[i]
+                kind = self.rng.random()
+                if kind < 0.6:
+                    new_slot = self.rng.randrange(n_slots)
+                elif kind < 0.8 and evaluator.course_faculty[course[i]]:
+                    new_faculty = self.rng.choice(evaluator.course_faculty[course[i]])
+                elif room[i] >= 0 and evaluator.course_rooms[course[i]]:
+                    new_room = self.rng.choice(evaluator.course_rooms[course[i]])
+                else:
+                    return None
+                return rows, [new_slot], [new_faculty], [new_room]
+            
+            current = best = cost()
+            max_penalty = 100000 * n_genes * 2
+            best_columns = (slot.copy(), faculty.copy(), room.copy())
+            
+            # Starting temperature: typical soft-constraint uphill step, so hard violations stay rejected
+            uphill = []
+            for _ in range(50):
+                move = neighbour()
+                if move is None:
+                    continue
+                old = apply(*move)
+                delta = cost() - current
+                apply(move[0], old[1], old[2], old[3])
+                if 0 < delta < 10000:
+                    uphill.append(delta)
+            start_temperature = max(float(np.median(uphill)) if uphill else 100.0, 1.0)
+            final_temperature = 1.0
+            
+            history = [(0.0, max(0, 1 - current / max_penalty), current)]
+            while True:
+                elapsed = monotonic() - start
+                if elapsed >= time_budget or self._cancelled():
+                    break
+                temperature = start_temperature * (final_temperature / start_temperature) ** (elapsed / time_budget)
+                move = neighbour()
+                if move is None:
+                    continue
+                old = apply(*move)
+                candidate = cost()
+                delta = candidate - current
+                if delta <= 0 or self.rng.random() < math.exp(-delta / max(temperature, 1e-9)):
+                    current = candidate
+                    if current < best:
+                        best = current
+                        best_columns = (slot.copy(), faculty.copy(), room.copy())
+                        history.append((elapsed, max(0, 1 - best / max_penalty), best))
+                else:
+                    apply(move[0], old[1], old[2], old[3])
+            
+            if len(history) == 1:
+                return chromosome, history
+            polished = TimetableChromosome(encoded=GeneArrays(evaluator.codec, arrays.course, *best_columns, arrays.group))
+            self.calculate_fitness(polished)
+            return polished, history
+        except Exception as e:
+            logger.warning(f"Local search error: {e}")
+            return chromosome, []
+
+    def _polish_best(self, best: TimetableChromosome) -> TimetableChromosome:
+        """Run the local search stage on the final best chromosome if polish_seconds is set"""
+        self.polish_history = []
+        if self.polish_seconds > 0:
+            best, self.polish_history = self.polish(best, self.polish_seconds)
+        return best
+
+    def _pack_population(self, population: List[TimetableChromosome]):
+        """Compact (columns, lengths, scores) form of a population for another process"""
+        evaluator = self._get_fitness_evaluator()
+        arrays = [evaluator.gene_arrays(chromosome) for chromosome in population]
+        packed = np.concatenate([np.stack(a.columns) for a in arrays], axis=1)
+        scores = [(chromosome.penalty_score, chromosome.reward_score) for chromosome in population]
+        return packed, [len(a) for a in arrays], scores
+
+    def _unpack_population(self, packed: np.ndarray, lengths: List[int], scores) -> List[TimetableChromosome]:
+        """Rebuild scored chromosomes from _pack_population output"""
+        codec = self._get_fitness_evaluator().codec
+        bounds = np.cumsum(lengths)[:-1]
+        population = []
+        for columns, (penalty, reward) in zip(zip(*(np.split(row, bounds) for row in packed)), scores):
+            chromosome = TimetableChromosome(encoded=GeneArrays(codec, *columns))
+            self._set_fitness(chromosome, penalty, reward)
+            population.append(chromosome)
+        return population
+
+    def _island_rates(self, n_islands: int) -> List[Tuple[float, float]]:
+        """Default (mutation_rate, crossover_rate) per island, spread around the configured rates"""
+        mutation = np.linspace(0.5, 2.0, n_islands) * self.mutation_rate if n_islands > 1 else [self.mutation_rate]
+        crossover = np.linspace(self.crossover_rate - 0.2, self.crossover_rate, n_islands) if n_islands > 1 else [self.crossover_rate]
+        return [(float(min(m, 1.0)), float(min(max(c, 0.0), 1.0))) for m, c in zip(mutation, crossover)]
+
+    def _migrate(self, populations: List[List[TimetableChromosome]], migrants: int):
+        """Ring migration on sorted populations: the `migrants` best of island i replace the worst of island i + 1"""
+        if len(populations) < 2 or migrants <= 0:
+            return
+        emigrants = [population[:migrants] for population in populations]
+        for i, population in enumerate(populations):
+            incoming = emigrants[i - 1]
+            population[len(population) - len(incoming):] = incoming
+            population.sort(key=self._rank, reverse=True)
+
+    def evolve_islands(self, n_islands: int = 4, migration_interval: int = 10, migrants: int = 2,
+                       island_rates: Optional[List[Tuple[float, float]]] = None,
+                       progress_callback=None) -> Tuple[TimetableChromosome, List[float], List[List[float]]]:
+        """Island-model evolution: one population per process with ring migration.
+        
+        Every `migration_interval` generations the `migrants` best chromosomes
+        of each island replace the worst of the next island on the ring.
+        Returns the overall best chromosome, the overall best fitness per
+        generation and each island's own best fitness history. Stopping
+        criteria are checked between epochs; the evaluation budget also
+        shortens the last epoch so it is never exceeded.
+        """
+        executor = None
+        try:
+            island_rates = island_rates or self._island_rates(n_islands)
+            if len(island_rates) != n_islands:
+                raise ValueError("island_rates needs one (mutation_rate, crossover_rate) per island")
+            workers = self._process_limit(min(n_islands, os.cpu_count() or 1))
+            executor = self._process_pool(workers, initializer=_init_island_worker, initargs=(self,))
+            self._start_run()
+            self._check_before_run()
+            self.repair_history = []
+            self.cache_history = []
+            self._begin_report(islands=n_islands, migration_interval=migration_interval)
+            started = monotonic()
+            run_seed = self.seed if self.seed is not None else self.rng.getrandbits(64)
+            per_generation = n_islands * max(self.population_size - self.elite_size, 0)
+            
+            islands = [None] * n_islands
+            island_histories = [[] for _ in range(n_islands)]
+            best_fitness_history = []
+            generation = 0
+            epoch = 0
+            best = None
+            best_cost, stale = None, 0
+            self.stop_reason = 'generations'
+            while generation < self.generations:
+                epoch_generations = min(migration_interval, self.generations - generation)
+                if self.max_evaluations > 0 and per_generation:
+                    initial = n_islands * self.population_size if best is None else 0
+                    remaining = self.max_evaluations - self.evaluations - initial
+                    epoch_generations = max(min(epoch_generations, remaining // per_generation), 0)
+                    if epoch_generations == 0 and best is not None:
+                        self.stop_reason = 'evaluations'
+                        break
+                futures = [
+                    executor.submit(
+                        _run_island_epoch, islands[i], epoch_generations, *island_rates[i],
+                        self._derive_seed(run_seed, i, epoch)
+                    )
+                    for i in range(n_islands)
+                ]
+                results = [future.result() for future in futures]
+                populations = [self._unpack_population(*packed) for packed, _, _, _ in results]
+                for i, (_, history, evaluations, phases) in enumerate(results):
+                    island_histories[i].extend(history)
+                    self.evaluations += evaluations
+                    for name, seconds in phases.items():
+                        self._phase_seconds[name] += seconds
+                longest = max(len(history) for _, history, _, _ in results)
+                for g in range(longest):
+                    best_fitness_history.append(max(
+                        history[min(g, len(history) - 1)] for _, history, _, _ in results if history
+                    ))
+                generation += longest
+                epoch += 1
+                
+                best = max((population[0] for population in populations), key=self._rank)
+                self.current_best = best
+                self._report_generation(generation - 1, started, best, kind='epoch')
+                if progress_callback:
+                    progress_callback(generation - 1, self.generations, best.fitness, best.hard_violations)
+                if self._is_solved(best):
+                    self.stop_reason = 'solved'
+                    break
+                
+                cost = best.penalty_score - best.reward_score
+                best_cost, stale = (cost, 0) if best_cost is None or cost < best_cost else (best_cost, stale + longest)
+                reason = self._stop_reason(started, stale, next_evaluations=0)
+                if reason:
+                    self.stop_reason = reason
+                    break
+                
+                self._migrate(populations, migrants)
+                islands = [self._pack_population(population) for population in populations]
+            
+            with self._phase('polish'):
+                best = self._polish_best(best)
+            self._finish_report(started, best)
+            return best, best_fitness_history, island_histories
         except Exception as e:
-            st.error(f"Evolution error: {e}")
+            logger.error(f"Island evolution error: {e}")
             raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def decompose(self) -> List[List[int]]:
+        """Course indices of each independent sub-instance, largest first.
+        
+        Courses are linked when they could share a faculty member (matching
+        expertise, or anyone if nobody has it), a room (matching type, or any
+        room if none has it) or an enrolled student. Connected components of
+        that graph never compete for a resource, so each can be scheduled on
+        its own.
+        """
+        evaluator = self._get_fitness_evaluator()
+        n_courses, n_faculty, n_rooms = len(self.courses), len(self.faculty), len(self.rooms)
+        parent = list(range(n_courses + n_faculty + n_rooms))
+        
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+        
+        def union(a, b):
+            a, b = find(a), find(b)
+            if a != b:
+                parent[b] = a
+        
+        first_course = np.full(len(self.students), -1, dtype=np.int64)  # first course seen per student
+        for ci, course in enumerate(self.courses):
+            for fi in evaluator.course_faculty[ci] or range(n_faculty):
+                union(ci, n_courses + fi)
+            rooms = evaluator.course_rooms[ci]
+            if not rooms and course.room_type_required != 'none':
+                rooms = range(n_rooms)
+            for ri in rooms:
+                union(ci, n_courses + n_faculty + ri)
+            students = self.course_students.get(course.id, np.empty(0, dtype=np.int64))
+            seen = first_course[students]
+            for other in np.unique(seen[seen >= 0]).tolist():
+                union(ci, other)
+            first_course[students[seen < 0]] = ci
+        
+        components = defaultdict(list)
+        for ci in range(n_courses):
+            components[find(ci)].append(ci)
+        return sorted(components.values(), key=len, reverse=True)
+
+    def _component_generator(self, course_indices: List[int], seed: int) -> 'EnhancedGeneticTimetableGenerator':
+        """Generator with this one's settings for a decompose() component and the faculty, rooms and students it uses"""
+        evaluator = self._get_fitness_evaluator()
+        faculty, rooms = set(), set()
+        for ci in course_indices:
+            faculty.update(evaluator.course_faculty[ci] or range(len(self.faculty)))
+            if self.courses[ci].room_type_required != 'none':
+                rooms.update(evaluator.course_rooms[ci] or range(len(self.rooms)))
+        course_ids = {self.courses[ci].id for ci in course_indices}
+        
+        # A deep copy (__getstate__ leaves out event sinks and the cancel event) that shares only the
+        # loaded records, which nothing modifies, and skips what is rebuilt for the component below
+        memo = {id(record): record for record in self.courses + self.faculty + self.rooms + self.students}
+        for skipped in (self._fitness_evaluator, self._fitness_cache, self.current_best, self.course_students,
+                        self.course_group_students, self.course_group_sizes):
+            memo[id(skipped)] = None
+        sub = copy.deepcopy(self, memo)
+        sub.courses = [self.courses[ci] for ci in course_indices]
+        sub.faculty = [self.faculty[fi] for fi in sorted(faculty)]
+        sub.rooms = [self.rooms[ri] for ri in sorted(rooms)]
+        sub.students = [s for s in self.students if not course_ids.isdisjoint(s.enrolled_courses)]
+        sub._build_enrollment_index()
+        sub._build_group_index()  # keeps this load's group assignment
+        sub._fitness_evaluator = None
+        sub._fitness_cache = None
+        sub.seed, sub.rng = seed, random.Random(seed)
+        sub.checkpoint_path = None
+        sub.feasibility_check = 'off'  # checked once on the whole instance
+        sub.slot_usage_constraints = False  # campus-wide terms, applied once to the merged timetable
+        sub.profile_constraints = self.profile_constraints or bool(self.event_sinks)  # sinks stay with this generator
+        sub.repair_history, sub.cache_history, sub.rate_history, sub.polish_history = [], [], [], []
+        sub.run_report = {}
+        return sub
+
+    def evolve_decomposed(self, progress_callback=None,
+                          workers: int = 0) -> Tuple[TimetableChromosome, List[List[float]]]:
+        """Evolve each decompose() component separately and merge the partial timetables.
+        
+        Components run in up to `workers` processes (0: one per CPU), each
+        with this generator's settings and stopping criteria but without the
+        campus-wide slot usage terms (Hard 13, Hard 1), which only the merged
+        timetable is scored on. `progress_callback(i, n, fitness,
+        hard_violations)` reports each finished component, or each generation
+        when there is only one. Setting cancel_event stops every component
+        after its current generation. Returns the merged best and each
+        component's best fitness history.
+        """
+        components = self.decompose()
+        if len(components) == 1:
+            best, history = self.evolve(progress_callback)
+            return best, [history]
+        
+        self._start_run()
+        self._check_before_run()
+        self.repair_history = []
+        self.cache_history = []
+        self._begin_report(components=len(components))
+        started = monotonic()
+        run_seed = self.seed if self.seed is not None else self.rng.getrandbits(64)
+        subs = [self._component_generator(courses, self._derive_seed(run_seed, i)) for i, courses in enumerate(components)]
+        logger.info(f"Decomposed {len(self.courses)} courses into {len(subs)} independent sub-instances")
+        workers = self._process_limit(min(workers or os.cpu_count() or 1, len(subs)))
+        constraint_seconds = self._get_fitness_evaluator().constraint_seconds
+        
+        def finished(done: int, result: Dict[str, object]):
+            """Fold a component's work into this run's report and emit it as one event"""
+            report = result['report']
+            self.evaluations += result['evaluations']
+            for name, seconds in report.get('phase_seconds', {}).items():
+                self._phase_seconds[name] += seconds
+            if constraint_seconds is not None:
+                for name, seconds in report.get('constraint_seconds', {}).items():
+                    constraint_seconds[name] += seconds
+            for name in ('cache_hits', 'cache_misses', 'repairs'):
+                self.run_report[name] += report.get(name, 0)
+            best = result['best']
+            self._report_generation(done, started, best, kind='component')
+            if progress_callback:
+                progress_callback(done, len(subs), best.fitness, best.hard_violations)
+        
+        results = [None] * len(subs)
+        if workers > 1:
+            for sub in subs:
+                sub.fitness_workers = 1  # no nested pools
+            # Worker processes see the cancel event through a manager, started only if there is one to watch
+            manager_context = multiprocessing.get_context(self.process_start_method).Manager
+            with (manager_context() if self.cancel_event is not None else nullcontext()) as manager:
+                shared_cancel = manager.Event() if manager is not None else None
+                with self._process_pool(workers) as executor:
+                    futures = {executor.submit(_evolve_component, sub, shared_cancel): i for i, sub in enumerate(subs)}
+                    pending, done = set(futures), 0
+                    while pending:
+                        if shared_cancel is not None and self._cancelled():
+                            shared_cancel.set()
+                        completed, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                        for future in completed:
+                            results[futures[future]] = future.result()
+                            finished(done, results[futures[future]])
+                            done += 1
+        else:
+            for i, sub in enumerate(subs):
+                results[i] = _evolve_component(sub, self.cancel_event)
+                finished(i, results[i])
+        
+        with self._phase('merge'):
+            merged = TimetableChromosome([gene for result in results for gene in result['best'].genes])
+            self.calculate_fitness(merged)
+        self.run_report['generations'] = sum(result['report'].get('generations', 0) for result in results)
+        self.stop_reason = ','.join(sorted({result['stop_reason'] for result in results}))
+        self.current_best = merged
+        self._finish_report(started, merged)
+        return merged, [result['history'] for result in results]
+
+    def _reschedule_start(self, previous: TimetableChromosome) -> Tuple[GeneArrays, GeneArrays, np.ndarray]:
+        """`previous` mapped onto the loaded data: (previous assignments, start timetable, affected gene indices).
+        
+        The previous assignments hold -1 for a faculty, room or timeslot that
+        no longer exists. In the start timetable, sessions of a faculty on
+        leave get another able faculty and sessions in a closed room another
+        room of the right type; courses without sessions get them from a
+        constructed timetable, and sessions of dropped courses are left out.
+        Affected are those sessions plus every session in a hard violation
+        under the new data.
+        """
+        evaluator = self._get_fitness_evaluator()
+        codec = evaluator.codec
+        previous_rows, rows, replaced = [], [], []
+        for gene in previous.genes:
+            c = codec.course_index.get(gene.course_id)
+            t = codec.slot_index.get(gene.timeslot_id)
+            if c is None or t is None:
+                continue
+            f = codec.faculty_index.get(gene.faculty_id, -1)
+            r = codec.room_index.get(gene.room_id, -1) if gene.room_id else -1
+            g = gene.student_group
+            new_f, new_r = f, r
+            if f < 0:
+                able = evaluator.course_faculty[c] or list(range(evaluator.n_faculty))
+                new_f = self.rng.choice([i for i in able if evaluator.available[i, t]] or able)
+            if self.courses[c].room_type_required == 'none':
+                new_r = -1
+            elif r < 0:
+                rooms = evaluator.course_rooms[c] or list(range(evaluator.n_rooms))
+                size = self.course_group_sizes.get((gene.course_id, g), 0)
+                new_r = self.rng.choice([i for i in rooms if evaluator.room_capacity[i] >= size] or rooms)
+            previous_rows.append((c, t, f, r, g))
+            rows.append((c, t, new_f, new_r, g))
+            replaced.append((new_f, new_r) != (f, r))
+        
+        scheduled = {row[0] for row in rows}
+        missing = [i for i in range(len(self.courses)) if i not in scheduled]
+        if missing:
+            constructed = evaluator.gene_arrays(self.create_constructed_chromosome())
+            added = constructed.take(np.isin(constructed.course, missing))
+            for c, t, f, r, g in zip(*(column.tolist() for column in added.columns)):
+                previous_rows.append((c, -1, -1, -1, g))
+                rows.append((c, t, f, r, g))
+                replaced.append(True)
+        
+        def arrays(rows):
+            return GeneArrays(codec, *(list(zip(*rows)) or [()] * len(GeneArrays.COLUMNS)))
+        
+        start = arrays(rows)
+        conflicted, _ = evaluator.conflicted_genes(start)
+        affected = np.flatnonzero(conflicted | np.array(replaced, dtype=bool))
+        return arrays(previous_rows), start, affected
+
+    def _disruption(self, chromosome: TimetableChromosome) -> int:
+        """reschedule(): disruption_weight per session whose timeslot, faculty or room differs from the previous timetable"""
+        previous = self._baseline[0]
+        arrays = self._get_fitness_evaluator().gene_arrays(chromosome)
+        if arrays is None or len(arrays) != len(previous):
+            return self.disruption_weight * len(previous)
+        return self._changed_cost(arrays.slot, arrays.faculty, arrays.room)
+
+    def _changed_cost(self, slot, faculty, room) -> int:
+        """Disruption penalty of slot, faculty and room columns aligned with the previous timetable"""
+        previous, _, genes = self._baseline
+        changed = (
+            (slot[genes] != previous.slot[genes]) | (faculty[genes] != previous.faculty[genes])
+            | (room[genes] != previous.room[genes])
+        )
+        return self.disruption_weight * int(np.count_nonzero(changed))
+
+    def _warm_start_population(self, executor=None) -> List[TimetableChromosome]:
+        """reschedule(): the start timetable plus repaired variants with its affected genes mutated, scored"""
+        start = TimetableChromosome(encoded=self._baseline[1])
+        population = [start]
+        rate = self.mutation_rate
+        self.mutation_rate = max(rate, 0.5)  # affected genes are few; spread the variants out
+        try:
+            while len(population) < self.population_size:
+                child, _ = self.repair(self.mutate(start) if len(population) > 1 else start)
+                population.append(child)
+        finally:
+            self.mutation_rate = rate
+        self._evaluate_population(population, executor)
+        return population
+
+    def reschedule(self, previous: TimetableChromosome, progress_callback=None) -> Tuple[TimetableChromosome, List[float]]:
+        """Adapt `previous` (e.g. an earlier best) to the currently loaded data with as few changes as possible.
+        
+        After faculty leave, a room closure or other input changes, evolve()
+        is warm-started from `previous`: only the sessions the change affected
+        (see _reschedule_start) are mutated, repaired and polished, every other
+        session keeps its timeslot, faculty and room. Each session that ends up
+        with a different assignment than in `previous` adds disruption_weight
+        to its timetable's penalty - reward. Unless set, max_seconds defaults
+        to reschedule_seconds and stagnation_generations to 50. Checkpoints are
+        not written.
+        """
+        self._start_run()
+        previous_arrays, start, affected = self._reschedule_start(previous)
+        logger.info(f"Rescheduling {len(affected)} of {len(start)} sessions")
+        settings = self.crossover_mode, self.max_seconds, self.stagnation_generations, self.checkpoint_path
+        self._baseline = previous_arrays, start, affected
+        # Single-point crossover of equal-length chromosomes keeps genes aligned with the previous timetable
+        self.crossover_mode = 'single_point'
+        self.max_seconds = self.max_seconds or self.reschedule_seconds
+        self.stagnation_generations = self.stagnation_generations or 50
+        self.checkpoint_path = None
+        try:
+            if not len(affected):
+                # Nothing to re-optimize: the previous timetable carries over unchanged
+                best = TimetableChromosome(encoded=start)
+                self.calculate_fitness(best)
+                self.stop_reason = 'unaffected'
+                return best, [best.fitness]
+            return self.evolve(progress_callback)
+        finally:
+            self._baseline = None
+            (self.crossover_mode, self.max_seconds, self.stagnation_generations,
+             self.checkpoint_path) = settings
+
+    def chromosome_from_records(self, records) -> TimetableChromosome:
+        """Chromosome of timetable_records rows (e.g. a timetable CSV written earlier); unknown slots get an empty id"""
+        slot_ids = {(t.day, str(t.period_number)): t.id for t in self.timeslots}
+        return TimetableChromosome([
+            Gene(
+                course_id=str(record['Course_ID']),
+                timeslot_id=slot_ids.get((str(record['Day']), str(record['Period'])), ''),
+                faculty_id=str(record['Faculty_ID']),
+                room_id=str(record.get('Room_ID') or ''),
+                student_group=int(record.get('Student_Group') or 1),
+            )
+            for record in records
+        ])
+
+    def timetable_records(self, chromosome: TimetableChromosome) -> List[Dict[str, object]]:
+        """One flat record per scheduled session, ordered by day and period"""
+        course_dict = {c.id: c for c in self.courses}
+        faculty_dict = {f.id: f for f in self.faculty}
+        room_dict = {r.id: r for r in self.rooms}
+        timeslot_order = {t.id: i for i, t in enumerate(self.timeslots)}
+        
+        records = []
+        for gene in sorted(chromosome.genes, key=lambda g: timeslot_order.get(g.timeslot_id, len(timeslot_order))):
+            course = course_dict.get(gene.course_id)
+            faculty = faculty_dict.get(gene.faculty_id)
+            room = room_dict.get(gene.room_id) if gene.room_id else None
+            timeslot = self.timeslots[timeslot_order[gene.timeslot_id]] if gene.timeslot_id in timeslot_order else None
+            records.append({
+                'Day': timeslot.day if timeslot else '',
+                'Period': timeslot.period_number if timeslot else '',
+                'Start_Time': timeslot.start_time if timeslot else '',
+                'End_Time': timeslot.end_time if timeslot else '',
+                'Course_ID': gene.course_id,
+                'Course_Name': course.name if course else '',
+                'Faculty_ID': gene.faculty_id,
+                'Faculty_Name': faculty.name if faculty else '',
+                'Room_ID': gene.room_id,
+                'Room_Name': room.name if room else 'Off-campus',
+                'Student_Group': gene.student_group,
+            })
+        return records
+
+def read_table(path):
+    """DataFrame from a CSV or Parquet (.parquet/.pq) file"""
+    import pandas as pd
+    
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
 
 def create_nep2020_sample_data():
     """Create NEP 2020 compliant sample data for B.Sc+B.Ed 7th Semester"""
+    import pandas as pd
+    
     try:
         days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
         full_availability = {d: list(range(1, 8)) for d in days}
@@ -734,11 +3488,14 @@ def create_nep2020_sample_data():
             pd.DataFrame(students_data)
         )
     except Exception as e:
-        st.error(f"Error creating sample data: {e}")
+        logger.error(f"Error creating sample data: {e}")
         raise
 
 def display_enhanced_timetable(chromosome: TimetableChromosome, generator: EnhancedGeneticTimetableGenerator):
     """Display timetable in the requested format with comprehensive error handling"""
+    import pandas as pd
+    import streamlit as st
+    
     try:
         if not chromosome or not chromosome.genes:
             st.error("No timetable data to display")
@@ -751,11 +3508,12 @@ def display_enhanced_timetable(chromosome: TimetableChromosome, generator: Enhan
         timeslot_dict = {t.id: t for t in generator.timeslots}
         
         # Create timetable matrix as lists
-        periods = [
-            'Period 1\n(09:00-10:00)', 'Period 2\n(10:00-11:00)', 'Period 3\n(11:00-12:00)',
-            'LUNCH BREAK\n(12:00-12:30)', 'Period 4\n(12:30-13:30)', 'Period 5\n(13:30-14:30)', 
-            'Period 6\n(14:30-15:30)', 'Period 7\n(15:30-16:30)'
-        ]
+        periods = [f'Period {i}\n({start}-{end})' for i, (start, end) in enumerate(generator.PERIOD_TIMES, 1)]
+        lunch = generator.LUNCH_BREAK_AFTER_PERIOD
+        if 0 < lunch < len(periods):
+            periods.insert(lunch, f'LUNCH BREAK\n({generator.PERIOD_TIMES[lunch - 1][1]}-{generator.PERIOD_TIMES[lunch][0]})')
+        else:
+            lunch = len(periods)
         timetable_matrix = {day: [[] for _ in range(len(periods))] for day in generator.days}
         
         # Collect genes per cell
@@ -768,7 +3526,7 @@ def display_enhanced_timetable(chromosome: TimetableChromosome, generator: Enhan
             if all([course, faculty, timeslot]):
                 day = timeslot.day
                 period_idx = timeslot.period_number - 1
-                if period_idx >= 3:
+                if period_idx >= lunch:
                     period_idx += 1
                 
                 if 0 <= period_idx < len(periods) and day in timetable_matrix:
@@ -807,7 +3565,7 @@ def display_enhanced_timetable(chromosome: TimetableChromosome, generator: Enhan
                     
                     formatted_entries = []
                     for cid, group_list in course_groups.items():
-                        cname = next(c['course'] for c in cell_list if c['course_id'] == cid)
+                        cname = course_dict[cid].name
                         if len(group_list) > 1:  # Split
                             opts = ', '.join(f"{r}, {f}" for r, f, g in group_list)
                             formatted_entries.append(f"{cname} ({opts})")
@@ -876,11 +3634,162 @@ def display_enhanced_timetable(chromosome: TimetableChromosome, generator: Enhan
         st.subheader("📁 Export")
         csv = timetable_df.to_csv()
         st.download_button("CSV", csv, "timetable.csv")
+        if st.checkbox("Individual student, faculty and room timetables (CSV, XLSX, iCalendar)"):
+            # Built on request and kept for this timetable, so the progress poll's reruns reuse it.
+            # st.download_button only takes the whole file (bytes or a callable returning them),
+            # so the finished archive is held in memory either way.
+            arrays = generator._get_fitness_evaluator().gene_arrays(chromosome)
+            key = (id(generator), FitnessCache.key(arrays) if arrays is not None else id(chromosome),
+                   datetime.now().date())  # calendars start in the current week
+            built = st.session_state.get('timetables_zip')
+            if built is not None and built[0] != key:
+                del st.session_state['timetables_zip']  # a newer timetable replaced it
+                built = None
+            if built is None and st.button("Build ZIP"):
+                from export import export_timetables
+                
+                archive = io.BytesIO()
+                counts = export_timetables(archive, generator, chromosome)
+                label = f"ZIP ({', '.join(f'{n} {kind}' for kind, n in counts.items())})"
+                built = st.session_state['timetables_zip'] = (key, label, archive.getvalue())
+            if built is not None:
+                st.download_button(built[1], built[2], "timetables.zip", mime="application/zip")
         
     except Exception as e:
         st.error(f"Display error: {e}")
 
+@dataclass
+class GenerationJob:
+    """One evolve() run submitted to a GenerationJobRunner"""
+    id: str
+    generator: EnhancedGeneticTimetableGenerator
+    status: str = 'queued'  # queued, running, done, cancelled or failed
+    progress: Tuple[int, int, float, int] = (0, 0, 0.0, 0)  # generation, total, best fitness, hard violations
+    best: Optional[TimetableChromosome] = None
+    history: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+    submitted: float = field(default_factory=monotonic)
+    finished: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    future: object = None
+    log: List[Tuple[int, str]] = field(default_factory=list)  # (level, message) of warnings logged by the run
+
+    @property
+    def current_best(self) -> Optional[TimetableChromosome]:
+        """Final best once finished, else the running generation's best"""
+        return self.best if self.best is not None else self.generator.current_best
+
+    @property
+    def active(self) -> bool:
+        return self.status in ('queued', 'running')
+
+class GenerationJobRunner:
+    """Runs evolve() jobs on a bounded thread pool shared by all Streamlit sessions.
+    
+    At most `max_jobs` runs evolve at once; later submissions wait as
+    'queued'. Jobs are looked up by id, so a session only keeps the id and
+    polls progress and the current best while the page stays responsive.
+    Finished jobs beyond `keep_finished` are forgotten, oldest first.
+    Each job's worker pools share the CPUs with the other jobs and are
+    spawned rather than forked from this multi-threaded process.
+    """
+    
+    _local = threading.local()  # .job: the GenerationJob the current thread runs
+    
+    def __init__(self, max_jobs: int = 2, keep_finished: int = 50):
+        self.max_jobs = max_jobs
+        self.keep_finished = keep_finished
+        self.processes_per_job = max((os.cpu_count() or 1) // max_jobs, 1)
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix='timetable-job')
+    
+    def submit(self, generator: EnhancedGeneticTimetableGenerator) -> str:
+        """Queue generator.evolve() and return the job id"""
+        job = GenerationJob(uuid.uuid4().hex[:12], generator)
+        generator.cancel_event = job.cancel_event
+        generator.max_processes = min(generator.max_processes or self.processes_per_job, self.processes_per_job)
+        generator.process_start_method = 'spawn'  # forking with other threads running can deadlock the child
+        with self._lock:
+            self.jobs[job.id] = job
+            self._forget_finished()
+        job.future = self._executor.submit(self._run, job)
+        return job.id
+    
+    def get(self, job_id: Optional[str]) -> Optional[GenerationJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+    
+    @classmethod
+    def current_job(cls) -> Optional[GenerationJob]:
+        """The job running in this thread, if it is a job thread"""
+        return getattr(cls._local, 'job', None)
+    
+    def cancel(self, job_id: str) -> bool:
+        """Drop a queued job or stop a running one after its current generation"""
+        job = self.get(job_id)
+        if job is None or not job.active:
+            return False
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.status, job.finished = 'cancelled', monotonic()
+        return True
+    
+    def shutdown(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+        self._executor.shutdown(wait=True)
+    
+    def _run(self, job: GenerationJob):
+        if job.cancel_event.is_set():
+            job.status, job.finished = 'cancelled', monotonic()
+            return
+        job.status = 'running'
+        self._local.job = job
+        
+        def callback(gen, total, fit, viol):
+            job.progress = (gen + 1, total, fit, viol)
+        
+        try:
+            job.best, job.history = job.generator.evolve(callback)
+            job.status = 'cancelled' if job.generator.stop_reason == 'cancelled' else 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            self._local.job = None
+            job.finished = monotonic()
+    
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if not job.active]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self.jobs[job_id]
+
+class StreamlitLogHandler(logging.Handler):
+    """Show engine warnings and errors in the Streamlit page"""
+    
+    def emit(self, record):
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        
+        if get_script_run_ctx() is None:
+            # Background thread: a job's records wait in its log until the session polls it
+            job = GenerationJobRunner.current_job()
+            if job is not None:
+                job.log.append((record.levelno, self.format(record)))
+            return
+        if record.levelno >= logging.ERROR:
+            st.error(self.format(record))
+        else:
+            st.warning(self.format(record))
+
 def main():
+    import streamlit as st
+    
+    if not any(isinstance(h, StreamlitLogHandler) for h in logger.handlers):
+        handler = StreamlitLogHandler(logging.WARNING)
+        logger.addHandler(handler)
+    
     st.set_page_config(page_title="NEP 2020 Timetable", layout="wide")
     st.title("🎓 NEP 2020 Timetable Generator - B.Sc+B.Ed 7th Sem")
     
@@ -888,11 +3797,18 @@ def main():
         st.header("Config")
         population_size = st.slider("Population", 50, 200, 100)
         generations = st.slider("Generations", 100, 1000, 500)
+        fitness_workers = st.number_input("Fitness worker processes", 1, os.cpu_count() or 1, 1)
+        seed = st.number_input("Random seed (0 = random)", 0, 2**31 - 1, 0)
+        max_seconds = st.number_input("Time limit seconds (0 = none)", 0.0, 86400.0, 0.0)
+        polish_seconds = st.number_input("Local search seconds", 0.0, 600.0, 0.0)
         use_sample = st.checkbox("Sample Data", True)
     
-    generator = EnhancedGeneticTimetableGenerator()
+    generator = EnhancedGeneticTimetableGenerator(seed=int(seed) or None)
     generator.population_size = population_size
     generator.generations = generations
+    generator.fitness_workers = int(fitness_workers)
+    generator.polish_seconds = float(polish_seconds)
+    generator.max_seconds = float(max_seconds)
     
     if use_sample:
         courses_df, faculty_df, rooms_df, students_df = create_nep2020_sample_data()
@@ -903,20 +3819,72 @@ def main():
         st.warning("Upload files for custom data")
         return
     
-    if st.button("Generate"):
-        progress_bar = st.progress(0)
-        status = st.empty()
-        
-        def callback(gen, total, fit, viol):
-            progress_bar.progress((gen + 1) / total)
-            status.text(f"Gen {gen+1}/{total}, Fitness: {fit:.3f}, Violations: {viol}")
-        
-        best, history = generator.evolve(callback)
-        st.session_state['best'] = best
-        st.session_state['gen'] = generator
+    runner = shared_job_runner()
+    job = runner.get(st.session_state.get('job_id'))
+    if st.button("Generate", disabled=job is not None and job.active):
+        st.session_state['job_id'] = runner.submit(generator)
+    show_generation_job(runner)
+
+def shared_job_runner() -> GenerationJobRunner:
+    """The process-wide job runner; TIMETABLE_MAX_JOBS caps concurrent runs (default: half the CPUs)"""
+    import streamlit as st
+    
+    @st.cache_resource
+    def job_runner(max_jobs: int) -> GenerationJobRunner:
+        return GenerationJobRunner(max_jobs)
+    
+    default_jobs = max((os.cpu_count() or 1) // 2, 1)
+    return job_runner(int(os.environ.get('TIMETABLE_MAX_JOBS', default_jobs)))
+
+def show_job_log(job: GenerationJob):
+    """Warnings and errors the job's run logged"""
+    import streamlit as st
+    
+    for level, message in list(job.log):
+        if level >= logging.ERROR:
+            st.error(message)
+        else:
+            st.warning(message)
+
+def show_generation_job(runner: GenerationJobRunner):
+    """Progress, cancel button and result of this session's job, refreshed every second while it runs"""
+    import streamlit as st
+    
+    job = runner.get(st.session_state.get('job_id'))
+    if job is None:
+        return
+    
+    if job.active:
+        @st.fragment(run_every=1.0)
+        def poll():
+            if not job.active:
+                st.rerun()  # full rerun renders the finished job
+            show_job_log(job)
+            generation, total, fitness, violations = job.progress
+            if job.status == 'queued':
+                st.info("Waiting for a free worker...")
+            else:
+                st.progress(generation / total if total else 0.0)
+                st.text(f"Gen {generation}/{total}, Fitness: {fitness:.3f}, Violations: {violations}")
+            if st.button("Cancel"):
+                runner.cancel(job.id)
+            if job.current_best is not None and st.checkbox("Show current best"):
+                display_enhanced_timetable(job.current_best, job.generator)
         
-        st.success("Generated!")
-        display_enhanced_timetable(best, generator)
+        poll()
+        return
+    
+    show_job_log(job)
+    if job.status == 'failed':
+        st.error(f"Generation failed: {job.error}")
+        return
+    if job.best is None:
+        st.info("Generation cancelled")
+        return
+    st.session_state['best'] = job.best
+    st.session_state['gen'] = job.generator
+    st.success(f"Generated! Stopped by: {job.generator.stop_reason}")
+    display_enhanced_timetable(job.best, job.generator)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
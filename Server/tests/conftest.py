@@ -0,0 +1,27 @@
+import logging
+import os
+import sys
+
+import pytest
+
+# The engine modules live next to this directory and are imported as top-level modules (see cli.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.getLogger('index').setLevel(logging.ERROR)
+
+from benchmark import PRESETS, create_synthetic_data  # noqa: E402
+from index import EnhancedGeneticTimetableGenerator  # noqa: E402
+
+@pytest.fixture
+def make_generator():
+    """Factory of seeded generators on the tiny synthetic instance (or `data`), fitness cache off.
+    
+    Keyword settings are applied before the data is loaded, so grid settings such as `days` take effect.
+    """
+    def make(data=None, seed=7, **settings):
+        generator = EnhancedGeneticTimetableGenerator(seed=seed)
+        generator.fitness_cache_bytes = 0  # score every chromosome for real
+        for name, value in settings.items():
+            setattr(generator, name, value)
+        generator.load_data_from_ui(*(data if data is not None else create_synthetic_data(PRESETS['tiny'])))
+        return generator
+    return make
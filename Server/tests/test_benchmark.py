@@ -0,0 +1,20 @@
+"""Synthetic benchmark instances must be solvable, or generations to feasibility can never be measured."""
+import pytest
+
+from benchmark import PRESETS, create_synthetic_data, credit_window, run_config
+from index import EnhancedGeneticTimetableGenerator
+
+@pytest.mark.parametrize('name', sorted(PRESETS))
+def test_presets_pass_the_feasibility_bounds(name):
+    generator = EnhancedGeneticTimetableGenerator(seed=0)
+    generator.MIN_SEMESTER_CREDITS, generator.MAX_SEMESTER_CREDITS = credit_window(PRESETS[name], generator)
+    generator.load_data_from_ui(*create_synthetic_data(PRESETS[name]))
+    report = generator.check_feasibility()
+    assert report.feasible, [bound.message for bound in report.issues]
+
+def test_tiny_reaches_feasibility_from_random_chromosomes():
+    result = run_config(PRESETS['tiny'], population=50, generations=100, samples=4)
+    assert result['feasible']
+    assert result['generations_to_feasibility'] is not None
+    assert result['best_conflicted_genes'] == 0
+    assert result['generations_run'] == result['generations_to_feasibility'] + 1
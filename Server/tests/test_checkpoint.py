@@ -0,0 +1,25 @@
+"""Resuming from a checkpoint continues the run exactly where it was written."""
+import numpy as np
+import pytest
+
+from benchmark import PRESETS, create_synthetic_data
+
+def test_resume_gives_the_uninterrupted_run(make_generator, tmp_path):
+    path = str(tmp_path / 'run.npz')
+    generator = make_generator(population_size=12, generations=8, checkpoint_path=path, checkpoint_interval=3)
+    best, history = generator.evolve()
+    assert generator.load_checkpoint(path)['generation'] == 6
+    
+    resumed = make_generator(population_size=12, generations=8)
+    resumed_best, resumed_history = resumed.evolve(resume_from=path)
+    assert resumed_history == history
+    assert all(np.array_equal(a, b) for a, b in zip(resumed_best.encoded.columns, best.encoded.columns))
+    assert resumed.evaluations == generator.evaluations
+    assert resumed.repair_history == generator.repair_history
+
+def test_checkpoint_of_other_data_is_refused(make_generator, tmp_path):
+    path = str(tmp_path / 'run.npz')
+    make_generator(population_size=12, generations=4, checkpoint_path=path, checkpoint_interval=2).evolve()
+    other = make_generator(create_synthetic_data(PRESETS['small']), population_size=12, generations=4)
+    with pytest.raises(ValueError, match='different'):
+        other.evolve(resume_from=path)
@@ -0,0 +1,67 @@
+"""Decomposed runs: independent sub-instances evolve separately and merge into one timetable."""
+import threading
+
+import pytest
+
+from benchmark import PRESETS, create_synthetic_data
+
+def _campus(prefix):
+    """The tiny instance with every id, expertise and room type prefixed, so campuses share nothing"""
+    courses, faculty, rooms, students = create_synthetic_data(PRESETS['tiny'])
+    for frame, columns in ((courses, ('Course_ID', 'Faculty_Expertise_Required', 'Room_Type_Required')),
+                           (faculty, ('Faculty_ID', 'Expertise')), (rooms, ('Room_ID', 'Room_Type')),
+                           (students, ('Student_ID',))):
+        for column in columns:
+            frame[column] = prefix + frame[column]
+    students['Enrolled_Courses'] = students['Enrolled_Courses'].map(
+        lambda ids: ','.join(prefix + cid for cid in ids.split(',')))
+    return courses, faculty, rooms, students
+
+@pytest.fixture
+def generator(make_generator):
+    import pandas as pd
+    
+    campuses = [_campus('A'), _campus('B')]
+    return make_generator([pd.concat(frames, ignore_index=True) for frames in zip(*campuses)],
+                          population_size=10, generations=3)
+
+def test_disjoint_campuses_decompose(generator):
+    components = generator.decompose()
+    assert len(components) >= 2
+    for courses in components:
+        assert len({generator.courses[ci].id[0] for ci in courses}) == 1
+    assert sorted(ci for courses in components for ci in courses) == list(range(len(generator.courses)))
+
+def test_component_generators_do_not_share_settings(generator):
+    sub = generator._component_generator(generator.decompose()[0], seed=1)
+    sub.days.append('Sunday')
+    sub.CREDIT_HOURS_MAPPING['Major'] = 0
+    assert 'Sunday' not in generator.days
+    assert generator.CREDIT_HOURS_MAPPING['Major'] == 4
+    assert sub.timeslots is not generator.timeslots
+
+def test_merged_timetable_covers_every_component(generator):
+    reports = []
+    best, histories = generator.evolve_decomposed(lambda *args: reports.append(args), workers=1)
+    components = generator.decompose()
+    assert len(histories) == len(reports) == len(components)
+    assert {gene.course_id for gene in best.genes} <= {course.id for course in generator.courses}
+    assert {gene.course_id[0] for gene in best.genes} == {'A', 'B'}
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_cancel_reaches_every_component(generator, workers):
+    generator.generations = 10_000
+    generator.cancel_event = threading.Event()
+    generator.cancel_event.set()
+    best, histories = generator.evolve_decomposed(workers=workers)
+    assert generator.stop_reason == 'cancelled'
+    assert all(len(history) <= 1 for history in histories)
+    assert best.genes
+
+def test_single_component_reports_every_generation(make_generator):
+    generator = make_generator(population_size=10, generations=3)
+    reports = []
+    if len(generator.decompose()) > 1:
+        pytest.skip('tiny decomposes')
+    generator.evolve_decomposed(lambda *args: reports.append(args))
+    assert len(reports) == generator.generations
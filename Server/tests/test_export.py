@@ -0,0 +1,38 @@
+"""Bulk timetable export: reproducible archives and one file per entity."""
+import io
+import zipfile
+from datetime import date
+
+import pytest
+
+from export import FORMATS, export_timetables
+from index import EnhancedGeneticTimetableGenerator, create_nep2020_sample_data
+
+@pytest.fixture
+def generator():
+    courses, faculty, rooms, students = create_nep2020_sample_data()
+    rooms.loc[0, 'Room_ID'], rooms.loc[1, 'Room_ID'] = 'A/B', 'A_B'  # both sanitise to A_B
+    generator = EnhancedGeneticTimetableGenerator(seed=7)
+    generator.load_data_from_ui(courses, faculty, rooms, students)
+    return generator
+
+def _export(generator, chromosome):
+    archive = io.BytesIO()
+    counts = export_timetables(archive, generator, chromosome, FORMATS, date(2026, 7, 6))
+    return archive.getvalue(), counts
+
+def test_export_is_reproducible(generator):
+    chromosome = generator.create_constructed_chromosome()
+    first, _ = _export(generator, chromosome)
+    second, _ = _export(generator, chromosome)
+    assert first == second
+    with zipfile.ZipFile(io.BytesIO(first)) as archive:
+        assert {info.date_time for info in archive.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+
+def test_colliding_ids_get_their_own_files(generator):
+    data, counts = _export(generator, generator.create_constructed_chromosome())
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = archive.namelist()
+    assert len(names) == len(set(names))
+    room_files = [name for name in names if name.startswith('rooms/') and name.endswith('.ics')]
+    assert len(room_files) == counts['rooms'] == len(generator.rooms)
@@ -0,0 +1,89 @@
+"""Capacity bounds and the faculty/room max-flow relaxation checked before a run."""
+import json
+import logging
+
+import pytest
+
+from benchmark import PRESETS, create_synthetic_data, credit_window
+from index import EnhancedGeneticTimetableGenerator, _max_flow, create_nep2020_sample_data
+
+def _lab_instance(periods=None):
+    """Two 4-session lab courses of one expertise, two faculty free on Monday `periods` (all week if None), one lab"""
+    import pandas as pd
+    
+    courses = pd.DataFrame({
+        'Course_ID': ['C1', 'C2'], 'Course_Name': ['One', 'Two'], 'Credits': [2, 2], 'Course_Type': ['Minor'] * 2,
+        'Total_Duration_Hours': [60, 60], 'Faculty_Expertise_Required': ['Science'] * 2,
+        'Room_Type_Required': ['lab'] * 2, 'Max_Students': [40, 40], 'Semester': [1, 1], 'Is_Elective': [False] * 2,
+    })
+    generator = EnhancedGeneticTimetableGenerator()
+    week = {day: list(range(1, len(generator.PERIOD_TIMES) + 1)) for day in generator.days}
+    availability = json.dumps(week if periods is None else {day: list(periods) if day == 'Monday' else [] for day in week})
+    faculty = pd.DataFrame({
+        'Faculty_ID': ['F1', 'F2'], 'Faculty_Name': ['One', 'Two'], 'Expertise': ['Science'] * 2,
+        'Max_Load_Per_Week': [20, 20], 'Availability': [availability] * 2,
+    })
+    rooms = pd.DataFrame({
+        'Room_ID': ['R1'], 'Room_Name': ['Lab'], 'Capacity': [40], 'Room_Type': ['lab'], 'Equipment': [''],
+    })
+    students = pd.DataFrame({
+        'Student_ID': ['S1', 'S2'], 'Student_Name': ['One', 'Two'], 'Semester': [1, 1],
+        'Enrolled_Courses': ['C1,C2', 'C1,C2'],
+    })
+    return courses, faculty, rooms, students
+
+def _report(periods=None):
+    generator = EnhancedGeneticTimetableGenerator(seed=0)
+    generator.MIN_SEMESTER_CREDITS = 0
+    generator.slot_usage_constraints = False
+    generator.load_data_from_ui(*_lab_instance(periods))
+    return generator.check_feasibility()
+
+def test_max_flow():
+    # source 0, sink 1: two paths of 3 and 2 units, the second narrowed to 1 by its middle edge
+    edges = [(0, 2, 3), (2, 1, 3), (0, 3, 2), (3, 4, 1), (4, 1, 5), (2, 4, 1)]
+    assert _max_flow(5, edges, 0, 1) == 4
+    assert _max_flow(5, [(0, 2, 3)], 0, 1) == 0
+
+def test_flow_bound_catches_faculty_and_room_apart():
+    # 8 sessions, 2 faculty x 4 periods and 42 lab periods: only booking both in one timeslot fails
+    report = _report(range(1, 5))
+    assert [bound.constraint for bound in report.issues] == ['Hard 3: faculty and room per timeslot']
+    assert (report.issues[0].required, report.issues[0].available) == (8, 4)
+    assert not report.feasible
+    assert _report().feasible
+
+def test_refuse_raises_on_infeasible_data():
+    generator = EnhancedGeneticTimetableGenerator(seed=0)
+    generator.MIN_SEMESTER_CREDITS = 0
+    generator.slot_usage_constraints = False
+    generator.feasibility_check = 'refuse'
+    generator.load_data_from_ui(*_lab_instance(range(1, 5)))
+    with pytest.raises(ValueError, match='faculty and room per timeslot'):
+        generator.evolve()
+
+def test_missing_expertise():
+    courses, faculty, rooms, students = create_nep2020_sample_data()
+    expertise = courses['Faculty_Expertise_Required'].iloc[0]
+    generator = EnhancedGeneticTimetableGenerator(seed=0)
+    generator.load_data_from_ui(courses, faculty[faculty['Expertise'] != expertise], rooms, students)
+    report = generator.check_feasibility()
+    assert any(b.constraint == 'Hard 5: expertise' and expertise in b.subject for b in report.issues)
+    assert not report.feasible
+
+def test_default_grid_does_not_warn(caplog):
+    # 42 timeslots against the 40-hour cap: Hard 13 fills the 40 that Hard 1 allows
+    generator = EnhancedGeneticTimetableGenerator(seed=0)
+    generator.MIN_SEMESTER_CREDITS, generator.MAX_SEMESTER_CREDITS = credit_window(PRESETS['tiny'], generator)
+    generator.load_data_from_ui(*create_synthetic_data(PRESETS['tiny']))
+    assert len(generator.timeslots) > generator.MAX_TUTORIAL_HOURS_PER_WEEK
+    with caplog.at_level(logging.WARNING, logger='index'):
+        generator._check_before_run()
+    assert generator.feasibility_report.feasible
+    assert not caplog.records
+
+def test_slot_usage_is_satisfiable_on_the_default_grid(make_generator):
+    generator = make_generator()
+    evaluator = generator._get_fitness_evaluator()
+    assert evaluator.slots_to_fill == generator.MAX_TUTORIAL_HOURS_PER_WEEK
+    assert evaluator._slot_usage_penalty(generator.MAX_TUTORIAL_HOURS_PER_WEEK) == 0
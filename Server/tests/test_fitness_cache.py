@@ -0,0 +1,29 @@
+"""Fitness cache: its byte cap holds and cache hits are not counted as evaluations."""
+import hashlib
+import tracemalloc
+
+from index import FitnessCache, TimetableChromosome
+
+def test_entry_bytes_matches_the_measured_footprint():
+    entries = 20_000
+    cache = FitnessCache(entries * FitnessCache.ENTRY_BYTES)
+    tracemalloc.start()
+    try:
+        for i in range(entries):
+            # 16-byte digests like FitnessCache.key, scores as large as real penalties
+            cache.put(hashlib.blake2b(i.to_bytes(8, 'little'), digest_size=16).digest(), (100_000 + i, 50_000 + i))
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(cache.entries) == entries
+    assert 0.8 <= used / cache.max_bytes <= 1.1
+
+def test_cache_hits_are_not_evaluations(make_generator):
+    generator = make_generator(fitness_cache_bytes=2**20)
+    chromosome = generator.create_random_chromosome()
+    copies = [TimetableChromosome(encoded=chromosome.encoded) for _ in range(4)]
+    generator._evaluate_population(copies)
+    assert generator.evaluations == 1
+    generator._evaluate_population([TimetableChromosome(encoded=chromosome.encoded)])
+    assert generator.evaluations == 1
+    assert {c.penalty_score for c in copies} == {copies[0].penalty_score}
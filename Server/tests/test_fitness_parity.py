@@ -0,0 +1,99 @@
+"""The vectorised, batch and incremental fitness paths must score exactly like the gene-by-gene evaluator."""
+import pytest
+
+from benchmark import PRESETS, create_synthetic_data
+from index import TimetableChromosome, create_nep2020_sample_data
+
+def _sample():
+    return create_nep2020_sample_data()
+
+def _synthetic():
+    return create_synthetic_data(PRESETS['tiny'])
+
+@pytest.fixture(params=[_sample, _synthetic], ids=['sample', 'synthetic'])
+def generator(request, make_generator):
+    return make_generator(request.param())
+
+def _scores(chromosome):
+    return (chromosome.penalty_score, chromosome.reward_score,
+            chromosome.hard_violations, chromosome.soft_violations)
+
+def _reference(generator, chromosome):
+    """Scores of the gene-by-gene evaluator on a copy without array storage or fitness state"""
+    reference = TimetableChromosome(genes=list(chromosome.genes))
+    generator._set_fitness(reference, *generator._score_genes(reference))
+    return _scores(reference)
+
+def _random_population(generator, size=6):
+    return ([generator.create_random_chromosome() for _ in range(size // 2)]
+            + [generator.create_constructed_chromosome() for _ in range(size - size // 2)])
+
+def test_full_state_matches_gene_by_gene(generator):
+    for chromosome in _random_population(generator):
+        generator.calculate_fitness(chromosome)
+        assert _scores(chromosome) == _reference(generator, chromosome)
+
+def test_batch_matches_gene_by_gene(generator):
+    population = _random_population(generator)
+    generator.calculate_fitness_batch(population)
+    for chromosome in population:
+        assert chromosome.fitness_state is None  # scored by score_batch, not a cached state
+        assert _scores(chromosome) == _reference(generator, chromosome)
+
+def test_derived_states_match_gene_by_gene(generator):
+    evaluator = generator._get_fitness_evaluator()
+    parents = _random_population(generator)
+    for parent in parents:
+        generator.calculate_fitness(parent)
+    children = []
+    for parent in parents:
+        child = parent
+        for _ in range(4):  # chains of derived states
+            child = generator.mutate(child)
+            children.append(child)
+    for first, second in zip(parents, parents[1:]):
+        children.extend(generator.crossover(first, second))
+    children.extend(generator.repair(child)[0] for child in children[:6])
+
+    derived = [child for child in children if child.fitness_state is not None]
+    assert derived, "mutate/crossover should carry fitness states"
+    for child in children:
+        generator.calculate_fitness(child)
+        assert _scores(child) == _reference(generator, child)
+    for child in derived:
+        assert evaluator.score(child.fitness_state) == _reference(generator, child)[:2]
+
+def test_derive_one_gene_at_a_time(generator):
+    evaluator = generator._get_fitness_evaluator()
+    chromosome = generator.create_random_chromosome()
+    state = evaluator.build_state(chromosome)
+    arrays = chromosome.encoded
+    for _ in range(min(len(arrays), 25)):
+        j = generator.rng.randrange(len(arrays))
+        changed = arrays.with_changes(
+            slot={j: generator.rng.randrange(evaluator.n_slots)},
+            faculty={j: generator.rng.randrange(evaluator.n_faculty)},
+        )
+        state = state.derive(arrays.take([j]), changed.take([j]))
+        arrays = changed
+        moved = TimetableChromosome(encoded=arrays)
+        assert evaluator.score(state) == _reference(generator, moved)[:2]
+
+def test_conflicts_from_state_match_recount(generator):
+    evaluator = generator._get_fitness_evaluator()
+    for chromosome in _random_population(generator):
+        generator.calculate_fitness(chromosome)
+        arrays = evaluator.gene_arrays(chromosome)
+        recounted, from_state = evaluator.conflicted_genes(arrays), evaluator.conflicted_genes(arrays, chromosome.fitness_state)
+        assert (recounted[0] == from_state[0]).all()
+        assert (recounted[1] == from_state[1]).all()
+
+def test_crossover_children_inherit_conflict_marks(generator):
+    generator.adaptive_rates = True
+    generator.crossover_rate = 1.0
+    first, second = generator.create_random_chromosome(), generator.create_random_chromosome()
+    child1, child2 = generator.crossover(first, second)
+    assert first.conflicts is not None and second.conflicts is not None  # each parent checked once
+    for child in (child1, child2):
+        assert len(child.conflicts[0]) == child.gene_count
+    assert generator.mutate(child1).gene_count == child1.gene_count
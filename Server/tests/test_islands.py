@@ -0,0 +1,36 @@
+"""Island model: ring migration and reproducible runs across worker processes."""
+from index import TimetableChromosome
+
+def _island(i, size=4):
+    """Sorted population of an island, fitness 0.9, 0.8, ... plus i / 1000 so every chromosome is distinct"""
+    population = []
+    for rank in range(size):
+        chromosome = TimetableChromosome(genes=[])
+        chromosome.fitness = 0.9 - rank / 10 + i / 1000
+        population.append(chromosome)
+    return population
+
+def test_ring_migration(make_generator):
+    generator = make_generator()
+    populations = [_island(i) for i in range(3)]
+    expected = [populations[i][:2] + populations[i - 1][:2] for i in range(3)]
+    generator._migrate(populations, 2)
+    for population, members in zip(populations, expected):
+        assert {id(c) for c in population} == {id(c) for c in members}
+        assert population == sorted(population, key=generator._rank, reverse=True)
+
+def test_no_migration_between_one_island(make_generator):
+    generator = make_generator()
+    populations = [_island(0)]
+    before = list(populations[0])
+    generator._migrate(populations, 2)
+    assert populations[0] == before
+
+def test_islands_are_reproducible(make_generator):
+    runs = []
+    for _ in range(2):
+        generator = make_generator(population_size=12, generations=6)
+        best, history, island_histories = generator.evolve_islands(n_islands=2, migration_interval=3)
+        assert len(history) == 6 and [len(h) for h in island_histories] == [6, 6]
+        runs.append((best.genes, history, island_histories))
+    assert runs[0] == runs[1]
@@ -0,0 +1,51 @@
+"""Background generation jobs: worker process budget and warnings logged by the run."""
+import logging
+import os
+
+import pytest
+
+from index import EnhancedGeneticTimetableGenerator, GenerationJobRunner, StreamlitLogHandler, create_nep2020_sample_data
+
+pytest.importorskip('streamlit')
+
+@pytest.fixture
+def runner():
+    runner = GenerationJobRunner(max_jobs=2)
+    yield runner
+    runner.shutdown()
+
+def _generator():
+    generator = EnhancedGeneticTimetableGenerator(seed=3)
+    generator.load_data_from_ui(*create_nep2020_sample_data())
+    generator.population_size, generator.generations = 10, 2
+    generator.fitness_workers = 0  # one per CPU, unless the runner caps it
+    return generator
+
+def _wait(runner, job_id):
+    job = runner.get(job_id)
+    job.future.result(timeout=120)
+    return job
+
+def test_jobs_share_the_cpus(runner):
+    generator = _generator()
+    generator.generations = 0
+    _wait(runner, runner.submit(generator))
+    assert generator.max_processes == max((os.cpu_count() or 1) // 2, 1)
+    assert generator._fitness_worker_count() <= generator.max_processes
+    assert generator.process_start_method == 'spawn'
+
+def test_job_warnings_reach_the_job_log(runner):
+    engine_logger = logging.getLogger('index')
+    handler = StreamlitLogHandler(logging.WARNING)
+    engine_logger.addHandler(handler)
+    level = engine_logger.level
+    engine_logger.setLevel(logging.WARNING)
+    try:
+        generator = _generator()
+        generator.MIN_SEMESTER_CREDITS = 60  # no student can reach it: the pre-run check warns
+        job = _wait(runner, runner.submit(generator))
+    finally:
+        engine_logger.removeHandler(handler)
+        engine_logger.setLevel(level)
+    assert job.status == 'done'
+    assert any(level == logging.WARNING and 'Hard 6' in message for level, message in job.log)
@@ -0,0 +1,35 @@
+"""Simulated-annealing polish: never worse than its start, scored like the gene-by-gene evaluator."""
+import numpy as np
+
+from index import TimetableChromosome
+
+def _cost(chromosome):
+    return chromosome.penalty_score - chromosome.reward_score
+
+def test_polish_improves_without_changing_the_sessions(make_generator):
+    generator = make_generator()
+    start = generator.create_random_chromosome()
+    generator.calculate_fitness(start)
+    polished, history = generator.polish(start, time_budget=0.3)
+    assert history[0][2] == _cost(start)
+    costs = [cost for _, _, cost in history]
+    assert costs == sorted(costs, reverse=True) and len(set(costs)) == len(costs)
+    assert _cost(polished) == costs[-1] < _cost(start)
+    assert np.array_equal(polished.encoded.course, start.encoded.course)
+    assert np.array_equal(polished.encoded.group, start.encoded.group)
+    
+    reference = TimetableChromosome(genes=list(polished.genes))
+    generator._set_fitness(reference, *generator._score_genes(reference))
+    assert _cost(reference) == _cost(polished)
+
+def test_no_budget_no_polish(make_generator):
+    generator = make_generator()
+    start = generator.create_random_chromosome()
+    generator.calculate_fitness(start)
+    assert generator.polish(start, time_budget=0) == (start, [])
+
+def test_evolve_polishes_its_best(make_generator):
+    generator = make_generator(population_size=12, generations=3, polish_seconds=0.2)
+    best, history = generator.evolve()
+    assert generator.polish_history
+    assert best.fitness >= history[-1]
@@ -0,0 +1,28 @@
+"""Repair must clear hard conflicts without breaking the chromosome, also on instances without rooms."""
+from benchmark import PRESETS, create_synthetic_data
+from index import TimetableChromosome
+
+def _hard(generator, chromosome):
+    scored = TimetableChromosome(genes=list(chromosome.genes))
+    generator._set_fitness(scored, *generator._score_genes(scored))
+    return scored.hard_violations
+
+def test_repair_reduces_hard_violations(make_generator):
+    generator = make_generator()
+    for _ in range(4):
+        chromosome = generator.create_random_chromosome()
+        generator.calculate_fitness(chromosome)
+        repaired, repairs = generator.repair(chromosome)
+        assert repairs > 0
+        assert len(repaired.encoded) == len(chromosome.encoded)
+        assert _hard(generator, repaired) < _hard(generator, chromosome)
+
+def test_repair_without_rooms(make_generator):
+    courses, faculty, rooms, students = create_synthetic_data(PRESETS['tiny'])
+    generator = make_generator((courses, faculty, rooms.iloc[0:0], students))
+    assert generator._get_fitness_evaluator().n_rooms == 0
+    chromosome = generator.create_random_chromosome()
+    repaired, repairs = generator.repair(chromosome)
+    assert repairs > 0
+    assert (repaired.encoded.room < 0).all()
+    assert _hard(generator, repaired) < _hard(generator, chromosome)
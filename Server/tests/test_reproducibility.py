@@ -0,0 +1,29 @@
+"""A fixed seed reproduces the whole run, whichever way the fitness is evaluated."""
+import numpy as np
+import pytest
+
+def _run(make_generator, seed=7, **settings):
+    generator = make_generator(seed=seed, population_size=12, generations=6, **settings)
+    best, history = generator.evolve()
+    return best.encoded.columns, history
+
+@pytest.mark.parametrize('settings', [
+    {}, {'fitness_mode': 'incremental'}, {'fitness_workers': 2},
+], ids=['batch', 'incremental', 'workers'])
+def test_same_seed_same_best(make_generator, settings):
+    columns, history = _run(make_generator)
+    again, again_history = _run(make_generator, **settings)
+    assert again_history == history
+    assert all(np.array_equal(a, b) for a, b in zip(again, columns))
+
+def test_repeated_runs_of_one_generator_match(make_generator):
+    generator = make_generator(population_size=12, generations=6)
+    first, history = generator.evolve()
+    second, again = generator.evolve()
+    assert again == history
+    assert second.genes == first.genes
+
+def test_other_seed_other_run(make_generator):
+    columns, _ = _run(make_generator)
+    other, _ = _run(make_generator, seed=8)
+    assert not all(np.array_equal(a, b) for a, b in zip(other, columns))
@@ -0,0 +1,39 @@
+"""Rescheduling moves only the sessions a data change affects and charges every move."""
+import numpy as np
+import pytest
+
+@pytest.fixture
+def previous(make_generator):
+    generator = make_generator(population_size=12, generations=20)
+    best, _ = generator.evolve()
+    return best
+
+def test_faculty_on_leave(make_generator, previous):
+    from benchmark import PRESETS, create_synthetic_data
+    
+    courses, faculty, rooms, students = create_synthetic_data(PRESETS['tiny'])
+    on_leave = previous.genes[0].faculty_id
+    generator = make_generator((courses, faculty[faculty.Faculty_ID != on_leave], rooms, students),
+                               population_size=12, generations=20)
+    previous_arrays, start, affected = generator._reschedule_start(previous)
+    assert 0 < len(affected) < len(start)
+    
+    best, _ = generator.reschedule(previous)
+    assert on_leave not in {gene.faculty_id for gene in best.genes}
+    arrays = generator._get_fitness_evaluator().gene_arrays(best)
+    kept = np.setdiff1d(np.arange(len(start)), affected)
+    for column, before in zip(arrays.columns, previous_arrays.columns):
+        assert np.array_equal(column[kept], before[kept])
+    moved = int(np.count_nonzero(
+        (arrays.slot != previous_arrays.slot) | (arrays.faculty != previous_arrays.faculty)
+        | (arrays.room != previous_arrays.room)
+    ))
+    assert 0 < moved <= len(affected)
+    assert best.disruption_penalty == generator.disruption_weight * moved
+
+def test_unchanged_data_keeps_the_timetable(make_generator, previous):
+    generator = make_generator(population_size=12, generations=20)
+    best, history = generator.reschedule(previous)
+    assert generator.stop_reason == 'unaffected'
+    assert best.genes == previous.genes
+    assert best.disruption_penalty == 0 and len(history) == 1
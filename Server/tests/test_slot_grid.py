@@ -0,0 +1,34 @@
+"""SlotGrid bitsets: counted bookings, and grids wider than one machine word."""
+import numpy as np
+
+from index import EnhancedGeneticTimetableGenerator, SlotGrid
+
+def test_double_booked_cell_stays_busy_until_released_twice():
+    grid = SlotGrid(42, 2, np.array([0, 0, 1]), np.array([5, 5, 41]))
+    assert grid.multiplicity.tolist() == [2, 2, 1]
+    assert grid.count(0, 5) == 2
+    grid.release(0, 5)
+    assert grid.count(0, 5) == 1
+    grid.release(0, 5)
+    assert grid.count(0, 5) == 0
+    grid.book(1, 3)
+    assert SlotGrid.slots(grid.union([0, 1])) == [3, 41]
+
+def test_wide_grid():
+    occupied = np.zeros((3, 100), dtype=bool)
+    occupied[0, [0, 70, 99]] = occupied[2, 70] = True
+    bitsets = SlotGrid.from_mask(occupied)
+    assert SlotGrid.slots(bitsets[0]) == [0, 70, 99]
+    counts = SlotGrid.column_counts(bitsets, 100)
+    assert counts[70] == 2 and counts.sum() == 4
+
+def test_constructor_on_a_grid_of_more_than_64_slots(make_generator):
+    defaults = EnhancedGeneticTimetableGenerator()
+    generator = make_generator(days=defaults.days + ['Sunday', 'Monday2', 'Tuesday2', 'Wednesday2'],
+                               PERIOD_TIMES=defaults.PERIOD_TIMES + [('16:30', '17:30')])
+    evaluator = generator._get_fitness_evaluator()
+    assert evaluator.n_slots == 80
+    chromosome = generator.create_constructed_chromosome()
+    assert chromosome.gene_count and int(chromosome.encoded.slot.max()) < 80
+    repaired, _ = generator.repair(generator.create_random_chromosome())
+    assert int(repaired.encoded.slot.max()) < 80
@@ -0,0 +1,39 @@
+"""Runs stop on their wall-clock, evaluation and stagnation limits, or when cancelled."""
+import threading
+from time import monotonic
+
+def _generator(make_generator, **settings):
+    return make_generator(population_size=12, elite_size=2, generations=100_000, **settings)
+
+def test_evaluation_budget_is_never_exceeded(make_generator):
+    generator = _generator(make_generator, max_evaluations=57)
+    _, history = generator.evolve()
+    assert generator.stop_reason == 'evaluations'
+    assert 57 - 10 < generator.evaluations <= 57  # 12 initial + 10 per generation
+    assert len(history) == 5
+
+def test_stagnation(make_generator):
+    generator = _generator(make_generator, stagnation_generations=3)
+    _, history = generator.evolve()
+    assert generator.stop_reason == 'stagnation'
+    assert len(set(history[-4:])) == 1
+
+def test_wall_clock_limit(make_generator):
+    generator = _generator(make_generator, max_seconds=0.3)
+    started = monotonic()
+    generator.evolve()
+    assert generator.stop_reason == 'time'
+    assert monotonic() - started < 5
+
+def test_cancel(make_generator):
+    generator = _generator(make_generator, cancel_event=threading.Event())
+    generator.cancel_event.set()
+    _, history = generator.evolve()
+    assert generator.stop_reason == 'cancelled'
+    assert len(history) == 1
+
+def test_generation_limit(make_generator):
+    generator = make_generator(population_size=12, generations=4)
+    _, history = generator.evolve()
+    assert generator.stop_reason == 'generations'
+    assert len(history) == 4